@@ -0,0 +1,248 @@
+"""
+alint_parser.py
+
+Alint Output Parser for ARACY's LLM completions.
+Extracts "Word - Meaning" alints in a single pass from a JSON array, a JSON
+object ({"alints": [...]}, {"endearments": [...]} or word/meaning pairs),
+truncated JSON or plain (numbered, bulleted, quoted) lines.
+
+Every candidate is validated against the alint schema. The parser records why
+each rejected candidate was dropped, so a short Lab result can be traced to
+its cause instead of being blindly retried.
+"""
+
+import json
+import re
+import threading
+from collections import Counter
+from typing import List, Optional, Tuple
+
+# Alint schema
+MAX_WORD_CHARS = 40
+MAX_WORD_WORDS = 5
+MIN_MEANING_CHARS = 8
+MAX_MEANING_CHARS = 300
+
+# Keys of JSON objects that hold one alint split in two fields
+WORD_KEYS = {"word", "term", "title"}
+MEANING_KEYS = {"meaning", "definition", "description"}
+# Keys whose string values are whole alints; a value that already contains a
+# separator is a whole alint under any key, other keys (language, vibe, ...)
+# are metadata and ignored
+ITEM_KEYS = {"alint", "alints", "endearment", "endearments"}
+
+_JSON_STRING = re.compile(r'"((?:[^"\\]|\\.)*)"')
+_NUMBERING = re.compile(r'^(?:\d+\s*[\.\)\-:]|[-*•])\s*')
+_SEPARATOR = re.compile(r'\s+[-–—]+\s+')
+_COLON_SEPARATOR = re.compile(r'^([^:]{1,40}):\s+')
+_DECORATION = '*_"\'`,“”'
+
+
+def validate_alint(text) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Normalize one candidate and check it against the alint schema.
+
+    Args:
+        text: Candidate string ("Word - Meaning", "Word: Meaning", "Word — Meaning")
+
+    Returns:
+        (alint, None) with the normalized "Word - Meaning" string, or
+        (None, reason) if the candidate was rejected
+    """
+    if not isinstance(text, str):
+        return None, "not a string"
+    text = _NUMBERING.sub('', text.strip()).strip().strip(_DECORATION).strip()
+
+    match = _SEPARATOR.search(text)
+    if match:
+        word, meaning = text[:match.start()], text[match.end():]
+    else:
+        match = _COLON_SEPARATOR.match(text)
+        if not match:
+            return None, "missing separator"
+        word, meaning = match.group(1), text[match.end():]
+
+    word = word.strip().strip(_DECORATION).strip()
+    meaning = meaning.strip().strip(_DECORATION).strip()
+    if not word:
+        return None, "empty word"
+    if len(word) > MAX_WORD_CHARS or len(word.split()) > MAX_WORD_WORDS:
+        return None, "word too long"
+    if len(meaning) < MIN_MEANING_CHARS:
+        return None, "meaning too short"
+    if len(meaning) > MAX_MEANING_CHARS:
+        return None, "meaning too long"
+    return f"{word} - {meaning}", None
+
+
+def is_quality_alint(alint) -> bool:
+    """Return True if a validated alint is good enough for the pool and the vault."""
+    if not isinstance(alint, str) or " - " not in alint:
+        return False
+    word, meaning = alint.split(" - ", 1)
+    return len(word.strip()) > 3 and len(meaning.strip()) > 15
+
+
+class ParserStats:
+    """
+    Process-wide accepted/rejected counters (thread-safe, parsers run in worker threads).
+    """
+
+    def __init__(self):
+        self.accepted = 0
+        self.rejected = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, accepted, rejections):
+        with self._lock:
+            self.accepted += accepted
+            self.rejected.update(reason for _, reason in rejections)
+
+    def snapshot(self):
+        """Serializable view of the counters."""
+        with self._lock:
+            return {"accepted": self.accepted, "rejected": dict(self.rejected)}
+
+
+# Shared counters exposed by main
+parser_stats = ParserStats()
+
+
+class AlintParser:
+    """
+    Incremental alint parser for whole completions and token streams.
+
+    The first visible character (after an optional ``` fence) decides between
+    JSON mode and line mode. In JSON mode every complete string literal is
+    handled as soon as it closes, so truncated JSON still yields its complete
+    items; in line mode every complete line is handled.
+
+    Args:
+        seen: Optional shared set of lowercase words already accepted
+              (lets several parsers deduplicate against each other)
+    """
+
+    def __init__(self, seen=None):
+        self.buffer = ""
+        self.json_mode = None
+        self.seen = seen if seen is not None else set()
+        self.rejections = []  # (candidate, reason)
+        self.accepted = 0
+        self._key = None
+        self._pair = {}
+
+    def _accept(self, candidate) -> Optional[str]:
+        alint, reason = validate_alint(candidate)
+        if alint is None:
+            # Blank lines, brackets and fences are not rejected items
+            if isinstance(candidate, str) and not any(c.isalnum() for c in candidate):
+                return None
+            self.rejections.append((str(candidate)[:120], reason))
+            return None
+        word = alint.split(" - ", 1)[0].lower()
+        if word in self.seen:
+            self.rejections.append((alint[:120], "duplicate"))
+            return None
+        self.seen.add(word)
+        self.accepted += 1
+        return alint
+
+    def _reject_unpaired(self):
+        """Record a pending word or meaning that never got its other half."""
+        for half, value in self._pair.items():
+            self.rejections.append((str(value)[:120], f"unpaired {half}"))
+        self._pair = {}
+
+    def _json_value(self, key, value) -> Optional[str]:
+        """Route one JSON string value, pairing word/meaning object fields."""
+        if isinstance(value, str) and _SEPARATOR.search(value):
+            return self._accept(value)
+        if key in WORD_KEYS or key in MEANING_KEYS:
+            half = "word" if key in WORD_KEYS else "meaning"
+            if half in self._pair:
+                self._reject_unpaired()  # a new item started before the last one was complete
+            self._pair[half] = value
+            if len(self._pair) < 2:
+                return None
+            pair, self._pair = self._pair, {}
+            return self._accept(f"{pair['word']} - {pair['meaning']}")
+        if key is None or key in ITEM_KEYS:
+            return self._accept(value)
+        return None
+
+    def _parse_json(self, final=False) -> List[str]:
+        found = []
+        consumed = 0
+        for match in _JSON_STRING.finditer(self.buffer):
+            rest = self.buffer[match.end():].lstrip()
+            if not rest and not final:
+                break  # cannot tell an object key from a value yet
+            try:
+                value = json.loads(match.group(0))
+            except json.JSONDecodeError:
+                value = match.group(1)
+            consumed = match.end()
+            if rest.startswith(":"):
+                self._key = value.strip().lower()
+                continue
+            key, self._key = self._key, None
+            alint = self._json_value(key, value)
+            if alint:
+                found.append(alint)
+        self.buffer = self.buffer[consumed:]
+        return found
+
+    def _parse_lines(self, final=False) -> List[str]:
+        *lines, self.buffer = self.buffer.split("\n")
+        if final:
+            lines.append(self.buffer)
+            self.buffer = ""
+        return [alint for alint in map(self._accept, lines) if alint]
+
+    def feed(self, chunk: str) -> List[str]:
+        """Consume a text delta and return any alints it completed."""
+        self.buffer += chunk
+
+        while self.json_mode is None:
+            stripped = self.buffer.lstrip()
+            if not stripped:
+                return []
+            if stripped.startswith("`"):
+                # Drop a markdown code fence line once it is complete
+                if "\n" not in stripped:
+                    return []
+                self.buffer = stripped.split("\n", 1)[1]
+                continue
+            self.json_mode = stripped[0] in "[{"
+
+        return self._parse_json() if self.json_mode else self._parse_lines()
+
+    def finish(self) -> List[str]:
+        """Flush whatever is left in the buffer once the stream has ended."""
+        if self.json_mode is None:
+            self.json_mode = False
+        found = self._parse_json(final=True) if self.json_mode else self._parse_lines(final=True)
+        self._reject_unpaired()
+        self.buffer = ""
+        parser_stats.add(self.accepted, self.rejections)
+        return found
+
+    def reasons(self) -> Counter:
+        """Rejection reasons of this parser, counted."""
+        return Counter(reason for _, reason in self.rejections)
+
+
+def parse_alints(text: str, seen=None) -> Tuple[List[str], List[Tuple[str, str]]]:
+    """
+    Parse a whole completion in one pass.
+
+    Args:
+        text: Raw completion text
+        seen: Optional shared set of lowercase words already accepted
+
+    Returns:
+        (alints, rejections) where rejections lists (candidate, reason)
+    """
+    parser = AlintParser(seen)
+    alints = parser.feed(text or "") + parser.finish()
+    return alints, parser.rejections
@@ -0,0 +1,173 @@
+"""
+alint_pool.py
+
+Warm Alint Pool for The Lab.
+Keeps a bounded buffer of pre-generated, validated alints per (style, language)
+and refills it in the background during idle periods, under a rate budget.
+
+Lab requests drain the pool first and only fall back to live generation for
+whatever the pool cannot cover, so common styles are served in milliseconds.
+"""
+
+import asyncio
+import time
+from collections import deque
+
+from config import (
+    ALINT_POOL_SIZE,
+    ALINT_POOL_BATCH,
+    ALINT_POOL_REFILLS_PER_MIN,
+    ALINT_POOL_IDLE_S,
+    ALINT_POOL_INTERVAL_S,
+)
+from alint_parser import is_quality_alint
+from logger import log_error
+
+# Styles offered by LabGenerationRequest
+POOL_STYLES = ["silly", "deep", "astro", "poetic", "scientific"]
+
+
+class AlintPool:
+    """
+    Bounded per-(style, language) buffers of ready-to-serve alints.
+
+    Args:
+        generate: Async callable (style, language, count) -> list of alint strings
+        languages: Languages to keep warm
+        capacity: Maximum alints buffered per key
+        batch: Alints requested per refill call
+        refills_per_min: Refill rate budget (token bucket, refills per minute).
+            A refill is one generate() call, which for the Lab fan-out means
+            ceil(batch / LAB_CHUNK_SIZE) chunk calls plus up to 3 top-up
+            rounds, i.e. 3-9 LLM calls for the default batch of 11
+        idle_s: Only refill when no Lab request arrived for this many seconds
+    """
+
+    def __init__(self, generate, languages, capacity=ALINT_POOL_SIZE, batch=ALINT_POOL_BATCH,
+                 refills_per_min=ALINT_POOL_REFILLS_PER_MIN, idle_s=ALINT_POOL_IDLE_S):
+        self.generate = generate
+        self.capacity = capacity
+        self.batch = batch
+        self.rate = refills_per_min / 60.0
+        self.idle_s = idle_s
+        self.buffers = {
+            (style, language): deque(maxlen=capacity)
+            for style in POOL_STYLES for language in languages
+        }
+        self.tokens = float(max(1, refills_per_min))
+        self.max_tokens = self.tokens
+        self.last_refill = time.monotonic()
+        self.last_activity = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.refills = 0
+        self._task = None
+
+    def note_activity(self):
+        """Mark the Lab as busy so background refills back off."""
+        self.last_activity = time.monotonic()
+
+    def take(self, style, language, count):
+        """
+        Pop up to count alints for (style, language).
+
+        Returns:
+            List of alint strings (may be shorter than count, or empty on a miss)
+        """
+        self.note_activity()
+        buffer = self.buffers.get((style, language))
+        taken = []
+        while buffer and len(taken) < count:
+            taken.append(buffer.popleft())
+        if len(taken) == count:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return taken
+
+    def _spend_token(self):
+        """Token bucket: return True if the rate budget allows one more refill."""
+        now = time.monotonic()
+        self.tokens = min(self.max_tokens, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def _emptiest_key(self):
+        """The key whose buffer is furthest from full, or None if all are full."""
+        key, buffer = min(self.buffers.items(), key=lambda item: len(item[1]))
+        return key if len(buffer) < self.capacity else None
+
+    async def refill_once(self):
+        """
+        Refill the emptiest buffer with one batch, if idle and within budget.
+
+        Returns:
+            Number of alints added
+        """
+        if time.monotonic() - self.last_activity < self.idle_s:
+            return 0
+        key = self._emptiest_key()
+        if key is None or not self._spend_token():
+            return 0
+
+        style, language = key
+        buffer = self.buffers[key]
+        try:
+            generated = await self.generate(style, language, self.batch)
+        except Exception as e:
+            log_error(f"Alint pool refill failed for {style}/{language}: {e}", level="WARNING")
+            return 0
+
+        known = {a.split(" - ", 1)[0].strip().lower() for a in buffer}
+        added = 0
+        for alint in generated:
+            if not is_quality_alint(alint):
+                continue
+            word = alint.split(" - ", 1)[0].strip().lower()
+            if word in known or len(buffer) >= self.capacity:
+                continue
+            known.add(word)
+            buffer.append(alint)
+            added += 1
+        self.refills += 1
+        return added
+
+    async def run(self):
+        """Background refill loop."""
+        while True:
+            await asyncio.sleep(ALINT_POOL_INTERVAL_S)
+            try:
+                await self.refill_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log_error(f"Alint pool loop error: {e}", level="WARNING")
+
+    def start(self):
+        """Start the background refill task on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Cancel the background refill task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def snapshot(self):
+        """Serializable view of pool fill levels and hit/miss counters."""
+        return {
+            "capacity": self.capacity,
+            "levels": {f"{style}/{language}": len(buffer) for (style, language), buffer in self.buffers.items()},
+            "hits": self.hits,
+            "misses": self.misses,
+            "refills": self.refills,
+            "budget_tokens": round(self.tokens, 2),
+        }
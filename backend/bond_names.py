@@ -0,0 +1,246 @@
+"""
+bond_names.py
+
+Bond Name Reservoir for ARACY.
+Bond names are generated in batches (dozens of candidates per LLM call),
+deduplicated against every name already assigned or waiting, and kept in a
+persistent reservoir that link_bond consumes from, so bond creation never
+waits on the LLM and every bond gets its own name. Refills are demand-driven:
+no LLM call is made until a take leaves the reservoir below its low-water mark.
+"""
+
+import asyncio
+import json
+import os
+import re
+import threading
+from collections import deque
+
+from config import (
+    BOND_NAME_RESERVOIR_SIZE,
+    BOND_NAME_BATCH,
+    BOND_NAME_LOW_WATER,
+    BOND_NAME_REFILL_INTERVAL_S,
+    data_path,
+)
+from logger import log_error
+
+BOND_NAME_RESERVOIR_PATH = data_path("bond_names.json")
+
+# Local word lists used when the reservoir runs dry (no LLM call on the request path)
+FALLBACK_FIRST = ["COVALENT", "NEBULA", "STELLAR", "LUNAR", "CATALYST", "IONIC", "ASTRAL", "VELVET", "OBSIDIAN", "PRISM"]
+FALLBACK_SECOND = ["STARDUST", "UNION", "BOND", "ORBIT", "ECLIPSE", "ALCHEMY", "REVERIE", "HALO", "TIDE", "AURORA"]
+
+_NUMBERING = re.compile(r'^(?:\d+\s*[\.\)\-:]|[-*•])\s*')
+_VALID_NAME = re.compile(r"^[A-Z][A-Z' -]*[A-Z]$")
+
+
+def normalize_bond_name(candidate):
+    """
+    Clean one candidate name and check it is a 2-3 word name.
+
+    Returns:
+        The uppercased name, or None if the candidate is not a usable name
+    """
+    if not isinstance(candidate, str):
+        return None
+    name = _NUMBERING.sub('', candidate.strip()).strip().strip('"\'*`.,').strip().upper()
+    name = " ".join(name.split())
+    if not _VALID_NAME.match(name) or not 2 <= len(name.split()) <= 3 or len(name) > 40:
+        return None
+    return name
+
+
+class BondNameReservoir:
+    """
+    Persistent reservoir of unused, unique bond names.
+
+    Args:
+        generate: Callable (count, avoid) -> list of candidate names (runs in a worker thread)
+        assigned: Names already given to bonds ({bond_id: name})
+        path: JSON file the reservoir is persisted to
+        capacity: Maximum unused names kept
+        batch: Candidates requested per LLM call
+        low_water: Refill when fewer unused names remain
+    """
+
+    def __init__(self, generate, assigned=None, path=BOND_NAME_RESERVOIR_PATH,
+                 capacity=BOND_NAME_RESERVOIR_SIZE, batch=BOND_NAME_BATCH, low_water=BOND_NAME_LOW_WATER):
+        self.generate = generate
+        self.path = path
+        self.capacity = capacity
+        self.batch = batch
+        self.low_water = low_water
+        self.available = deque()
+        self.assigned = {}  # bond_id -> name
+        self.known = set()  # every assigned or available name (dedupe hash set)
+        self.served = 0
+        self.fallbacks = 0
+        self.batches = 0
+        self._wanted = False  # set by take once the reservoir drops below low water
+        self._lock = threading.Lock()
+        self._persist_lock = threading.Lock()  # one writer of bond_names.json at a time
+        self._task = None
+        self._load()
+        for bond_id, name in (assigned or {}).items():
+            if name:
+                self.assigned.setdefault(bond_id, name.upper())
+                self.known.add(name.upper())
+
+    def _load(self):
+        """Resume the reservoir from bond_names.json if present."""
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, "r", encoding="utf-8") as f:
+                    stored = json.load(f)
+                self.assigned.update(stored.get("assigned", {}))
+                self.known.update(self.assigned.values())
+                for name in stored.get("available", []):
+                    if name not in self.known:
+                        self.known.add(name)
+                        self.available.append(name)
+        except Exception as e:
+            log_error(f"Failed to load bond name reservoir: {e}", level="WARNING")
+
+    def persist(self):
+        """
+        Write the reservoir and assigned names to bond_names.json (atomic
+        replace). Blocking: callers on the event loop use asyncio.to_thread.
+        """
+        try:
+            with self._persist_lock:
+                with self._lock:
+                    data = {"available": list(self.available), "assigned": dict(self.assigned)}
+                payload = json.dumps(data, indent=2, ensure_ascii=False)
+                with open(f"{self.path}.tmp", "w", encoding="utf-8") as f:
+                    f.write(payload)
+                os.replace(f"{self.path}.tmp", self.path)
+        except Exception as e:
+            log_error(f"Failed to persist bond name reservoir: {e}", level="WARNING")
+
+    def add(self, candidates):
+        """
+        Add generated candidates, skipping invalid names and any name already known.
+
+        Returns:
+            Number of names added
+        """
+        added = 0
+        with self._lock:
+            for candidate in candidates:
+                name = normalize_bond_name(candidate)
+                if name is None or name in self.known or len(self.available) >= self.capacity:
+                    continue
+                self.known.add(name)
+                self.available.append(name)
+                added += 1
+        return added
+
+    def _fallback_name(self):
+        """A unique name built locally from the fallback word lists (lock held)."""
+        for first in FALLBACK_FIRST:
+            for second in FALLBACK_SECOND:
+                name = f"{first} {second}"
+                if name not in self.known:
+                    return name
+        suffix = len(self.known) + 1
+        while f"STELLAR UNION {suffix}" in self.known:
+            suffix += 1
+        return f"STELLAR UNION {suffix}"
+
+    def take(self, bond_id):
+        """
+        Assign the next unused name to a bond (never calls the LLM) and
+        persist the reservoir. Blocking: run it off the event loop.
+
+        Returns:
+            The bond's name (the existing one if the bond already has a name)
+        """
+        with self._lock:
+            if bond_id in self.assigned:
+                return self.assigned[bond_id]
+            if self.available:
+                name = self.available.popleft()
+                self.served += 1
+            else:
+                name = self._fallback_name()
+                self.fallbacks += 1
+            self.known.add(name)
+            self.assigned[bond_id] = name
+            if len(self.available) < self.low_water:
+                self._wanted = True
+        self.persist()
+        return name
+
+    async def refill_once(self, top_up=False):
+        """
+        Request one batch of candidates if the reservoir is below its low-water
+        mark (or, with top_up, anywhere below capacity).
+
+        Returns:
+            Number of names added
+        """
+        with self._lock:
+            threshold = self.capacity if top_up else self.low_water
+            if len(self.available) >= threshold:
+                return 0
+            avoid = list(self.available)[-self.batch:]
+        try:
+            candidates = await asyncio.to_thread(self.generate, self.batch, avoid)
+        except Exception as e:
+            log_error(f"Bond name batch generation failed: {e}", level="WARNING")
+            return 0
+        self.batches += 1
+        added = self.add(candidates)
+        if added:
+            await asyncio.to_thread(self.persist)
+        return added
+
+    async def run(self):
+        """
+        Background refill loop: once a take has left the reservoir below low
+        water, refill back up to capacity (idle servers make no LLM calls).
+        """
+        while True:
+            try:
+                if self._wanted:
+                    while await self.refill_once(top_up=True):
+                        pass
+                    with self._lock:
+                        # A failed batch leaves it wanted: retry next interval
+                        self._wanted = len(self.available) < self.low_water
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log_error(f"Bond name reservoir loop error: {e}", level="WARNING")
+            await asyncio.sleep(BOND_NAME_REFILL_INTERVAL_S)
+
+    def start(self):
+        """Start the background refill task on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Cancel the background refill task and persist the reservoir."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self.persist)
+
+    def snapshot(self):
+        """Serializable view of reservoir levels and counters."""
+        with self._lock:
+            return {
+                "available": len(self.available),
+                "assigned": len(self.assigned),
+                "capacity": self.capacity,
+                "low_water": self.low_water,
+                "served": self.served,
+                "fallbacks": self.fallbacks,
+                "batches": self.batches,
+                "refill_wanted": self._wanted,
+            }
@@ -10,6 +10,10 @@ All other modules receive data through function parameters, ensuring traceabilit
 
 import os
 import re
+import json
+import logging
+import shutil
+import tempfile
 from dotenv import load_dotenv
 
 # Load .env on module import
@@ -40,6 +44,149 @@ ASTRO_URANUS = os.getenv('ASTRO_URANUS', '')
 ASTRO_NEPTUNE = os.getenv('ASTRO_NEPTUNE', '')
 ASTRO_PLUTO = os.getenv('ASTRO_PLUTO', '')
 
+# LLM Provider Routing (circuit breaker and retry backoff)
+ROUTER_WINDOW_SIZE = int(os.getenv('ROUTER_WINDOW_SIZE', '20'))
+ROUTER_MIN_CALLS = int(os.getenv('ROUTER_MIN_CALLS', '5'))
+ROUTER_FAILURE_RATE = float(os.getenv('ROUTER_FAILURE_RATE', '0.5'))
+ROUTER_CONSECUTIVE_FAILURES = int(os.getenv('ROUTER_CONSECUTIVE_FAILURES', '3'))
+ROUTER_COOLDOWN_S = float(os.getenv('ROUTER_COOLDOWN_S', '30'))
+BACKOFF_BASE_S = float(os.getenv('BACKOFF_BASE_S', '0.25'))
+BACKOFF_MAX_S = float(os.getenv('BACKOFF_MAX_S', '4'))
+
+# LLM Hedged Requests (opt-in: race slow Groq calls against Gemini)
+LLM_HEDGE_ENABLED = os.getenv('LLM_HEDGE_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+LLM_HEDGE_PERCENTILE = float(os.getenv('LLM_HEDGE_PERCENTILE', '95'))
+LLM_HEDGE_MIN_DELAY_S = float(os.getenv('LLM_HEDGE_MIN_DELAY_S', '0.5'))
+LLM_HEDGE_DEFAULT_DELAY_S = float(os.getenv('LLM_HEDGE_DEFAULT_DELAY_S', '2.0'))
+
+# Warm Alint Pool (pre-generated Lab alints per style and language; opt-in, refills spend LLM calls while idle)
+ALINT_POOL_ENABLED = os.getenv('ALINT_POOL_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+ALINT_POOL_LANGUAGES = [l.strip().lower() for l in os.getenv('ALINT_POOL_LANGUAGES', 'en').split(',') if l.strip()]
+ALINT_POOL_SIZE = int(os.getenv('ALINT_POOL_SIZE', '22'))
+ALINT_POOL_BATCH = int(os.getenv('ALINT_POOL_BATCH', '11'))
+ALINT_POOL_REFILLS_PER_MIN = float(os.getenv('ALINT_POOL_REFILLS_PER_MIN', '1'))  # each refill is one Lab fan-out: 3-9 LLM calls
+ALINT_POOL_IDLE_S = float(os.getenv('ALINT_POOL_IDLE_S', '5'))
+ALINT_POOL_INTERVAL_S = float(os.getenv('ALINT_POOL_INTERVAL_S', '2'))
+
+# Token & Cost Accounting (USD per 1M tokens; override with LLM_PRICING_JSON)
+LLM_PRICING = {
+    "llama-3.3-70b-versatile": {"input": 0.59, "output": 0.79},
+    "llama-3.1-8b-instant": {"input": 0.05, "output": 0.08},
+    "gemini-2.0-flash": {"input": 0.10, "output": 0.40},
+    "gemini-2.5-flash": {"input": 0.30, "output": 2.50},
+    "gemini-2.5-pro": {"input": 1.25, "output": 10.00},
+    "mock-alint": {"input": 0.0, "output": 0.0},
+    "mock-fallback": {"input": 0.0, "output": 0.0},
+    "default": {"input": 0.59, "output": 0.79},
+}
+try:
+    LLM_PRICING.update(json.loads(os.getenv('LLM_PRICING_JSON', '{}') or '{}'))
+except (ValueError, TypeError) as e:  # JSONDecodeError, or not a JSON object
+    # A bad override must not keep the backend from starting
+    logging.warning(f"Ignoring malformed LLM_PRICING_JSON ({e}); using built-in pricing")
+USAGE_PERSIST_INTERVAL_S = float(os.getenv('USAGE_PERSIST_INTERVAL_S', '60'))
+USAGE_RATE_WINDOW_S = float(os.getenv('USAGE_RATE_WINDOW_S', '60'))
+
+# LLM HTTP Clients (shared, pooled keep-alive connections)
+LLM_POOL_SIZE = int(os.getenv('LLM_POOL_SIZE', '20'))
+LLM_KEEPALIVE_S = float(os.getenv('LLM_KEEPALIVE_S', '60'))
+LLM_CONNECT_TIMEOUT_S = float(os.getenv('LLM_CONNECT_TIMEOUT_S', '5'))
+LLM_READ_TIMEOUT_S = float(os.getenv('LLM_READ_TIMEOUT_S', '60'))
+LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', '2'))
+
+# LLM Token Budgets (max_tokens sized per task and requested count)
+LLM_MAX_TOKENS = int(os.getenv('LLM_MAX_TOKENS', '2048'))
+LLM_MIN_TOKENS = int(os.getenv('LLM_MIN_TOKENS', '32'))
+LLM_BUDGET_MARGIN = float(os.getenv('LLM_BUDGET_MARGIN', '1.3'))
+
+# Lab Degraded Mode (opt-in latency SLO; provisional vault sets are only served when a deadline is set)
+LAB_DEADLINE_S = float(os.getenv('LAB_DEADLINE_S', '0'))  # 0 disables; size it above the observed Lab p95
+
+# Background Job Queue (post-response vault, bond store and log writes)
+JOB_QUEUE_SIZE = int(os.getenv('JOB_QUEUE_SIZE', '1000'))
+JOB_MAX_RETRIES = int(os.getenv('JOB_MAX_RETRIES', '3'))
+JOB_DRAIN_TIMEOUT_S = float(os.getenv('JOB_DRAIN_TIMEOUT_S', '10'))
+JOB_JOURNAL_COMPACT_LINES = int(os.getenv('JOB_JOURNAL_COMPACT_LINES', '1000'))  # rewrite once mostly done lines
+
+# Log Storage (append-only JSONL segments, rotated by size or age)
+LOG_SEGMENT_MAX_BYTES = int(os.getenv('LOG_SEGMENT_MAX_BYTES', str(1024 * 1024)))
+LOG_SEGMENT_MAX_AGE_S = float(os.getenv('LOG_SEGMENT_MAX_AGE_S', '86400'))
+
+# Log Retention (background compaction of closed segments)
+LOG_INFO_TTL_S = float(os.getenv('LOG_INFO_TTL_S', str(7 * 86400)))  # DEBUG/INFO entries expire after this
+LOG_COMPACT_AFTER_S = float(os.getenv('LOG_COMPACT_AFTER_S', '3600'))  # closed segments are compacted once this old
+LOG_COMPACT_INTERVAL_S = float(os.getenv('LOG_COMPACT_INTERVAL_S', '3600'))
+LOG_AGGREGATE_MIN_COUNT = int(os.getenv('LOG_AGGREGATE_MIN_COUNT', '3'))  # repeats of one template before collapsing
+LOG_RETENTION_MAX_BYTES = int(os.getenv('LOG_RETENTION_MAX_BYTES', str(50 * 1024 * 1024)))  # oldest segments dropped above this
+
+# Log Pipeline (queued, batched log writes; DEBUG/INFO dropped first when full)
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+LOG_BATCH_SIZE = int(os.getenv('LOG_BATCH_SIZE', '256'))
+LOG_SHUTDOWN_TIMEOUT_S = float(os.getenv('LOG_SHUTDOWN_TIMEOUT_S', '5'))
+
+# Live Log Tail (SSE fan-out to the Expert Log Viewer)
+LOG_STREAM_BUFFER = int(os.getenv('LOG_STREAM_BUFFER', '500'))
+LOG_STREAM_MAX_CLIENTS = int(os.getenv('LOG_STREAM_MAX_CLIENTS', '50'))
+LOG_STREAM_HEARTBEAT_S = float(os.getenv('LOG_STREAM_HEARTBEAT_S', '15'))
+
+# Resource Sampler (background process metrics for The Resource Footprint)
+RESOURCE_SAMPLE_INTERVAL_S = float(os.getenv('RESOURCE_SAMPLE_INTERVAL_S', '5'))
+RESOURCE_HISTORY_SIZE = int(os.getenv('RESOURCE_HISTORY_SIZE', '720'))
+
+# Tracing (sampled stage spans, exported as OTLP/JSON)
+TRACE_SAMPLE_RATE = float(os.getenv('TRACE_SAMPLE_RATE', '0.1'))
+TRACE_EXPORT_FILE = os.getenv('TRACE_EXPORT_FILE', 'traces.jsonl')  # empty disables the file export
+TRACE_EXPORT_MAX_BYTES = int(os.getenv('TRACE_EXPORT_MAX_BYTES', str(10 * 1024 * 1024)))
+TRACE_OTLP_ENDPOINT = os.getenv('TRACE_OTLP_ENDPOINT', '')  # e.g. http://localhost:4318/v1/traces
+TRACE_RECENT = int(os.getenv('TRACE_RECENT', '50'))
+
+# Admin and Profiler (on-demand sampling profiles; endpoints disabled while ADMIN_TOKEN is empty)
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')  # sent as X-Admin-Token
+PROFILE_INTERVAL_MS = float(os.getenv('PROFILE_INTERVAL_MS', '5'))
+PROFILE_MAX_SECONDS = float(os.getenv('PROFILE_MAX_SECONDS', '60'))
+PROFILE_MAX_REQUESTS = int(os.getenv('PROFILE_MAX_REQUESTS', '100'))
+
+# Daily Quiz Cache (one validated quiz per bond per day)
+QUIZ_MIN_QUESTIONS = int(os.getenv('QUIZ_MIN_QUESTIONS', '3'))
+QUIZ_CACHE_DAYS = int(os.getenv('QUIZ_CACHE_DAYS', '2'))
+QUIZ_PRECOMPUTE_ENABLED = os.getenv('QUIZ_PRECOMPUTE_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+QUIZ_PRECOMPUTE_HOUR = int(os.getenv('QUIZ_PRECOMPUTE_HOUR', '3'))
+
+# Mock LLM Provider (LLM_PROVIDER=mock: offline, deterministic load testing)
+LLM_PROVIDER = os.getenv('LLM_PROVIDER', 'groq').strip().lower()  # groq, mock
+LLM_MOCK_SEED = int(os.getenv('LLM_MOCK_SEED', '42'))
+LLM_MOCK_LATENCY = os.getenv('LLM_MOCK_LATENCY', 'lognormal').strip().lower()  # fixed, uniform, lognormal
+LLM_MOCK_LATENCY_MS = float(os.getenv('LLM_MOCK_LATENCY_MS', '800'))  # fixed / median time to first token
+LLM_MOCK_LATENCY_SPREAD = float(os.getenv('LLM_MOCK_LATENCY_SPREAD', '0.5'))  # uniform: +/- fraction, lognormal: sigma
+LLM_MOCK_ERROR_RATE = float(os.getenv('LLM_MOCK_ERROR_RATE', '0'))
+LLM_MOCK_TOKENS_PER_S = float(os.getenv('LLM_MOCK_TOKENS_PER_S', '250'))
+# Mock runs write to scratch copies of the data files, never to the tracked ones
+MOCK_DATA_DIR = os.getenv('MOCK_DATA_DIR', os.path.join(tempfile.gettempdir(), 'aracy-mock'))
+
+
+def data_path(filename):
+    """
+    Location of a writable backend data file (vault, bond store, ...).
+
+    With LLM_PROVIDER=mock this is a scratch copy under MOCK_DATA_DIR, seeded
+    from the real file on first use, so load tests and CI runs never write
+    synthetic alints or bonds into the tracked data.
+    """
+    path = os.path.join(os.path.dirname(__file__), filename)
+    if LLM_PROVIDER != 'mock':
+        return path
+    os.makedirs(MOCK_DATA_DIR, exist_ok=True)
+    mock_path = os.path.join(MOCK_DATA_DIR, filename)
+    if not os.path.exists(mock_path) and os.path.exists(path):
+        shutil.copyfile(path, mock_path)
+    return mock_path
+
+# Bond Name Reservoir (batch-generated, unique bond names)
+BOND_NAME_RESERVOIR_SIZE = int(os.getenv('BOND_NAME_RESERVOIR_SIZE', '60'))
+BOND_NAME_BATCH = int(os.getenv('BOND_NAME_BATCH', '30'))
+BOND_NAME_LOW_WATER = int(os.getenv('BOND_NAME_LOW_WATER', '15'))
+BOND_NAME_REFILL_INTERVAL_S = float(os.getenv('BOND_NAME_REFILL_INTERVAL_S', '30'))
+
 
 def extract_profession(traits: str) -> str:
     """
@@ -101,6 +248,33 @@ def format_astro_chart() -> str:
     return chart_text
 
 
+def format_astro_summary() -> str:
+    """
+    Formats the key placements (Sun, Moon, Ascendant, Venus) on one line.
+    Used by compact prompts that do not need the complete chart.
+    
+    Returns:
+        Short astrological summary string
+    """
+    placements = [
+        ("Sun", ASTRO_SUN),
+        ("Moon", ASTRO_MOON),
+        ("Ascendant", ASTRO_ASC),
+        ("Venus", ASTRO_VENUS),
+    ]
+    summary = ", ".join(f"{planet} {sign}" for planet, sign in placements if sign)
+    
+    aquarius_count = sum([
+        'Aquarius' in ASTRO_MERCURY,
+        'Aquarius' in ASTRO_URANUS,
+        'Aquarius' in ASTRO_NEPTUNE
+    ])
+    if aquarius_count >= 3:
+        summary += ", Aquarius stellium" if summary else "Aquarius stellium"
+    
+    return summary or "cosmic"
+
+
 def get_muse_context() -> dict:
     """
     Returns a complete dictionary of all Muse context data.
@@ -114,6 +288,7 @@ def get_muse_context() -> dict:
             - traits: Full traits description
             - astro: Dictionary of individual astrological placements
             - astro_chart: Formatted complete chart string
+            - astro_summary: One-line summary of the key placements
     """
     profession = extract_profession(MUSE_TRAITS)
     
@@ -135,7 +310,8 @@ def get_muse_context() -> dict:
             'neptune': ASTRO_NEPTUNE,
             'pluto': ASTRO_PLUTO,
         },
-        'astro_chart': format_astro_chart()
+        'astro_chart': format_astro_chart(),
+        'astro_summary': format_astro_summary()
     }
 
 
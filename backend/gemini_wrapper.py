@@ -7,13 +7,20 @@ Handles flexible model selection and dynamic prompt injection.
 GAMP5 COMPLIANCE: This module receives data through function parameters only.
 No hardcoded personal data. All context is injected at runtime from config.py.
 
-Updated for 2026: Uses the new google-genai SDK (google.genai)
+Updated for 2026: Uses the new google-genai SDK (google.genai) through the
+unified provider layer (providers.py), which owns the pooled, long-lived client.
 """
 
-from google import genai
-from google.genai import types
-from config import get_muse_context, get_api_keys
-from logic_protocols.mirror_config import get_identity_prompt
+from config import get_api_keys
+# build_muse_prompt is re-exported for backward compatibility
+from providers import (
+    get_provider,
+    build_alint_prompt,
+    build_muse_alint_prompt,
+    build_bond_name_prompt,
+    build_muse_prompt,
+)
+from token_budget import TASK_REFLECTION, TASK_BOND_NAME, plan_max_tokens
 
 
 class GeminiWrapper:
@@ -48,7 +55,10 @@ class GeminiWrapper:
         self.api_key = api_key
         self.preferred_models = preferred_models
         self.available_model = None
-        self.client = genai.Client(api_key=api_key)
+        
+        # Shared, pooled Gemini adapter
+        self.provider = get_provider("gemini", api_key)
+        self.client = self.provider.client
         self._init_model()
     
     def _init_model(self):
@@ -82,13 +92,15 @@ class GeminiWrapper:
             print(f"⚠ Model listing failed: {e}. Attempting direct connection...")
             self.available_model = self.preferred_models[0]
     
-    def generate_alint(self, prompt=None, category="general"):
+    def generate_alint(self, prompt=None, category="general", task=TASK_REFLECTION, count=1):
         """
         Generate an 'alint' (affectionate intelligence) using the Mirror Lab engine.
         
         Args:
             prompt: Optional additional user prompt to append
             category: Type of alint (general, silly, deep, astro)
+            task: Token budget task (reflection, lab_list, quiz, bond_name)
+            count: Number of items requested, sizes max_tokens
         
         Returns:
             Generated JSON string containing the alint
@@ -96,45 +108,16 @@ class GeminiWrapper:
         if not self.available_model:
             raise RuntimeError("No Gemini model initialized.")
         
-        # Get Muse context from config
-        muse = get_muse_context()
-        
-        # Build the identity prompt with injected data
-        identity_prompt = get_identity_prompt(
-            name=muse['name'],
-            profession=muse['profession'],
-            traits=muse['traits'],
-            astro_full_chart=muse['astro_chart']
-        )
-        
-        # Append category-specific instructions
-        category_instructions = {
-            "silly": "\n\nTone: Playful, whimsical, lighthearted. Include a fun chemistry pun or cosmic joke.",
-            "deep": "\n\nTone: Profound, introspective, emotionally resonant. Explore the depths of connection.",
-            "astro": "\n\nTone: Mystical, celestial, prophetic. Focus heavily on current astrological transits and their meaning.",
-            "general": ""
-        }
-        
-        full_prompt = identity_prompt + category_instructions.get(category, "")
+        full_prompt = build_muse_alint_prompt(category=category, prompt=prompt, task=task)
         
-        # Optionally append extra user prompt
-        if prompt:
-            full_prompt = f"{full_prompt}\n\nAdditional Context:\n{prompt}"
-        
-        # Generate content using new SDK
+        # Generate content through the shared provider (breaker + usage tracked)
         try:
-            response = self.client.models.generate_content(
-                model=self.available_model,
-                contents=full_prompt
+            return self.provider.complete(
+                self.available_model,
+                full_prompt,
+                max_tokens=plan_max_tokens(task, count),
+                category=category
             )
-            
-            # Extract text from response
-            if hasattr(response, 'text'):
-                return response.text
-            elif hasattr(response, 'candidates') and response.candidates:
-                return response.candidates[0].content.parts[0].text
-            else:
-                return str(response)
         
         except Exception as e:
             raise RuntimeError(f"Gemini generation failed: {e}")
@@ -146,66 +129,20 @@ class GeminiWrapper:
         Returns:
             A unique, poetic bond name (e.g., "COVALENT STARDUST")
         """
-        muse = get_muse_context()
-        
-        prompt = f"""
-Generate a mystical, unique bond name for a cosmic connection.
-
-Context:
-- Muse: {muse['name']}, {muse['profession']}
-- Traits: {muse['traits']}
-- Astrological Signature: {muse['astro_chart']}
-
-Requirements:
-1. Combine MOLECULAR chemistry terms with CELESTIAL imagery
-2. Use 2-3 words maximum
-3. Should feel like an alchemical formula or cosmic spell
-4. Examples: "COVALENT STARDUST", "TRANSMUTE BOND", "NEBULA CATALYST"
-5. Return ONLY the bond name, nothing else
-
-Generate the bond name now:
-"""
-        
         try:
-            response = self.client.models.generate_content(
-                model=self.available_model,
-                contents=prompt
+            name = self.provider.complete(
+                self.available_model,
+                build_bond_name_prompt(),
+                max_tokens=plan_max_tokens(TASK_BOND_NAME),
+                category="bond_name"
             )
-            
-            if hasattr(response, 'text'):
-                return response.text.strip().upper()
-            elif hasattr(response, 'candidates') and response.candidates:
-                return response.candidates[0].content.parts[0].text.strip().upper()
-            else:
-                return "COSMIC BOND"
+            return name.strip().upper() if name else "COSMIC BOND"
         
         except Exception as e:
             print(f"⚠ Bond name generation failed: {e}")
             return "STELLAR UNION"
 
 
-def build_muse_prompt(base_prompt):
-    """
-    Legacy function for backward compatibility.
-    Incorporates Muse context into a base prompt.
-    
-    Args:
-        base_prompt: The base prompt to enhance with Muse context
-    
-    Returns:
-        Enhanced prompt with Muse details prepended
-    """
-    muse = get_muse_context()
-    muse_desc = (
-        f"Muse Name: {muse['name']}\n"
-        f"Birth Date: {muse['birth_date']}\n"
-        f"Profession: {muse['profession']}\n"
-        f"Traits: {muse['traits']}\n"
-        f"Astro Chart:\n{muse['astro_chart']}\n"
-    )
-    return f"{muse_desc}\n{base_prompt}"
-
-
 def generate_alint(name, profession, traits, astro_full_chart, category="general", prompt=None):
     """
     Standalone function to generate an alint with explicit parameters.
@@ -224,34 +161,10 @@ def generate_alint(name, profession, traits, astro_full_chart, category="general
     Returns:
         Generated JSON string containing the alint
     """
-    # Get API key from config
-    api_keys = get_api_keys()
-    api_key = api_keys['gemini_api_key']
-    
-    # Create client with new SDK
-    client = genai.Client(api_key=api_key)
-    
-    # Build the identity prompt with injected data
-    identity_prompt = get_identity_prompt(
-        name=name,
-        profession=profession,
-        traits=traits,
-        astro_full_chart=astro_full_chart
-    )
-    
-    # Append category-specific instructions
-    category_instructions = {
-        "silly": "\n\nTone: Playful, whimsical, lighthearted. Include a fun chemistry pun or cosmic joke.",
-        "deep": "\n\nTone: Profound, introspective, emotionally resonant. Explore the depths of connection.",
-        "astro": "\n\nTone: Mystical, celestial, prophetic. Focus heavily on current astrological transits and their meaning.",
-        "general": ""
-    }
+    # Shared pooled client instead of a new genai.Client per call
+    provider = get_provider("gemini")
     
-    full_prompt = identity_prompt + category_instructions.get(category, "")
-    
-    # Optionally append extra user prompt
-    if prompt:
-        full_prompt = f"{full_prompt}\n\nAdditional Context:\n{prompt}"
+    full_prompt = build_alint_prompt(name, profession, traits, astro_full_chart, category, prompt)
     
     # Try models in order of preference (stable 2026 models)
     preferred_models = [
@@ -262,24 +175,13 @@ def generate_alint(name, profession, traits, astro_full_chart, category="general
         "gemini-pro-latest",
     ]
     
-    for model_name in preferred_models:
-        try:
-            response = client.models.generate_content(
-                model=model_name,
-                contents=full_prompt
-            )
-            
-            # Extract text from response
-            if hasattr(response, 'text'):
-                return response.text
-            elif hasattr(response, 'candidates') and response.candidates:
-                return response.candidates[0].content.parts[0].text
-            else:
-                return str(response)
-        
-        except Exception as e:
-            print(f"⚠ Model {model_name} failed: {e}. Trying next...")
-            continue
-    
-    # If all models fail
-    raise RuntimeError("All Gemini models failed to generate content.")
+    try:
+        return provider.complete_first(
+            preferred_models,
+            full_prompt,
+            max_tokens=plan_max_tokens(TASK_REFLECTION),
+            category=category
+        )
+    except RuntimeError:
+        # If all models fail
+        raise RuntimeError("All Gemini models failed to generate content.")
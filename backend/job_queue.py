@@ -0,0 +1,257 @@
+"""
+job_queue.py
+
+Background Job Queue for ARACY's post-response persistence.
+Vault saves, daily-set writes and INFO log writes are handed to a bounded
+in-process queue and run by a single worker after the response is sent, so
+request latency only includes the work the client actually needs.
+
+Jobs are journaled to job_journal.jsonl when submitted and marked done when
+they succeed: jobs still pending at a crash (or dropped because the queue was
+full) are replayed at the next start. Journal lines are written by a
+dedicated thread, which truncates the file whenever no job is pending and
+rewrites it once it is mostly done lines, so it stays small while the server
+runs. Failed jobs are retried with jittered backoff, and the queue is drained
+on shutdown.
+"""
+
+import asyncio
+import json
+import os
+import queue
+import threading
+import uuid
+
+from config import JOB_QUEUE_SIZE, JOB_MAX_RETRIES, JOB_DRAIN_TIMEOUT_S, JOB_JOURNAL_COMPACT_LINES, data_path
+from logger import log_error
+from provider_router import backoff_delay
+from tracing import current_span, resume
+
+JOB_JOURNAL_PATH = data_path("job_journal.jsonl")  # mock runs never replay into the real vault
+
+
+class JobQueue:
+    """
+    Bounded, journaled queue of named jobs run by one background worker.
+
+    Handlers are registered by name and receive the job payload as keyword
+    arguments; payloads must be JSON-serializable so they can be journaled.
+
+    Args:
+        path: Journal file (JSON lines)
+        maxsize: Maximum queued jobs
+        max_retries: Retries per job before it is dropped
+    """
+
+    def __init__(self, path=JOB_JOURNAL_PATH, maxsize=JOB_QUEUE_SIZE, max_retries=JOB_MAX_RETRIES):
+        self.path = path
+        self.maxsize = maxsize
+        self.max_retries = max_retries
+        self.handlers = {}
+        self.queue = None
+        self._journal_queue = queue.SimpleQueue()  # records and flush events for the writer
+        self._journal_lock = threading.Lock()  # guards starting the writer thread
+        self._writer = None
+        self._task = None
+        self.submitted = 0
+        self.completed = 0
+        self.retried = 0
+        self.failed = 0
+        self.overflowed = 0
+
+    def register(self, kind, handler):
+        """Register a (blocking) handler for a job kind; it runs in a worker thread."""
+        self.handlers[kind] = handler
+
+    def _journal(self, record):
+        """Hand a journal record to the writer thread (never blocks the event loop)."""
+        with self._journal_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_journal, name="job-journal", daemon=True)
+                self._writer.start()
+        self._journal_queue.put(record)
+
+    def _write_journal(self):
+        """
+        Writer thread: append queued records in batches, truncate the journal
+        when nothing is pending, and rewrite it with only the pending jobs
+        once it holds JOB_JOURNAL_COMPACT_LINES lines that are mostly done.
+        """
+        pending = {record["id"]: record for record in self._pending_from_journal()}
+        self._compact(pending.values())
+        lines = len(pending)
+        while True:
+            batch = [self._journal_queue.get()]
+            while True:
+                try:
+                    batch.append(self._journal_queue.get_nowait())
+                except queue.Empty:
+                    break
+            records = [item for item in batch if isinstance(item, dict)]
+            try:
+                if records:
+                    with open(self.path, "a", encoding="utf-8") as f:
+                        f.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records))
+                    lines += len(records)
+                    for record in records:
+                        if record.get("done"):
+                            pending.pop(record["id"], None)
+                        else:
+                            pending[record["id"]] = record
+                if lines and not pending:
+                    self._compact([])
+                    lines = 0
+                elif lines >= JOB_JOURNAL_COMPACT_LINES and lines > 2 * len(pending):
+                    self._compact(pending.values())
+                    lines = len(pending)
+            except Exception as e:
+                log_error(f"Failed to journal job: {e}", level="WARNING")
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()
+
+    def flush_journal(self, timeout=JOB_DRAIN_TIMEOUT_S):
+        """Block until every journal record queued so far is written."""
+        if self._writer is None:
+            return
+        written = threading.Event()
+        self._journal_queue.put(written)
+        written.wait(timeout)
+
+    def _pending_from_journal(self):
+        """Jobs submitted but never marked done, in submission order."""
+        pending = {}
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue  # torn final line after a crash
+                        if record.get("done"):
+                            pending.pop(record["id"], None)
+                        else:
+                            pending[record["id"]] = record
+        except Exception as e:
+            log_error(f"Failed to read job journal: {e}", level="WARNING")
+        return list(pending.values())
+
+    def _compact(self, pending):
+        """Atomically rewrite the journal with only the still-pending jobs (writer thread)."""
+        try:
+            with open(f"{self.path}.tmp", "w", encoding="utf-8") as f:
+                f.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in pending))
+            os.replace(f"{self.path}.tmp", self.path)
+        except Exception as e:
+            log_error(f"Failed to compact job journal: {e}", level="WARNING")
+
+    def submit(self, kind, trace=None, **payload):
+        """
+        Journal and enqueue a job (call from the event loop; never blocks).
+
+        Args:
+            kind: Registered job kind
+            trace: Span context to continue when the job runs (defaults to
+                the current span; None outside a sampled trace)
+            **payload: Handler keyword arguments
+
+        Returns:
+            True if queued, False if the queue is full or not running (the job
+            stays journaled and is replayed at the next start)
+        """
+        record = {"id": uuid.uuid4().hex, "kind": kind, "payload": payload}
+        trace = trace or current_span().context()
+        if trace:
+            record["trace"] = trace
+        self._journal(record)
+        self.submitted += 1
+        if self.queue is None:
+            self.overflowed += 1
+            return False
+        try:
+            self.queue.put_nowait(record)
+            return True
+        except asyncio.QueueFull:
+            self.overflowed += 1
+            log_error(f"Job queue full; '{kind}' deferred to the next start", level="WARNING")
+            return False
+
+    async def _run_job(self, record):
+        handler = self.handlers.get(record["kind"])
+        if handler is None:
+            log_error(f"No handler for job kind '{record['kind']}'", level="WARNING")
+            return
+        with resume(record.get("trace"), f"job.{record['kind']}") as s:
+            for attempt in range(self.max_retries + 1):
+                s.set(**{"job.attempts": attempt + 1})
+                try:
+                    await asyncio.to_thread(handler, **record["payload"])
+                    self.completed += 1
+                    self._journal({"id": record["id"], "done": True})
+                    return
+                except Exception as e:
+                    if attempt == self.max_retries:
+                        self.failed += 1
+                        self._journal({"id": record["id"], "done": True, "failed": str(e)[:200]})
+                        log_error(f"Job '{record['kind']}' failed after {attempt + 1} attempts: {e}")
+                        s.fail(e)
+                        return
+                    self.retried += 1
+                    await asyncio.sleep(backoff_delay(attempt))
+
+    async def run(self):
+        """Worker loop: run queued jobs one at a time."""
+        while True:
+            record = await self.queue.get()
+            try:
+                await self._run_job(record)
+            except Exception as e:
+                log_error(f"Job worker error: {e}", level="WARNING")
+            finally:
+                self.queue.task_done()
+
+    def start(self):
+        """Create the queue, replay journaled jobs and start the worker."""
+        if self._task is not None:
+            return
+        self.queue = asyncio.Queue(maxsize=self.maxsize)
+        pending = self._pending_from_journal()
+        for record in pending[:self.maxsize]:
+            self.queue.put_nowait(record)
+        if pending:
+            print(f"✧ Job queue: replaying {min(len(pending), self.maxsize)} journaled jobs")
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Drain queued jobs (up to JOB_DRAIN_TIMEOUT_S), then stop the worker."""
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout=JOB_DRAIN_TIMEOUT_S)
+        except asyncio.TimeoutError:
+            log_error(f"Job queue drain timed out with {self.queue.qsize()} jobs left (kept in journal)", level="WARNING")
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self.queue = None
+        await asyncio.to_thread(self.flush_journal)
+
+    def snapshot(self):
+        """Serializable view of queue depth and job counters."""
+        return {
+            "queued": self.queue.qsize() if self.queue is not None else 0,
+            "capacity": self.maxsize,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "retried": self.retried,
+            "failed": self.failed,
+            "overflowed": self.overflowed,
+        }
+
+
+# Shared queue used by main
+jobs = JobQueue()
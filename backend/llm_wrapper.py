@@ -8,88 +8,133 @@ GAMP5 COMPLIANCE: This module receives data through function parameters only.
 No hardcoded personal data. All context is injected at runtime from config.py.
 
 Updated for 2026: Uses Groq SDK with dynamic "Model Hunter" for bulletproof model selection.
+Sits on the unified provider layer (providers.py), which owns the pooled,
+long-lived Groq and Gemini clients and the shared prompt construction.
 """
 
-from groq import Groq
-from config import get_muse_context, get_api_keys
-from logic_protocols.mirror_config import get_identity_prompt
-import os
-from datetime import datetime
+from config import (
+    LLM_PROVIDER,
+    LLM_HEDGE_ENABLED,
+    LLM_HEDGE_PERCENTILE,
+    LLM_HEDGE_MIN_DELAY_S,
+    LLM_HEDGE_DEFAULT_DELAY_S,
+)
+# get_best_model and build_muse_prompt are re-exported for backward compatibility
+from providers import (
+    get_provider,
+    is_configured,
+    get_best_model,
+    build_alint_prompt,
+    build_muse_alint_prompt,
+    build_bond_name_prompt,
+    build_bond_names_prompt,
+    build_muse_prompt,
+    JSON_SYSTEM_PROMPT,
+    LINES_SYSTEM_PROMPT,
+    BOND_NAME_SYSTEM_PROMPT,
+    BOND_NAMES_SYSTEM_PROMPT,
+    GEMINI_FALLBACK_MODELS,
+)
+from provider_router import router, percentile
+from token_budget import TASK_REFLECTION, TASK_LAB_LIST, TASK_BOND_NAME, plan_max_tokens
+from tracing import span
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED, TimeoutError as FutureTimeout
+import contextvars
+import json
+import threading
 
+# Worker threads for hedged requests (primary and secondary calls)
+_hedge_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="llm-hedge")
 
-def get_best_model(client):
+
+class HedgeStats:
+    """
+    Counters describing how often hedging fires and which side wins.
+    Used to tune LLM_HEDGE_PERCENTILE and LLM_HEDGE_MIN_DELAY_S.
     """
-    The Model Hunter: Dynamically discovers the best available Groq model.
     
-    Priority Logic:
-    1. The Muse: Newest Mixtral model
-    2. The Scholar: Newest Llama-3 model (8b or 70b)
-    3. The Survivor: Most recent model with JSON mode support
+    def __init__(self):
+        self.requests = 0
+        self.hedged = 0
+        self.primary_wins = 0
+        self.hedge_wins = 0
+        self.failures = 0
+        self.last_delay_s = None
+        self._lock = threading.Lock()
     
-    Args:
-        client: Initialized Groq client
+    def record_request(self, delay_s):
+        with self._lock:
+            self.requests += 1
+            self.last_delay_s = delay_s
     
-    Returns:
-        str: Model ID to use
+    def record_hedge(self):
+        with self._lock:
+            self.hedged += 1
+    
+    def record_win(self, role):
+        """Record the winner of a hedged request ("primary", "hedge" or None)."""
+        with self._lock:
+            if role == "primary":
+                self.primary_wins += 1
+            elif role == "hedge":
+                self.hedge_wins += 1
+            else:
+                self.failures += 1
+    
+    def snapshot(self):
+        with self._lock:
+            return {
+                "enabled": LLM_HEDGE_ENABLED,
+                "percentile": LLM_HEDGE_PERCENTILE,
+                "requests": self.requests,
+                "hedged": self.hedged,
+                "hedge_rate": round(self.hedged / self.requests, 3) if self.requests else None,
+                "primary_wins": self.primary_wins,
+                "hedge_wins": self.hedge_wins,
+                "hedge_win_rate": round(self.hedge_wins / self.hedged, 3) if self.hedged else None,
+                "failures": self.failures,
+                "last_delay_ms": round(self.last_delay_s * 1000, 1) if self.last_delay_s is not None else None,
+            }
+
+
+hedge_stats = HedgeStats()
+
+
+def hedge_delay(provider, model):
     """
-    try:
-        # Fetch all available models
-        models = client.models.list()
-        
-        if not models or not hasattr(models, 'data'):
-            raise ValueError("No models returned from Groq API")
-        
-        model_list = models.data
-        
-        # Priority 1: Find newest Mixtral model
-        mixtral_models = [m for m in model_list if 'mixtral' in m.id.lower()]
-        if mixtral_models:
-            # Sort by created timestamp (newest first)
-            mixtral_models.sort(key=lambda x: x.created if hasattr(x, 'created') else 0, reverse=True)
-            selected = mixtral_models[0].id
-            print(f"✧ Model Hunter: Found Mixtral (The Muse) → {selected}")
-            return selected
-        
-        # Priority 2: Find newest Llama-3 model (8b or 70b)
-        llama3_models = [m for m in model_list if 'llama-3' in m.id.lower() or 'llama3' in m.id.lower()]
-        if llama3_models:
-            # Prefer 70b over 8b, then sort by created timestamp
-            llama3_70b = [m for m in llama3_models if '70b' in m.id.lower()]
-            llama3_8b = [m for m in llama3_models if '8b' in m.id.lower()]
-            
-            if llama3_70b:
-                llama3_70b.sort(key=lambda x: x.created if hasattr(x, 'created') else 0, reverse=True)
-                selected = llama3_70b[0].id
-                print(f"✧ Model Hunter: Found Llama-3 70B (The Scholar) → {selected}")
-                return selected
-            elif llama3_8b:
-                llama3_8b.sort(key=lambda x: x.created if hasattr(x, 'created') else 0, reverse=True)
-                selected = llama3_8b[0].id
-                print(f"✧ Model Hunter: Found Llama-3 8B (The Scholar) → {selected}")
-                return selected
-        
-        # Priority 3: Most recent model with JSON mode support
-        # Filter models that likely support JSON mode (chat models)
-        chat_models = [m for m in model_list if 'chat' in m.id.lower() or 'instruct' in m.id.lower() or 'versatile' in m.id.lower()]
-        if chat_models:
-            chat_models.sort(key=lambda x: x.created if hasattr(x, 'created') else 0, reverse=True)
-            selected = chat_models[0].id
-            print(f"✧ Model Hunter: Found recent chat model (The Survivor) → {selected}")
-            return selected
-        
-        # Last resort: pick first available model
-        if model_list:
-            selected = model_list[0].id
-            print(f"✧ Model Hunter: Using first available model (Emergency) → {selected}")
-            return selected
-        
-        raise ValueError("No models available")
+    How long to wait for the primary call before firing a hedge.
     
-    except Exception as e:
-        # Hard fallback if discovery fails
-        fallback = "llama-3.3-70b-versatile"
-        print(f"⚠ Model Hunter failed: {e}. Using hard fallback → {fallback}")
-        return fallback
+    Uses the configured percentile of recent successful latencies for the
+    provider/model, falling back to LLM_HEDGE_DEFAULT_DELAY_S until enough
+    samples exist, and never going below LLM_HEDGE_MIN_DELAY_S.
+    """
+    latencies = router.health(provider, model).latencies()
+    if len(latencies) >= 5:
+        delay = percentile(latencies, LLM_HEDGE_PERCENTILE)
+    else:
+        delay = LLM_HEDGE_DEFAULT_DELAY_S
+    return max(LLM_HEDGE_MIN_DELAY_S, delay)
+
+
+def _valid_json(generate, full_prompt, category="general", max_tokens=None):
+    """Run a generator function and only accept its output if it is valid JSON."""
+    text = generate(full_prompt, category, max_tokens).strip()
+    if text.startswith("```"):
+        text = text.strip("`").strip()
+        if text.lower().startswith("json"):
+            text = text[4:].strip()
+    json.loads(text)
+    return text
+
+
+def _gemini_configured():
+    """Return True if a Gemini key is available for failover or hedging (always in mock mode)."""
+    return LLM_PROVIDER == "mock" or is_configured("gemini")
+
+
+def _primary_provider_name():
+    """The primary provider: Groq, or the offline mock when LLM_PROVIDER=mock."""
+    return "mock" if LLM_PROVIDER == "mock" else "groq"
 
 
 class LLMWrapper:
@@ -98,95 +143,183 @@ class LLMWrapper:
     Provides fast, reliable inference with guaranteed JSON output.
     """
     
-    def __init__(self, api_key=None, model=None):
+    def __init__(self, api_key=None, model=None, hedge=None):
         """
         Initialize the LLM wrapper with API key and optional model.
         
         Args:
-            api_key: Groq API key (if None, loads from config)
+            api_key: Groq API key (if None, loads from config; not needed with LLM_PROVIDER=mock)
             model: Model name (if None, uses Model Hunter)
+            hedge: Race slow Groq calls against Gemini (if None, uses LLM_HEDGE_ENABLED)
         """
-        # Load API key from config if not provided
-        if api_key is None:
-            try:
-                api_keys = get_api_keys()
-                api_key = api_keys.get('groq_api_key') or os.getenv('GROQ_API_KEY')
-            except:
-                api_key = os.getenv('GROQ_API_KEY')
+        self.hedge = LLM_HEDGE_ENABLED if hedge is None else hedge
         
-        if not api_key:
-            raise ValueError("GROQ_API_KEY not found in config or environment variables")
-        
-        self.api_key = api_key
-        self.client = Groq(api_key=api_key)
+        # Shared, pooled Groq adapter (raises ValueError without a key),
+        # or the offline mock provider
+        self.provider = get_provider(_primary_provider_name(), api_key)
+        self.api_key = self.provider.api_key
+        self.client = self.provider.client
         
         # Use Model Hunter if no model specified
         if model is None:
-            self.model = get_best_model(self.client)
+            self.model = self.provider.default_model()
         else:
             self.model = model
-            print(f"✧ Groq Model Selected (Manual): {model}")
+            print(f"✧ {self.provider.name.capitalize()} Model Selected (Manual): {model}")
+    
+    def _build_full_prompt(self, prompt=None, category="general", task=TASK_REFLECTION):
+        """
+        Build the Mirror Lab prompt with Muse context and category tone.
+        
+        Args:
+            prompt: Optional additional user prompt to append
+            category: Type of alint (general, silly, deep, astro)
+            task: Token budget task, selects the prompt variant
+        
+        Returns:
+            Fully populated prompt string
+        """
+        return build_muse_alint_prompt(category=category, prompt=prompt, task=task)
     
-    def generate_alint(self, prompt=None, category="general"):
+    def generate_alint(self, prompt=None, category="general", task=TASK_REFLECTION, count=1):
         """
         Generate an 'alint' (affectionate intelligence) using the Mirror Lab engine.
         
         Args:
             prompt: Optional additional user prompt to append
             category: Type of alint (general, silly, deep, astro)
+            task: Token budget task (reflection, lab_list, quiz, bond_name)
+            count: Number of items requested, sizes max_tokens
         
         Returns:
             Generated JSON string containing the alint
         """
-        # Get Muse context from config
-        muse = get_muse_context()
+        full_prompt = self._build_full_prompt(prompt, category, task)
+        max_tokens = plan_max_tokens(task, count)
+        
+        with span("llm.generate", **{"llm.task": task, "llm.count": count, "llm.max_tokens": max_tokens}) as s:
+            if self.hedge and _gemini_configured():
+                s.set(**{"llm.hedged": True})
+                return self._generate_hedged(full_prompt, category, max_tokens)
+            
+            # Generate content using Groq (unless its breaker is open)
+            try:
+                return self._generate_groq(full_prompt, category, max_tokens)
+            except Exception as e:
+                groq_error = e
+            
+            # Failover: Gemini models that are not known to be down
+            s.set(**{"llm.failover": True, "llm.primary_error": str(groq_error)[:200]})
+            try:
+                return _generate_with_gemini(full_prompt, category, max_tokens)
+            except Exception as gemini_error:
+                raise RuntimeError(f"Groq generation failed: {groq_error}. Gemini failover: {gemini_error}")
+    
+    def _generate_groq(self, full_prompt, category="general", max_tokens=None):
+        """
+        Run one JSON-mode Groq completion for a fully built prompt.
+        Token usage and latency are recorded in the usage meter.
         
-        # Build the identity prompt with injected data
-        identity_prompt = get_identity_prompt(
-            name=muse['name'],
-            profession=muse['profession'],
-            traits=muse['traits'],
-            astro_full_chart=muse['astro_chart']
+        Raises:
+            RuntimeError: If the Groq breaker is open for this model
+        """
+        return self.provider.complete(
+            self.model,
+            full_prompt,
+            system=JSON_SYSTEM_PROMPT,
+            json_mode=True,
+            temperature=0.8,
+            max_tokens=max_tokens or plan_max_tokens(TASK_REFLECTION),
+            category=category
         )
+    
+    def _generate_hedged(self, full_prompt, category="general", max_tokens=None):
+        """
+        Hedged generation: race Groq against the Gemini chain.
         
-        # Append category-specific instructions
-        category_instructions = {
-            "silly": "\n\nTone: Playful, whimsical, lighthearted. Include a fun chemistry pun or cosmic joke.",
-            "deep": "\n\nTone: Profound, introspective, emotionally resonant. Explore the depths of connection.",
-            "astro": "\n\nTone: Mystical, celestial, prophetic. Focus heavily on current astrological transits and their meaning.",
-            "general": ""
-        }
+        The Groq call starts first. If it has not produced valid JSON within
+        the hedge delay (a percentile of recent Groq latencies, timed from when
+        the call actually starts, not from when it was queued), a JSON-mode
+        Gemini request is fired and the first valid JSON wins. The loser is
+        cancelled if it has not started; a running call cannot be interrupted,
+        so its result is simply discarded.
+        """
+        delay = hedge_delay(self.provider.name, self.model)
+        hedge_stats.record_request(delay)
+        started = threading.Event()
         
-        full_prompt = identity_prompt + category_instructions.get(category, "")
+        def run_primary():
+            started.set()
+            return _valid_json(self._generate_groq, full_prompt, category, max_tokens)
         
-        # Optionally append extra user prompt
-        if prompt:
-            full_prompt = f"{full_prompt}\n\nAdditional Context:\n{prompt}"
+        # Each worker runs in a copy of the caller's context (usage tags, etc.)
+        primary = _hedge_executor.submit(contextvars.copy_context().run, run_primary)
         
-        # Generate content using Groq
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are the Mirror Lab's Divine Muse Engine. You MUST respond with valid JSON only, no markdown, no code blocks, no explanations. Just pure JSON."
-                    },
-                    {
-                        "role": "user",
-                        "content": full_prompt
-                    }
-                ],
-                response_format={"type": "json_object"},
+            # Time spent waiting for a free worker does not count against the delay
+            started.wait()
+            return primary.result(timeout=delay)
+        except FutureTimeout:
+            pass
+        except Exception:
+            # Primary failed before the deadline: hedge immediately
+            pass
+        
+        hedge_stats.record_hedge()
+        secondary = _hedge_executor.submit(
+            contextvars.copy_context().run, _valid_json, _generate_with_gemini_json, full_prompt, category, max_tokens
+        )
+        pending = {primary: "primary", secondary: "hedge"}
+        errors = []
+        
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                role = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    errors.append(f"{role}: {e}")
+                    continue
+                
+                for loser in pending:
+                    loser.cancel()
+                hedge_stats.record_win(role)
+                return result
+        
+        hedge_stats.record_win(None)
+        raise RuntimeError(f"Hedged generation failed. {'; '.join(errors)}")
+    
+    def stream_alint(self, prompt=None, category="general", task=TASK_LAB_LIST, count=1):
+        """
+        Stream a Lab completion token by token.
+        
+        JSON mode cannot be streamed, so the model is asked for plain lines
+        ("Word - Meaning", one per line) which can be parsed as they arrive.
+        
+        Args:
+            prompt: Optional additional user prompt to append
+            category: Type of alint (general, silly, deep, astro)
+            task: Token budget task, selects the prompt variant
+            count: Number of lines requested, sizes max_tokens
+        
+        Yields:
+            Text deltas as they are produced by the model
+        """
+        full_prompt = self._build_full_prompt(prompt, category, task)
+        
+        try:
+            yield from self.provider.stream(
+                self.model,
+                full_prompt,
+                system=LINES_SYSTEM_PROMPT,
                 temperature=0.8,
-                max_tokens=2048
+                max_tokens=plan_max_tokens(task, count, fmt="lines"),
+                category=category
             )
-            
-            # Extract text from response
-            return response.choices[0].message.content
         
         except Exception as e:
-            raise RuntimeError(f"Groq generation failed: {e}")
+            raise RuntimeError(f"{self.provider.name.capitalize()} streaming failed: {e}")
     
     def generate_bond_name(self):
         """
@@ -195,70 +328,43 @@ class LLMWrapper:
         Returns:
             A unique, poetic bond name (e.g., "COVALENT STARDUST")
         """
-        muse = get_muse_context()
-        
-        prompt = f"""
-Generate a mystical, unique bond name for a cosmic connection.
-
-Context:
-- Muse: {muse['name']}, {muse['profession']}
-- Traits: {muse['traits']}
-- Astrological Signature: {muse['astro_chart']}
-
-Requirements:
-1. Combine MOLECULAR chemistry terms with CELESTIAL imagery
-2. Use 2-3 words maximum
-3. Should feel like an alchemical formula or cosmic spell
-4. Examples: "COVALENT STARDUST", "TRANSMUTE BOND", "NEBULA CATALYST"
-5. Return ONLY the bond name, nothing else
-
-Generate the bond name now:
-"""
-        
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You generate mystical bond names. Respond with ONLY the bond name, no explanations."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
+            name = self.provider.complete(
+                self.model,
+                build_bond_name_prompt(),
+                system=BOND_NAME_SYSTEM_PROMPT,
                 temperature=0.9,
-                max_tokens=50
+                max_tokens=plan_max_tokens(TASK_BOND_NAME),
+                category="bond_name"
             )
-            
-            return response.choices[0].message.content.strip().upper()
+            return name.strip().upper()
         
         except Exception as e:
             print(f"⚠ Bond name generation failed: {e}")
             return "STELLAR UNION"
 
-
-def build_muse_prompt(base_prompt):
-    """
-    Legacy function for backward compatibility.
-    Incorporates Muse context into a base prompt.
     
-    Args:
-        base_prompt: The base prompt to enhance with Muse context
-    
-    Returns:
-        Enhanced prompt with Muse details prepended
-    """
-    muse = get_muse_context()
-    muse_desc = (
-        f"Muse Name: {muse['name']}\n"
-        f"Birth Date: {muse['birth_date']}\n"
-        f"Profession: {muse['profession']}\n"
-        f"Traits: {muse['traits']}\n"
-        f"Astro Chart:\n{muse['astro_chart']}\n"
-    )
-    return f"{muse_desc}\n{base_prompt}"
+    def generate_bond_names(self, count, avoid=None):
+        """
+        Generate a batch of candidate bond names in one completion.
+        
+        Args:
+            count: Number of candidate names requested
+            avoid: Optional names that are already taken
+        
+        Returns:
+            Raw candidate names (uppercased, one per returned line); callers
+            validate and deduplicate them
+        """
+        text = self.provider.complete(
+            self.model,
+            build_bond_names_prompt(count, avoid),
+            system=BOND_NAMES_SYSTEM_PROMPT,
+            temperature=1.0,
+            max_tokens=plan_max_tokens(TASK_BOND_NAME, count, fmt="lines"),
+            category="bond_name"
+        )
+        return [line.strip().upper() for line in text.splitlines() if line.strip()]
 
 
 def generate_alint(name, profession, traits, astro_full_chart, category="general", prompt=None):
@@ -280,105 +386,92 @@ def generate_alint(name, profession, traits, astro_full_chart, category="general
     Returns:
         Generated JSON string containing the alint
     """
-    # Build the identity prompt with injected data
-    identity_prompt = get_identity_prompt(
-        name=name,
-        profession=profession,
-        traits=traits,
-        astro_full_chart=astro_full_chart
-    )
-    
-    # Append category-specific instructions
-    category_instructions = {
-        "silly": "\n\nTone: Playful, whimsical, lighthearted. Include a fun chemistry pun or cosmic joke.",
-        "deep": "\n\nTone: Profound, introspective, emotionally resonant. Explore the depths of connection.",
-        "astro": "\n\nTone: Mystical, celestial, prophetic. Focus heavily on current astrological transits and their meaning.",
-        "general": ""
-    }
-    
-    full_prompt = identity_prompt + category_instructions.get(category, "")
-    
-    # Optionally append extra user prompt
-    if prompt:
-        full_prompt = f"{full_prompt}\n\nAdditional Context:\n{prompt}"
+    full_prompt = build_alint_prompt(name, profession, traits, astro_full_chart, category, prompt)
     
-    # PRIMARY: Try Groq with Model Hunter
+    # PRIMARY: Try Groq with Model Hunter (skipped while Groq is known to be down)
+    groq_error = None
+    primary = _primary_provider_name()
     try:
-        api_keys = get_api_keys()
-        groq_api_key = api_keys.get('groq_api_key') or os.getenv('GROQ_API_KEY')
-        
-        if groq_api_key:
-            print("✧ Initializing Groq with Model Hunter...")
-            client = Groq(api_key=groq_api_key)
-            
-            # Use Model Hunter to find best available model
-            model_id = get_best_model(client)
+        if is_configured(primary):
+            if router.is_provider_down(primary):
+                raise RuntimeError(f"circuit open for every known {primary} model")
             
-            response = client.chat.completions.create(
-                model=model_id,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are the Mirror Lab's Divine Muse Engine. You MUST respond with valid JSON only, no markdown, no code blocks, no explanations. Just pure JSON."
-                    },
-                    {
-                        "role": "user",
-                        "content": full_prompt
-                    }
-                ],
-                response_format={"type": "json_object"},
+            # Shared pooled client; the Model Hunter runs once per process
+            groq = get_provider(primary)
+            return groq.complete(
+                groq.default_model(),
+                full_prompt,
+                system=JSON_SYSTEM_PROMPT,
+                json_mode=True,
                 temperature=0.8,
-                max_tokens=2048
+                max_tokens=plan_max_tokens(TASK_REFLECTION),
+                category=category
             )
-            
-            # Extract text from response
-            return response.choices[0].message.content
     
-    except Exception as groq_error:
+    except Exception as e:
+        groq_error = e
         print(f"⚠ Groq failed: {groq_error}. Attempting Gemini fallback...")
     
     # FALLBACK: Try Gemini if Groq fails
     try:
-        from google import genai
-        
-        api_keys = get_api_keys()
-        gemini_api_key = api_keys.get('gemini_api_key') or os.getenv('GEMINI_API_KEY')
-        
-        if not gemini_api_key:
-            raise ValueError("No API keys available (Groq or Gemini)")
-        
-        print("✧ Using Gemini (Fallback)")
-        client = genai.Client(api_key=gemini_api_key)
-        
-        # Try stable Gemini models
-        gemini_models = ["gemini-2.0-flash", "gemini-2.5-flash", "gemini-flash-latest"]
-        
-        for model_name in gemini_models:
-            try:
-                response = client.models.generate_content(
-                    model=model_name,
-                    contents=full_prompt
-                )
-                
-                # Extract text from response
-                if hasattr(response, 'text'):
-                    return response.text
-                elif hasattr(response, 'candidates') and response.candidates:
-                    return response.candidates[0].content.parts[0].text
-            
-            except Exception as model_error:
-                # Silently skip 429 quota errors and try next model
-                if "429" in str(model_error) or "RESOURCE_EXHAUSTED" in str(model_error):
-                    continue
-                print(f"⚠ Gemini model {model_name} failed: {model_error}")
-                continue
-        
-        # If all Gemini models fail
-        raise RuntimeError("All Gemini models exhausted or unavailable")
-    
+        return _generate_with_gemini(full_prompt, category)
     except Exception as gemini_error:
         raise RuntimeError(f"Both Groq and Gemini failed. Groq: {groq_error}, Gemini: {gemini_error}")
 
 
+def _generate_with_gemini(full_prompt, category="general", max_tokens=None):
+    """
+    Gemini fallback chain shared by LLMWrapper and generate_alint.
+    Models whose circuit breaker is open are skipped without a network call.
+    
+    Args:
+        full_prompt: Fully built Mirror Lab prompt
+        category: Type of alint, recorded with the token usage
+        max_tokens: Completion budget (defaults to the reflection budget)
+    
+    Returns:
+        Generated text from the first Gemini model that answers
+    """
+    if LLM_PROVIDER == "mock":
+        return get_provider("mock").complete_first(
+            ["mock-fallback"],
+            full_prompt,
+            max_tokens=max_tokens or plan_max_tokens(TASK_REFLECTION),
+            category=category
+        )
+    
+    if not is_configured("gemini"):
+        raise ValueError("No API keys available (Groq or Gemini)")
+    
+    print("✧ Using Gemini (Fallback)")
+    return get_provider("gemini").complete_first(
+        GEMINI_FALLBACK_MODELS,
+        full_prompt,
+        max_tokens=max_tokens or plan_max_tokens(TASK_REFLECTION),
+        category=category
+    )
+
+
+def _generate_with_gemini_json(full_prompt, category="general", max_tokens=None):
+    """
+    JSON-mode variant of the Gemini chain, used as the hedge in
+    LLMWrapper._generate_hedged (whose winner must be valid JSON).
+    """
+    max_tokens = max_tokens or plan_max_tokens(TASK_REFLECTION)
+    if LLM_PROVIDER == "mock":
+        return get_provider("mock").complete_first(
+            ["mock-fallback"], full_prompt, system=JSON_SYSTEM_PROMPT, json_mode=True,
+            max_tokens=max_tokens, category=category
+        )
+    
+    if not is_configured("gemini"):
+        raise ValueError("No Gemini API key available for hedging")
+    
+    return get_provider("gemini").complete_first(
+        GEMINI_FALLBACK_MODELS, full_prompt, system=JSON_SYSTEM_PROMPT, json_mode=True,
+        max_tokens=max_tokens, category=category
+    )
+
+
 # Backward compatibility alias
 GeminiWrapper = LLMWrapper
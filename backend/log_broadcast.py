@@ -0,0 +1,111 @@
+"""
+log_broadcast.py
+
+Live Log Tail for the Expert Log Viewer.
+The log writer thread publishes every batch it persists; the broadcaster fans
+each entry out to the subscribed SSE clients whose level filter matches. Each
+client has its own bounded buffer, so a slow client loses its oldest entries
+instead of holding memory or slowing the writer, and an idle console costs
+nothing (no polling, no file reads).
+"""
+
+import asyncio
+import threading
+
+from config import LOG_STREAM_BUFFER, LOG_STREAM_MAX_CLIENTS
+
+
+class LogSubscription:
+    """
+    One live-tail client: a bounded queue on the subscriber's event loop.
+
+    Args:
+        loop: Event loop the subscriber reads from
+        levels: Uppercase levels to receive (None = all)
+        buffer_size: Entries buffered before the oldest are dropped
+    """
+
+    def __init__(self, loop, levels=None, buffer_size=LOG_STREAM_BUFFER):
+        self.loop = loop
+        self.levels = levels
+        self.queue = asyncio.Queue(maxsize=buffer_size)
+        self.dropped = 0
+
+    def wants(self, entry):
+        return self.levels is None or entry.get("level", "ERROR").upper() in self.levels
+
+    def offer(self, entries):
+        """Buffer entries, dropping the oldest when full (runs on the subscriber's loop)."""
+        for entry in entries:
+            if self.queue.full():
+                self.queue.get_nowait()
+                self.dropped += 1
+            self.queue.put_nowait(entry)
+
+
+class LogBroadcaster:
+    """
+    Fan-out of newly written log entries to live-tail subscribers.
+
+    Args:
+        max_clients: Maximum concurrent subscribers
+        buffer_size: Per-subscriber buffer size
+    """
+
+    def __init__(self, max_clients=LOG_STREAM_MAX_CLIENTS, buffer_size=LOG_STREAM_BUFFER):
+        self.max_clients = max_clients
+        self.buffer_size = buffer_size
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self.published = 0
+        self.rejected = 0
+
+    def subscribe(self, levels=None):
+        """
+        Register a subscriber on the running event loop.
+
+        Returns:
+            LogSubscription, or None if max_clients are already connected
+        """
+        with self._lock:
+            if len(self._subscribers) >= self.max_clients:
+                self.rejected += 1
+                return None
+            subscription = LogSubscription(asyncio.get_running_loop(), levels, self.buffer_size)
+            self._subscribers.add(subscription)
+            return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, entries):
+        """Hand a written batch to every matching subscriber (thread-safe, O(1) when idle)."""
+        if not self._subscribers:
+            return
+        with self._lock:
+            subscribers = list(self._subscribers)
+        self.published += len(entries)
+        for subscription in subscribers:
+            matching = [entry for entry in entries if subscription.wants(entry)]
+            if not matching:
+                continue
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, matching)
+            except RuntimeError:
+                self.unsubscribe(subscription)  # subscriber's loop is closed
+
+    def snapshot(self):
+        """Serializable view of subscribers and counters."""
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "max_clients": self.max_clients,
+                "published": self.published,
+                "rejected": self.rejected,
+                "dropped": sum(s.dropped for s in self._subscribers),
+            }
+
+
+# Shared broadcaster fed by the log pipeline
+log_broadcaster = LogBroadcaster()
@@ -0,0 +1,233 @@
+"""
+log_retention.py
+
+Log Retention for the segmented error log.
+A background task compacts closed segments once they are LOG_COMPACT_AFTER_S
+old: DEBUG/INFO entries older than LOG_INFO_TTL_S are expired, and messages
+repeating the same template (e.g. "Alint '*' added to vault") at least
+LOG_AGGREGATE_MIN_COUNT times within a segment are collapsed into one counted
+aggregate with first_seen, last_seen and count. If the log still exceeds
+LOG_RETENTION_MAX_BYTES, the oldest closed segments are dropped.
+
+Aggregates keep the id of their first occurrence (and record last_id), so
+ids stay unique and monotonic and the ignore sidecar keeps applying: ignored
+and active entries are never merged together. Ids that disappear (merged,
+expired or dropped) are retired by the store and can no longer be ignored.
+The active segment is never touched.
+"""
+
+import asyncio
+import re
+import threading
+from datetime import datetime, timedelta
+
+from config import (
+    LOG_INFO_TTL_S,
+    LOG_COMPACT_AFTER_S,
+    LOG_COMPACT_INTERVAL_S,
+    LOG_AGGREGATE_MIN_COUNT,
+    LOG_RETENTION_MAX_BYTES,
+)
+from logger import log_store, log_error, LOW_PRIORITY_LEVELS
+
+_QUOTED = re.compile(r"'[^']*'|\"[^\"]*\"")
+_HEX = re.compile(r"\b[0-9a-fA-F]{8}-[0-9a-fA-F-]{27}\b|\b[0-9a-fA-F]{12,}\b")
+_NUMBER = re.compile(r"(?<![\w.])\d+(?:\.\d+)?")
+
+
+def message_template(message):
+    """
+    A message with its variable parts masked: quoted text and ids become *,
+    numbers become N ("Generated 7 alints instead of 11" ->
+    "Generated N alints instead of N").
+    """
+    template = _QUOTED.sub("'*'", message or "")
+    template = _HEX.sub("*", template)
+    return _NUMBER.sub("N", template)
+
+
+def _first_seen(entry):
+    return entry.get("first_seen") or entry.get("timestamp") or ""
+
+
+def _last_seen(entry):
+    return entry.get("last_seen") or entry.get("timestamp") or ""
+
+
+def compact_entries(entries, ignored_ids, info_cutoff, min_count=LOG_AGGREGATE_MIN_COUNT):
+    """
+    Expire and aggregate one segment's entries.
+
+    Args:
+        entries: Entries as stored, oldest first
+        ignored_ids: Ids in the ignore sidecar
+        info_cutoff: ISO timestamp; DEBUG/INFO last seen before it expire
+        min_count: Occurrences of a template before it is collapsed
+
+    Returns:
+        (compacted entries ordered by id, expired count, aggregated count)
+    """
+    expired = 0
+    groups = {}
+    for entry in entries:
+        level = entry.get("level", "ERROR").upper()
+        if level in LOW_PRIORITY_LEVELS and _last_seen(entry) < info_cutoff:
+            expired += entry.get("count", 1)
+            continue
+        key = (level, entry.get("template") or message_template(entry.get("message")), entry.get("id") in ignored_ids)
+        groups.setdefault(key, []).append(entry)
+
+    kept = []
+    aggregated = 0
+    for (level, template, _), members in groups.items():
+        occurrences = sum(member.get("count", 1) for member in members)
+        if len(members) == 1 or occurrences < min_count:
+            kept.extend(members)
+            continue
+        first = min(members, key=lambda member: member.get("id", 0))
+        first_seen = min(_first_seen(member) for member in members)
+        aggregate = dict(first)
+        aggregate.update({
+            "timestamp": first_seen,
+            "template": template,
+            "count": occurrences,
+            "first_seen": first_seen,
+            "last_seen": max(_last_seen(member) for member in members),
+            "last_id": max(member.get("last_id", member.get("id", 0)) for member in members),
+            "aggregate": True,
+        })
+        kept.append(aggregate)
+        aggregated += len(members) - 1
+    kept.sort(key=lambda entry: entry.get("id", 0))
+    return kept, expired, aggregated
+
+
+class LogCompactor:
+    """
+    Periodic retention pass over the closed log segments.
+
+    Args:
+        store: LogStore to compact
+        interval_s: Seconds between passes
+        max_bytes: Total log size above which the oldest segments are dropped
+    """
+
+    def __init__(self, store, interval_s=LOG_COMPACT_INTERVAL_S, max_bytes=LOG_RETENTION_MAX_BYTES):
+        self.store = store
+        self.interval_s = interval_s
+        self.max_bytes = max_bytes
+        self.last_run = None
+        self.totals = {"passes": 0, "segments_compacted": 0, "segments_dropped": 0,
+                       "expired": 0, "aggregated": 0, "bytes_reclaimed": 0}
+        self._task = None
+        self._lock = threading.Lock()  # one pass at a time (background loop or admin request)
+
+    def _due(self, segment, compact_before, info_cutoff):
+        if (segment.get("end") or "") >= compact_before:
+            return False
+        if not segment.get("compacted"):
+            return True
+        # Compacted before: revisit only once its oldest remaining INFO entry has expired
+        return bool(segment.get("info_oldest")) and segment["info_oldest"] < info_cutoff
+
+    def compact_once(self):
+        """
+        One retention pass (blocking; run it off the event loop).
+
+        Returns:
+            Counts for this pass
+        """
+        with self._lock:
+            return self._compact()
+
+    def _compact(self):
+        now = datetime.now()
+        compact_before = (now - timedelta(seconds=LOG_COMPACT_AFTER_S)).isoformat(timespec='seconds')
+        info_cutoff = (now - timedelta(seconds=LOG_INFO_TTL_S)).isoformat(timespec='seconds')
+        result = {"segments_compacted": 0, "segments_dropped": 0, "expired": 0, "aggregated": 0, "bytes_reclaimed": 0}
+
+        for segment in self.store.closed_segments():
+            if not self._due(segment, compact_before, info_cutoff):
+                continue
+            # Under the store lock, so an entry ignored mid-pass is never merged away
+            with self.store.exclusive():
+                ignored_ids = set(self.store.ignored_ids)
+                kept, expired, aggregated = compact_entries(self.store.read_segment(segment), ignored_ids, info_cutoff)
+                before = segment.get("bytes", 0)
+                if not kept:
+                    self.store.drop_segment(segment["file"])
+                    result["segments_dropped"] += 1
+                    result["bytes_reclaimed"] += before
+                else:
+                    info = [_last_seen(e) for e in kept if e.get("level", "ERROR").upper() in LOW_PRIORITY_LEVELS]
+                    after = self.store.replace_segment(
+                        segment["file"], kept,
+                        compacted=now.isoformat(timespec='seconds'),
+                        info_oldest=min(info) if info else None,
+                    )
+                    result["segments_compacted"] += 1
+                    result["bytes_reclaimed"] += max(0, before - after)
+            result["expired"] += expired
+            result["aggregated"] += aggregated
+
+        # Size bound: drop the oldest closed segments until the log fits
+        total = self.store.snapshot()["bytes"]
+        for segment in self.store.closed_segments():
+            if total <= self.max_bytes:
+                break
+            self.store.drop_segment(segment["file"])
+            total -= segment.get("bytes", 0)
+            result["segments_dropped"] += 1
+            result["bytes_reclaimed"] += segment.get("bytes", 0)
+
+        self.last_run = now.isoformat(timespec='seconds')
+        self.totals["passes"] += 1
+        for key, value in result.items():
+            self.totals[key] += value
+        if result["segments_compacted"] or result["segments_dropped"]:
+            log_error(
+                f"Log retention: compacted {result['segments_compacted']} and dropped {result['segments_dropped']} segments "
+                f"({result['expired']} expired, {result['aggregated']} aggregated, {result['bytes_reclaimed']} bytes reclaimed)",
+                level="INFO",
+            )
+        return result
+
+    async def run(self):
+        """Retention loop: one pass at startup, then every interval_s."""
+        while True:
+            try:
+                await asyncio.to_thread(self.compact_once)
+            except Exception as e:
+                log_error(f"Log retention pass failed: {e}", level="WARNING")
+            await asyncio.sleep(self.interval_s)
+
+    def start(self):
+        """Start the retention task on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Cancel the retention task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def snapshot(self):
+        """Serializable view of the retention settings and counters."""
+        return {
+            "info_ttl_s": LOG_INFO_TTL_S,
+            "compact_after_s": LOG_COMPACT_AFTER_S,
+            "interval_s": self.interval_s,
+            "aggregate_min_count": LOG_AGGREGATE_MIN_COUNT,
+            "max_bytes": self.max_bytes,
+            "last_run": self.last_run,
+            **self.totals,
+        }
+
+
+# Shared compactor for the shared log store
+log_compactor = LogCompactor(log_store)
@@ -2,61 +2,802 @@ import psutil
 import os
 import logging
 import json
+import threading
+import atexit
+import bisect
+from collections import deque
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional
+
+from config import (
+    LOG_SEGMENT_MAX_BYTES,
+    LOG_SEGMENT_MAX_AGE_S,
+    LOG_QUEUE_SIZE,
+    LOG_BATCH_SIZE,
+    LOG_SHUTDOWN_TIMEOUT_S,
+)
 
 logging.basicConfig(
     format="%(asctime)s | %(levelname)s | %(message)s", level=logging.INFO
 )
 
-ERROR_LOG_PATH = os.path.join(os.path.dirname(__file__), "error_log.json")
+ERROR_LOG_PATH = os.path.join(os.path.dirname(__file__), "error_log.json")  # legacy single-file log
+LOG_DIR = os.path.join(os.path.dirname(__file__), "logs")
+
+
+class LogStore:
+    """
+    Append-only JSONL log split into rotated segments.
+
+    Each entry is one line appended to the active segment, so a write costs
+    the same regardless of how large the log has grown. The active segment is
+    rotated when it exceeds LOG_SEGMENT_MAX_BYTES or LOG_SEGMENT_MAX_AGE_S, and
+    logs/index.json records every closed segment's time range, entry count and
+    size so readers can skip segments outside the range they need.
+
+    Every entry gets a monotonic integer id. Segments are never rewritten
+    after the fact: ignoring an entry appends its id to the logs/ignored.jsonl
+    sidecar (O(1)), and the ignored flag is overlaid from that set on read.
+    The only exception is log retention (log_retention.py), which replaces
+    or drops old closed segments; ids it removes are recorded as retired
+    ranges in index.json so they can no longer be ignored. Each rewrite bumps
+    the segment's rev; a cursor issued before it resumes by id (cursors carry
+    the id of the last entry they passed), so no entry is skipped.
+
+    The legacy error_log.json is imported once into the first segments (the
+    file itself is left untouched).
+
+    Args:
+        directory: Directory holding the segments and index.json
+        max_bytes: Rotate the active segment above this size
+        max_age_s: Rotate the active segment after this many seconds
+    """
+
+    def __init__(self, directory=LOG_DIR, max_bytes=LOG_SEGMENT_MAX_BYTES, max_age_s=LOG_SEGMENT_MAX_AGE_S):
+        self.directory = directory
+        self.index_path = os.path.join(directory, "index.json")
+        self.ignored_path = os.path.join(directory, "ignored.jsonl")
+        self.max_bytes = max_bytes
+        self.max_age_s = max_age_s
+        self.index = {"segments": [], "legacy_migrated": False}
+        self.active = None  # index record of the segment being appended to
+        self.next_id = 1
+        self.ignored_ids = set()
+        self._fh = None
+        self._lock = threading.RLock()
+        self._opened = False
+
+    # --- Index & segments ---
+
+    def _segment_path(self, segment):
+        return os.path.join(self.directory, segment["file"])
+
+    def _save_index(self):
+        """Atomically rewrite index.json (only on rotation and migration)."""
+        self.index["next_id"] = self.next_id
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.index, f, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    def _scan_segment(self, segment):
+        """Recompute a segment's stats from its file (used for the active segment at startup)."""
+        segment.update({"count": 0, "bytes": 0, "start": None, "end": None})
+        path = self._segment_path(segment)
+        if not os.path.exists(path):
+            return
+        segment["bytes"] = os.path.getsize(path)
+        for entry in self._read_segment(segment):
+            segment["count"] += 1
+            segment["start"] = segment["start"] or entry.get("timestamp")
+            segment["end"] = entry.get("timestamp")
+            if isinstance(entry.get("id"), int):
+                self.next_id = max(self.next_id, entry["id"] + 1)
+
+    def _overlay(self, entry):
+        """Apply the ignore sidecar to an entry read from a segment."""
+        if entry.get("id") in self.ignored_ids:
+            entry["ignored"] = True
+        return entry
+
+    def _read_segment(self, segment, overlay=True):
+        path = self._segment_path(segment)
+        if not os.path.exists(path):
+            return
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn final line after a crash
+                yield self._overlay(entry) if overlay else entry
+
+    def _load_ignored(self):
+        """Load ignored ids from the sidecar (lock held)."""
+        if not os.path.exists(self.ignored_path):
+            return
+        with open(self.ignored_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    self.ignored_ids.add(json.loads(line)["id"])
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    continue
+
+    def _assign_ids(self):
+        """One-time upgrade: number the entries of segments written before ids existed (lock held)."""
+        for segment in self.index["segments"]:
+            segment["first_id"] = self.next_id
+            path = self._segment_path(segment)
+            if not os.path.exists(path):
+                continue
+            lines = []
+            for entry in self._read_segment(segment):
+                entry = {"id": self.next_id, **{k: v for k, v in entry.items() if k != "id"}}
+                self.next_id += 1
+                lines.append(json.dumps(entry, ensure_ascii=False) + "\n")
+            payload = "".join(lines)
+            with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(f"{path}.tmp", path)
+            segment["bytes"] = len(payload.encode("utf-8"))
+        self._save_index()
+
+    def _open(self):
+        """Load the index, resume the active segment and migrate the legacy log (lock held)."""
+        if self._opened:
+            return
+        self._opened = True
+        os.makedirs(self.directory, exist_ok=True)
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                self.index = json.load(f)
+        segments = self.index.setdefault("segments", [])
+        if segments and "next_id" not in self.index:
+            self._assign_ids()
+        self.next_id = max(self.next_id, self.index.get("next_id", 1))
+        if segments:
+            self.active = segments[-1]
+            self._scan_segment(self.active)
+        self._load_ignored()
+        if not self.index.get("legacy_migrated"):
+            self._migrate_legacy()
+
+    def _migrate_legacy(self):
+        """Import entries from the legacy error_log.json into segments (lock held)."""
+        imported = 0
+        if os.path.exists(ERROR_LOG_PATH):
+            try:
+                with open(ERROR_LOG_PATH, "r", encoding="utf-8") as f:
+                    legacy = json.load(f)
+                for entry in legacy:
+                    self._append(entry, flush=False)
+                    imported += 1
+            except Exception as e:
+                logging.error(f"Failed to migrate legacy error log: {e}")
+        if self._fh is not None:
+            self._fh.flush()
+        self.index["legacy_migrated"] = True
+        self._save_index()
+        if imported:
+            logging.info(f"Migrated {imported} entries from error_log.json to {self.directory}")
+
+    def _rotate(self, timestamp):
+        """Close the active segment and start a new one (lock held)."""
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        number = int(self.active["file"].split(".")[1]) + 1 if self.active else 1
+        self.active = {
+            "file": f"error_log.{number:06d}.jsonl",
+            "start": timestamp,
+            "end": timestamp,
+            "count": 0,
+            "bytes": 0,
+            "first_id": self.next_id,
+        }
+        self.index["segments"].append(self.active)
+        self._save_index()
+
+    def _needs_rotation(self, timestamp, size):
+        if self.active is None:
+            return True
+        if self.active["count"] == 0:
+            return False
+        if self.active["bytes"] + size > self.max_bytes:
+            return True
+        try:
+            started = datetime.fromisoformat(self.active["start"])
+            return (datetime.fromisoformat(timestamp) - started).total_seconds() > self.max_age_s
+        except (TypeError, ValueError):
+            return False
+
+    def _append(self, entry, flush=True):
+        """Append one entry to the active segment, rotating first if needed (lock held)."""
+        entry = {"id": self.next_id, **{k: v for k, v in entry.items() if k != "id"}}
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        size = len(line.encode("utf-8"))
+        timestamp = entry.get("timestamp") or datetime.now().isoformat(timespec='seconds')
+        if self._needs_rotation(timestamp, size):
+            self._rotate(timestamp)  # the new segment's first_id is this entry's id
+        self.next_id += 1
+        if self._fh is None:
+            self._fh = open(self._segment_path(self.active), "a", encoding="utf-8")
+        self._fh.write(line)
+        if flush:
+            self._fh.flush()
+        self.active["count"] += 1
+        self.active["bytes"] += size
+        self.active["start"] = self.active["start"] or timestamp
+        self.active["end"] = timestamp
+        return entry
+
+    # --- Public API ---
+
+    def append(self, entry):
+        """Append one log entry (constant cost: one line written to the active segment)."""
+        self.append_many([entry])
+
+    def append_many(self, entries):
+        """
+        Append a batch of entries with a single flush.
+
+        Returns:
+            The entries as written (with their ids), each with the cursor
+            just past it (not stored), so live-tail clients can resume from
+            the last entry they received
+        """
+        with self._lock:
+            self._open()
+            written = []
+            for entry in entries:
+                entry = self._append(entry, flush=False)
+                entry["cursor"] = self._cursor(self.active, self.active["bytes"], entry["id"])
+                written.append(entry)
+            if self._fh is not None:
+                self._fh.flush()
+            return written
+
+    def segments(self, since=None, until=None):
+        """Index records of segments that may hold entries in [since, until] (ISO timestamps)."""
+        with self._lock:
+            self._open()
+            selected = []
+            for segment in self.index["segments"]:
+                if since and segment.get("end") and segment["end"] < since:
+                    continue
+                if until and segment.get("start") and segment["start"] > until:
+                    continue
+                selected.append(dict(segment))
+            return selected
+
+    def entries(self, since=None, until=None):
+        """All entries, oldest first, from the segments overlapping [since, until]."""
+        with self._lock:
+            if self._fh is not None:
+                self._fh.flush()
+            segments = self.segments(since, until)
+        logs = []
+        for segment in segments:
+            logs.extend(self._read_segment(segment))
+        return logs
+
+    def ignore(self, entry_id):
+        """
+        Mark one entry as ignored by appending its id to the sidecar (O(1)).
+
+        Returns:
+            True if the id belongs to a logged entry still kept by retention
+        """
+        with self._lock:
+            self._open()
+            if not isinstance(entry_id, int) or not 1 <= entry_id < self.next_id:
+                return False
+            if self._retired(entry_id):
+                return False
+            if entry_id not in self.ignored_ids:
+                with open(self.ignored_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"id": entry_id, "at": datetime.now().isoformat(timespec='seconds')}) + "\n")
+                self.ignored_ids.add(entry_id)
+            return True
+
+    # --- Retention ---
+
+    def _retired(self, entry_id):
+        """True if retention merged, expired or dropped this entry (lock held)."""
+        segments = self.index["segments"]
+        if segments and entry_id < segments[0].get("first_id", 1):
+            return True  # older than the oldest kept segment
+        ranges = self.index.get("retired", [])
+        i = bisect.bisect_right(ranges, [entry_id, float("inf")]) - 1
+        return i >= 0 and ranges[i][0] <= entry_id <= ranges[i][1]
+
+    def _retire(self, ranges):
+        """Add [first, last] id ranges to the index's merged retired ranges (lock held)."""
+        ranges = self.index.get("retired", []) + [list(r) for r in ranges]
+        oldest = self.index["segments"][0].get("first_id", 1) if self.index["segments"] else 1
+        merged = []
+        for first, last in sorted(ranges):
+            if last < oldest:
+                continue  # covered by the oldest segment's first_id
+            if merged and first <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], last)
+            else:
+                merged.append([first, last])
+        self.index["retired"] = merged
+
+    @contextmanager
+    def exclusive(self):
+        """
+        Hold the store lock for a read-compact-replace of one closed segment,
+        so no entry can be ignored between reading it and replacing it.
+        Appends wait meanwhile (the log writer thread, never the event loop).
+        """
+        with self._lock:
+            self._open()
+            yield self
+
+    def closed_segments(self):
+        """Index records of every segment except the active one (never written again)."""
+        with self._lock:
+            self._open()
+            return [dict(s) for s in self.index["segments"] if s is not self.active]
+
+    def read_segment(self, segment):
+        """Entries of a segment as stored (without the ignore overlay)."""
+        return list(self._read_segment(segment, overlay=False))
+
+    def replace_segment(self, file, entries, **stats):
+        """
+        Rewrite a closed segment with compacted entries (atomic replace) and
+        update its index record. Entries keep their ids, so the ignore sidecar
+        still applies; ids no longer present are retired.
+
+        Args:
+            file: Segment file name
+            entries: Replacement entries, oldest first
+            **stats: Extra fields stored on the index record
+
+        Returns:
+            New size in bytes
+
+        Raises:
+            ValueError: If the segment is unknown or active
+        """
+        payload = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries)
+        with self._lock:
+            self._open()
+            segment = next((s for s in self.index["segments"] if s["file"] == file), None)
+            if segment is None or segment is self.active:
+                raise ValueError(f"{file} is not a closed segment")
+            path = self._segment_path(segment)
+            kept = {entry.get("id") for entry in entries}
+            removed = [e["id"] for e in self._read_segment(segment, overlay=False)
+                       if isinstance(e.get("id"), int) and e["id"] not in kept]
+            with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(f"{path}.tmp", path)
+            self._retire([i, i] for i in removed)
+            timestamps = [entry.get("timestamp") for entry in entries if entry.get("timestamp")]
+            segment.update(stats)
+            segment.update({
+                "rev": self._rev(segment) + 1,
+                "count": len(entries),
+                "bytes": len(payload.encode("utf-8")),
+                "start": min(timestamps) if timestamps else segment.get("start"),
+                "end": max((entry.get("last_seen") or entry.get("timestamp") or "" for entry in entries), default="") or segment.get("end"),
+            })
+            self._save_index()
+            return segment["bytes"]
+
+    def drop_segment(self, file):
+        """
+        Delete a closed segment and its index record, retiring its ids.
+
+        Raises:
+            ValueError: If the segment is unknown or active
+        """
+        with self._lock:
+            self._open()
+            segment = next((s for s in self.index["segments"] if s["file"] == file), None)
+            if segment is None or segment is self.active:
+                raise ValueError(f"{file} is not a closed segment")
+            position = self.index["segments"].index(segment)
+            following = self.index["segments"][position + 1]  # exists: the active segment is never dropped
+            self.index["segments"].remove(segment)
+            if position > 0 and "first_id" in segment and "first_id" in following:
+                self._retire([[segment["first_id"], following["first_id"] - 1]])
+            else:
+                self._retire([])  # the oldest segment's first_id now covers it
+            self._save_index()
+            path = self._segment_path(segment)
+            if os.path.exists(path):
+                os.remove(path)
+
+    # --- Query ---
+
+    @staticmethod
+    def _number(segment):
+        return int(segment["file"].split(".")[1])
+
+    @staticmethod
+    def _rev(segment):
+        """How often retention rewrote a segment (records from before revs count compaction once)."""
+        return segment.get("rev", 1 if segment.get("compacted") else 0)
+
+    def _cursor(self, segment, offset, last_id):
+        return f"{self._number(segment)}:{offset}:{self._rev(segment)}:{last_id}"
+
+    @staticmethod
+    def parse_cursor(cursor):
+        """
+        Split a cursor ("<segment>:<byte offset>:<rev>:<last id>", or the
+        older "<segment>:<byte offset>") into its parts.
+
+        Returns:
+            (segment number, byte offset, segment rev, last id or None)
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        parts = cursor.split(":")
+        if len(parts) == 2:
+            parts += ["0", "-1"]
+        number, offset, rev, last_id = (int(part) for part in parts)
+        if number < 0 or offset < 0 or rev < 0:
+            raise ValueError("negative cursor")
+        return number, offset, rev, last_id if last_id >= 0 else None
+
+    def _read_from(self, segment, offset):
+        """Yield (entry, end offset) for each complete line from a byte offset."""
+        path = self._segment_path(segment)
+        if not os.path.exists(path):
+            return
+        with open(path, "rb") as f:
+            f.seek(offset)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    return  # line still being written
+                offset += len(raw)
+                try:
+                    yield self._overlay(json.loads(raw)), offset
+                except json.JSONDecodeError:
+                    continue
+
+    def query(self, match=None, since=None, until=None, after=None, limit=200):
+        """
+        Filtered, cursor-paginated read.
+
+        Without a cursor, returns the newest `limit` matching entries (scanning
+        segments newest first). With a cursor, returns up to `limit` matching
+        entries written after it, reading only from the cursor's position on,
+        so a poll costs time proportional to what was appended since.
+
+        Args:
+            match: Predicate (entry) -> bool applied after the time range
+            since, until: ISO timestamp bounds (inclusive); also prune segments
+            after: Cursor returned by a previous query
+            limit: Maximum entries returned
+
+        Returns:
+            (entries oldest first, next cursor, has_more)
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        def wanted(entry):
+            timestamp = entry.get("timestamp") or ""
+            if since and timestamp < since:
+                return False
+            if until and timestamp > until:
+                return False
+            return match is None or match(entry)
+
+        with self._lock:
+            if self._fh is not None:
+                self._fh.flush()
+            segments = self.segments(since, until)
+            all_segments = self.segments()
+            last_written = self.next_id - 1
+            end_cursor = (
+                self._cursor(self.active, self.active["bytes"], last_written) if self.active else "0:0"
+            )
+
+        if after is None:
+            found = []
+            for segment in reversed(segments):
+                found[:0] = [entry for entry, _ in self._read_from(segment, 0) if wanted(entry)]
+                if len(found) > limit:
+                    break
+            return found[-limit:] if limit else [], end_cursor, len(found) > limit
+
+        number, offset, rev, seen_id = self.parse_cursor(after)
+        in_range = {s["file"] for s in segments}
+        found = []
+        cursor = after
+        for position, segment in enumerate(all_segments):
+            current = self._number(segment)
+            if current < number:
+                continue
+            # Rewritten by retention since the cursor was issued: the offset no
+            # longer lines up, so reread the segment and skip what was passed
+            by_id = current == number and self._rev(segment) != rev
+            start = offset if current == number and not by_id else 0
+            if segment["file"] not in in_range:
+                # Outside the time range: skip the whole segment
+                following = all_segments[position + 1] if position + 1 < len(all_segments) else None
+                last_id = following["first_id"] - 1 if following and "first_id" in following else last_written
+                cursor = self._cursor(segment, segment.get("bytes", 0), last_id)
+                continue
+            for entry, end in self._read_from(segment, start):
+                entry_id = entry.get("id", 0)
+                # Aggregates that absorbed entries after the cursor are returned again
+                if by_id and seen_id is not None and max(entry_id, entry.get("last_id", 0)) <= seen_id:
+                    cursor = self._cursor(segment, end, seen_id)  # passed before the rewrite
+                    continue
+                if len(found) >= limit:
+                    return found, cursor, True
+                cursor = self._cursor(segment, end, entry_id)
+                if wanted(entry):
+                    found.append(entry)
+        return found, cursor, False
+
+    def close(self):
+        """Flush and close the active segment."""
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+    def snapshot(self):
+        """Serializable view of the segment index."""
+        with self._lock:
+            self._open()
+            segments = self.index["segments"]
+            return {
+                "segments": len(segments),
+                "entries": sum(s.get("count", 0) for s in segments),
+                "bytes": sum(s.get("bytes", 0) for s in segments),
+                "active": self.active["file"] if self.active else None,
+                "next_id": self.next_id,
+                "ignored": len(self.ignored_ids),
+            }
+
+
+# Levels dropped first when the log queue is full
+LOW_PRIORITY_LEVELS = {"DEBUG", "INFO"}
+
+
+class LogPipeline:
+    """
+    Non-blocking log pipeline: producers enqueue, one writer thread persists.
+
+    log_error only appends the entry to an in-memory queue (O(1), no disk
+    I/O), so logging from async handlers never stalls the event loop. A
+    daemon writer thread drains the queue in batches of up to LOG_BATCH_SIZE
+    into the LogStore.
+
+    Backpressure: when LOG_QUEUE_SIZE entries are waiting, new DEBUG/INFO
+    entries are dropped; a WARNING or higher entry evicts the oldest queued
+    DEBUG/INFO entry instead, and is only dropped when the queue holds
+    nothing but higher-priority entries. A batch the store fails to write is
+    counted as failed and never reaches the listeners. close() drains the queue (up to
+    LOG_SHUTDOWN_TIMEOUT_S) and is also registered with atexit.
+
+    Args:
+        store: LogStore the writer appends to
+        maxsize: Maximum queued entries
+        batch_size: Maximum entries written per batch
+    """
+
+    def __init__(self, store, maxsize=LOG_QUEUE_SIZE, batch_size=LOG_BATCH_SIZE):
+        self.store = store
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        # Two queues so a low-priority entry can be evicted in O(1); entries
+        # carry a sequence number and the writer merges them back in order.
+        self._high = deque()
+        self._low = deque()
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._thread = None
+        self._writing = False
+        self._closed = False
+        self.enqueued = 0
+        self.written = 0
+        self.failed = 0  # entries lost because the store write raised
+        self.dropped = {}
+        self.batches = 0
+        self._listeners = []
+        atexit.register(self.close)
+
+    def add_listener(self, listener):
+        """Call listener(entries) from the writer thread after each batch is written."""
+        self._listeners.append(listener)
+
+    def _drop(self, level):
+        self.dropped[level] = self.dropped.get(level, 0) + 1
+
+    def submit(self, entry):
+        """Queue an entry for writing (never blocks on disk I/O)."""
+        level = entry.get("level", "ERROR")
+        with self._cond:
+            if self._closed:
+                self.store.append(entry)  # after shutdown: write through
+                return
+            if len(self._high) + len(self._low) >= self.maxsize:
+                if level in LOW_PRIORITY_LEVELS:
+                    self._drop(level)
+                    return
+                if not self._low:
+                    self._drop(level)
+                    return
+                self._drop(self._low.popleft()[1].get("level", "INFO"))
+            self._seq += 1
+            (self._low if level in LOW_PRIORITY_LEVELS else self._high).append((self._seq, entry))
+            self.enqueued += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def _take_batch(self):
+        """Pop up to batch_size entries in submission order (lock held)."""
+        batch = []
+        while len(batch) < self.batch_size and (self._high or self._low):
+            if not self._low or (self._high and self._high[0][0] < self._low[0][0]):
+                batch.append(self._high.popleft()[1])
+            else:
+                batch.append(self._low.popleft()[1])
+        return batch
+
+    def _run(self):
+        """Writer thread: persist queued entries in batches until closed."""
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._high or self._low or self._closed)
+                batch = self._take_batch()
+                if not batch and self._closed:
+                    return
+                self._writing = True
+            try:
+                batch = self.store.append_many(batch)
+            except Exception as e:
+                logging.error(f"Failed to write {len(batch)} log entries: {e}")
+                with self._cond:
+                    self._writing = False
+                    self.failed += len(batch)
+                    self._cond.notify_all()
+                continue
+            for listener in self._listeners:
+                try:
+                    listener(batch)
+                except Exception as e:
+                    logging.error(f"Log listener failed: {e}")
+            with self._cond:
+                self._writing = False
+                self.written += len(batch)
+                self.batches += 1
+                self._cond.notify_all()
+
+    def flush(self, timeout=LOG_SHUTDOWN_TIMEOUT_S):
+        """
+        Wait until every queued entry has been written.
+
+        Returns:
+            True if the queue drained within the timeout
+        """
+        with self._cond:
+            if self._thread is None:
+                return True
+            return self._cond.wait_for(
+                lambda: not self._high and not self._low and not self._writing, timeout
+            )
+
+    def close(self, timeout=LOG_SHUTDOWN_TIMEOUT_S):
+        """Drain the queue, stop the writer thread and close the active segment."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+            if thread.is_alive():
+                logging.error(f"Log writer did not drain within {timeout}s")
+        self.store.close()
+
+    def snapshot(self):
+        """Serializable view of queue depth and counters."""
+        with self._cond:
+            return {
+                "queued": len(self._high) + len(self._low),
+                "capacity": self.maxsize,
+                "enqueued": self.enqueued,
+                "written": self.written,
+                "failed": self.failed,
+                "batches": self.batches,
+                "dropped": dict(self.dropped),
+            }
+
+
+# Shared log store and pipeline used by log_error and the log API
+log_store = LogStore()
+log_pipeline = LogPipeline(log_store)
+
 
 def log_error(message: str, level: str = "ERROR"):
-    """Logs an error event to error_log.json with ignore status"""
+    """Queues a log event (with ignore status) for the background log writer"""
     entry = {
         "timestamp": datetime.now().isoformat(timespec='seconds'),
         "level": level,
         "message": message,
         "ignored": False,
     }
-    # Append entry to JSON file
     try:
-        if os.path.exists(ERROR_LOG_PATH):
-            with open(ERROR_LOG_PATH, "r", encoding="utf-8") as f:
-                logs = json.load(f)
-        else:
-            logs = []
-        logs.append(entry)
-        with open(ERROR_LOG_PATH, "w", encoding="utf-8") as f:
-            json.dump(logs, f, indent=2)
+        log_pipeline.submit(entry)
     except Exception as e:
         logging.error(f"Failed to log error: {e}")
 
 def get_errors() -> List[Dict]:
     """Retrieve all errors/logs"""
     try:
-        if os.path.exists(ERROR_LOG_PATH):
-            with open(ERROR_LOG_PATH, "r", encoding="utf-8") as f:
-                return json.load(f)
-        else:
-            return []
+        log_pipeline.flush()
+        return log_store.entries()
     except Exception as e:
         logging.error(f"Failed to load errors: {e}")
         return []
 
+def query_errors(
+    levels: Optional[List[str]] = None,
+    ignored: Optional[bool] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    text: Optional[str] = None,
+    after: Optional[str] = None,
+    limit: int = 200,
+) -> Dict:
+    """
+    Filtered, cursor-paginated log read for the Expert Log Viewer.
+
+    Returns:
+        {"errors": [...], "cursor": str, "has_more": bool}; pass the cursor
+        back as `after` to receive only entries logged since
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    wanted_levels = {level.upper() for level in levels} if levels else None
+    needle = text.lower() if text else None
+
+    def match(entry):
+        if wanted_levels and entry.get("level", "ERROR").upper() not in wanted_levels:
+            return False
+        if ignored is not None and bool(entry.get("ignored")) != ignored:
+            return False
+        return needle is None or needle in entry.get("message", "").lower()
+
+    log_pipeline.flush()
+    errors, cursor, has_more = log_store.query(match, since, until, after, limit)
+    return {"errors": errors, "cursor": cursor, "has_more": has_more}
+
+def ignore_log(entry_id: int) -> bool:
+    """Set ignored=True for exactly one log entry, by id."""
+    try:
+        return log_store.ignore(entry_id)
+    except Exception as e:
+        logging.error(f"Failed to ignore log {entry_id}: {e}")
+        return False
+
 def ignore_error(timestamp: str) -> bool:
-    """Set ignored=True for the log entry with the matching timestamp."""
+    """Set ignored=True for every log entry with the matching timestamp (legacy form)."""
     try:
-        logs = get_errors()
-        updated = False
-        for entry in logs:
-            if entry.get("timestamp") == timestamp:
-                entry["ignored"] = True
-                updated = True
-        if updated:
-            with open(ERROR_LOG_PATH, "w", encoding="utf-8") as f:
-                json.dump(logs, f, indent=2)
-        return updated
+        log_pipeline.flush()
+        ids = [e["id"] for e in log_store.entries(timestamp, timestamp) if e.get("timestamp") == timestamp]
+        for entry_id in ids:
+            log_store.ignore(entry_id)
+        return bool(ids)
     except Exception as e:
         logging.error(f"Failed to ignore error: {e}")
         return False
@@ -64,3 +64,33 @@ def get_identity_prompt(name: str, profession: str, traits: str, astro_full_char
         traits=traits,
         astro_full_chart=astro_full_chart
     )
+
+
+# COMPACT_IDENTITY_TEMPLATE used for short, list-shaped tasks (Lab alint lists,
+# quizzes) where the caller defines the output format and the full chart and
+# JSON reflection schema of CORE_IDENTITY_TEMPLATE would only add prompt tokens.
+
+COMPACT_IDENTITY_TEMPLATE = """
+You are the Mirror Lab's Divine Muse Engine, writing for {name}—{profession}.
+Blend MOLECULAR chemistry metaphors, CELESTIAL imagery ({astro_summary}) and a pastel-goth AESTHETIC.
+Never use generic pet terms (sweetie, babe, honey, etc). Follow the requested output format exactly.
+"""
+
+
+def get_compact_identity_prompt(name: str, profession: str, astro_summary: str) -> str:
+    """
+    Injects runtime data into the COMPACT_IDENTITY_TEMPLATE.
+    
+    Args:
+        name: The Muse's name
+        profession: The Muse's professional identity
+        astro_summary: One-line summary of the key placements
+    
+    Returns:
+        Populated compact prompt string
+    """
+    return COMPACT_IDENTITY_TEMPLATE.format(
+        name=name,
+        profession=profession,
+        astro_summary=astro_summary
+    )
@@ -1,16 +1,38 @@
-from fastapi import FastAPI, Depends, HTTPException, Request, Header
+from fastapi import FastAPI, Depends, HTTPException, Request, Header, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
+from starlette.concurrency import iterate_in_threadpool
 from pydantic import BaseModel
-from llm_wrapper import LLMWrapper
+from llm_wrapper import LLMWrapper, hedge_stats
+from provider_router import router, backoff_delay
+from singleflight import flights, lab_request_key, normalize_lab_request
+from alint_pool import AlintPool
+from bond_names import BondNameReservoir
+from quiz_cache import QuizCache, validate_quiz, today
+from job_queue import jobs
+from log_broadcast import log_broadcaster
+from log_retention import log_compactor
+from resource_sampler import resources, InFlightMiddleware
+import metrics
+from metrics import MetricsMiddleware, bond_store_write_latency, vault_alints
+from tracing import span, traced, current_span, exporter
+from profiler import profiler, ProfileRequestsMiddleware
+from alint_parser import AlintParser, parse_alints, is_quality_alint, parser_stats
+from usage_meter import meter, usage_tags
+from token_budget import TASK_LAB_LIST, TASK_QUIZ
 import os
-import re
+import asyncio
 import random
 import json
 import datetime
+import functools
+import threading
+import secrets
+from collections import Counter
 from typing import List, Dict, Optional
-from config import get_muse_context
-from logger import log_error, get_errors, ignore_error, get_memory_usage_mb
+from config import get_muse_context, ALINT_POOL_ENABLED, ALINT_POOL_LANGUAGES, QUIZ_PRECOMPUTE_ENABLED, LAB_DEADLINE_S, LOG_STREAM_HEARTBEAT_S, ADMIN_TOKEN, PROFILE_MAX_SECONDS, PROFILE_MAX_REQUESTS
+from config import LLM_PROVIDER, MOCK_DATA_DIR, data_path
+from logger import log_error, query_errors, ignore_error, ignore_log, log_store, log_pipeline
 
 app = FastAPI(title="ARACY Backend")
 
@@ -23,28 +45,67 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Count requests in progress for the resource sampler
+app.add_middleware(InFlightMiddleware, sampler=resources)
+
+# Per-route request counts, status codes and latency for /metrics
+app.add_middleware(MetricsMiddleware)
+
+# Hands requests to the profiler while it is armed (one attribute check otherwise)
+app.add_middleware(ProfileRequestsMiddleware, profiler=profiler)
+
 # Initialize LLM wrapper (uses Groq with Model Hunter)
 llm = LLMWrapper()
 
-# Load alints vault
-ALINTS_VAULT_PATH = os.path.join(os.path.dirname(__file__), "alints_vault.json")
-BOND_STORE_PATH = os.path.join(os.path.dirname(__file__), "bond_store.json")
+# Load alints vault (scratch copies in mock mode, see config.data_path)
+ALINTS_VAULT_PATH = data_path("alints_vault.json")
+BOND_STORE_PATH = data_path("bond_store.json")
+if LLM_PROVIDER == "mock":
+    print(f"✧ Mock provider: vault and bond store writes go to {MOCK_DATA_DIR}")
+
+# Vault and bond store writes come from request handlers and from the job
+# queue's worker thread: read-modify-write cycles hold these locks, and files
+# are replaced atomically so readers never see a partially written file
+vault_lock = threading.RLock()
+bond_store_lock = threading.RLock()
+
+def write_json_atomic(path, data):
+    """Write JSON to a temporary file, then atomically replace path with it."""
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
 
-def load_alints_vault():
-    """Load the alints vault from JSON file."""
+def load_alints_vault(strict=False):
+    """
+    Load the alints vault from JSON file.
+
+    Args:
+        strict: Raise on a read or parse error instead of returning an empty
+            vault (writers must never replace the vault with an empty one)
+    """
     try:
         if os.path.exists(ALINTS_VAULT_PATH):
             with open(ALINTS_VAULT_PATH, "r", encoding="utf-8") as f:
-                return json.load(f)
+                vault = json.load(f)
+            vault_alints.set(len(vault.get("alints", [])))
+            return vault
         else:
             log_error(f"Alints vault not found at {ALINTS_VAULT_PATH}")
             return {"alints": []}
     except Exception as e:
+        if strict:
+            raise
         log_error(f"Error loading alints vault: {str(e)}")
         return {"alints": []}
 
-def load_bond_store():
-    """Load the bond store from JSON file."""
+def load_bond_store(strict=False):
+    """
+    Load the bond store from JSON file.
+
+    Args:
+        strict: Raise on a read or parse error instead of returning an empty store
+    """
     try:
         if os.path.exists(BOND_STORE_PATH):
             with open(BOND_STORE_PATH, "r", encoding="utf-8") as f:
@@ -52,30 +113,38 @@ def load_bond_store():
         else:
             return {"bonds": {}}
     except Exception as e:
+        if strict:
+            raise
         log_error(f"Error loading bond store: {str(e)}")
         return {"bonds": {}}
 
 def save_bond_store(store):
     """Save the bond store to JSON file."""
     try:
-        with open(BOND_STORE_PATH, "w", encoding="utf-8") as f:
-            json.dump(store, f, indent=2, ensure_ascii=False)
+        with bond_store_write_latency.time():
+            write_json_atomic(BOND_STORE_PATH, store)
         return True
     except Exception as e:
         log_error(f"Error saving bond store: {str(e)}")
         return False
 
-def save_alint_to_vault(alint, crystallized=False):
+def add_alint_to_vault(alint, crystallized=False):
     """
-    Save a new alint to the vault.
-    
+    Add a new alint to the vault (or mark an existing one crystallized).
+
     Args:
         alint: The alint to save
         crystallized: Whether this alint was manually selected by the user
+
+    Returns:
+        True if the vault changed, False if the alint was already there
+
+    Raises:
+        OSError: If the vault cannot be read or written (jobs retry on it)
     """
-    try:
-        vault = load_alints_vault()
-        
+    with vault_lock:
+        vault = load_alints_vault(strict=True)
+
         # Check if alint already exists in vault
         existing_words = [a["word"].lower() for a in vault["alints"]]
         if alint["word"].lower() not in existing_words:
@@ -83,12 +152,11 @@ def save_alint_to_vault(alint, crystallized=False):
             if crystallized:
                 alint["crystallized"] = True
                 alint["crystallized_date"] = datetime.datetime.now().isoformat()
-            
+
             vault["alints"].append(alint)
-            
-            with open(ALINTS_VAULT_PATH, "w", encoding="utf-8") as f:
-                json.dump(vault, f, indent=2, ensure_ascii=False)
-            
+
+            write_json_atomic(ALINTS_VAULT_PATH, vault)
+
             log_error(f"Alint '{alint['word']}' added to vault" + (" (crystallized)" if crystallized else ""), level="INFO")
             return True
         elif crystallized:
@@ -97,13 +165,23 @@ def save_alint_to_vault(alint, crystallized=False):
                 if existing_alint["word"].lower() == alint["word"].lower():
                     existing_alint["crystallized"] = True
                     existing_alint["crystallized_date"] = datetime.datetime.now().isoformat()
-                    
-                    with open(ALINTS_VAULT_PATH, "w", encoding="utf-8") as f:
-                        json.dump(vault, f, indent=2, ensure_ascii=False)
-                    
+
+                    write_json_atomic(ALINTS_VAULT_PATH, vault)
+
                     log_error(f"Existing alint '{alint['word']}' marked as crystallized", level="INFO")
                     return True
         return False
+
+def save_alint_to_vault(alint, crystallized=False):
+    """
+    Save a new alint to the vault, logging instead of raising on failure.
+    
+    Args:
+        alint: The alint to save
+        crystallized: Whether this alint was manually selected by the user
+    """
+    try:
+        return add_alint_to_vault(alint, crystallized)
     except Exception as e:
         log_error(f"Error saving alint to vault: {str(e)}")
         return False
@@ -125,7 +203,8 @@ async def generate_alint(prompt: str = Body("", embed=True)):
     Returns a strict JSON object as per Mirror Lab codex.
     """
     try:
-        result = llm.generate_alint(prompt)
+        with usage_tags(endpoint="/generate-alint"):
+            result = llm.generate_alint(prompt)
         # Try to parse result as JSON if it's a string
         import json
         try:
@@ -141,24 +220,97 @@ async def generate_alint(prompt: str = Body("", embed=True)):
 from fastapi import Query
 
 @app.get("/api/logs/errors")
-async def get_error_logs():
-    """Retrieve all errors (for expert review/UI)."""
+async def get_error_logs(
+    level: Optional[str] = Query(None, description="Comma-separated levels, e.g. ERROR,WARNING"),
+    ignored: Optional[bool] = Query(None, description="Only ignored (true) or active (false) entries"),
+    since: Optional[str] = Query(None, description="ISO timestamp lower bound (inclusive)"),
+    until: Optional[str] = Query(None, description="ISO timestamp upper bound (inclusive)"),
+    q: Optional[str] = Query(None, description="Case-insensitive message substring"),
+    after: Optional[str] = Query(None, description="Cursor from a previous response"),
+    limit: int = Query(200, ge=1, le=1000),
+):
+    """
+    Query logs for expert review/UI.
+    Without `after`, returns the newest `limit` matching entries; with the
+    returned cursor as `after`, returns only entries logged since.
+    """
+    levels = [l.strip() for l in level.split(",") if l.strip()] if level else None
     try:
-        return {"errors": get_errors()}
+        return await asyncio.to_thread(query_errors, levels, ignored, since, until, q, after, limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
     except Exception as e:
         log_error(f"Failed to retrieve logs: {e}", level="CRITICAL")
         raise HTTPException(status_code=500, detail="Failed to retrieve error logs.")
 
 @app.post("/api/logs/ignore")
-async def ignore_log_entry(timestamp: str = Query(..., description="Timestamp of log to ignore")):
-    """Mark a specific log entry as ignored by timestamp."""
+async def ignore_log_entry(
+    id: Optional[int] = Query(None, description="Id of the log entry to ignore"),
+    timestamp: Optional[str] = Query(None, description="Timestamp of log to ignore (legacy: ignores every entry at that second)")
+):
+    """Mark a specific log entry as ignored by id (or, for older clients, by timestamp)."""
+    if id is not None:
+        if not await asyncio.to_thread(ignore_log, id):
+            raise HTTPException(status_code=404, detail="Log entry not found or could not update.")
+        return {"status": "ignored", "id": id}
     if not timestamp:
-        raise HTTPException(status_code=400, detail="Timestamp parameter required.")
-    success = ignore_error(timestamp)
+        raise HTTPException(status_code=400, detail="Id or timestamp parameter required.")
+    success = await asyncio.to_thread(ignore_error, timestamp)
     if not success:
         raise HTTPException(status_code=404, detail="Log entry not found or could not update.")
     return {"status": "ignored", "timestamp": timestamp}
 
+# Live tail: the log writer publishes each written batch to SSE subscribers
+log_pipeline.add_listener(log_broadcaster.publish)
+
+@app.get("/api/logs/stream")
+async def stream_logs(
+    request: Request,
+    level: Optional[str] = Query(None, description="Comma-separated levels, e.g. ERROR,WARNING")
+):
+    """
+    Live log tail (Server-Sent Events).
+    Emits each new log entry as it is written (event id = log entry id),
+    filtered server-side by level, with a comment heartbeat while idle.
+    """
+    levels = {l.strip().upper() for l in level.split(",") if l.strip()} if level else None
+    subscription = log_broadcaster.subscribe(levels)
+    if subscription is None:
+        raise HTTPException(status_code=503, detail="Too many live log subscribers.")
+
+    async def log_event_stream():
+        try:
+            yield ": connected\n\n"
+            while not await request.is_disconnected():
+                try:
+                    entry = await asyncio.wait_for(subscription.queue.get(), timeout=LOG_STREAM_HEARTBEAT_S)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                yield f"id: {entry.get('id', '')}\ndata: {json.dumps(entry, ensure_ascii=False)}\n\n"
+        finally:
+            log_broadcaster.unsubscribe(subscription)
+
+    return StreamingResponse(log_event_stream(), media_type="text/event-stream")
+
+@app.get("/api/logs/segments")
+async def get_log_segments():
+    """Returns the log segment index summary, log queue, live tail and retention counters."""
+    return {
+        **log_store.snapshot(),
+        "pipeline": log_pipeline.snapshot(),
+        "stream": log_broadcaster.snapshot(),
+        "retention": log_compactor.snapshot(),
+    }
+
+@app.on_event("startup")
+async def start_log_retention():
+    log_compactor.start()
+
+@app.on_event("shutdown")
+async def stop_log_retention():
+    await log_compactor.stop()
+
 # ------------------- Bond Linking -------------------
 
 class BondLinkRequest(BaseModel):
@@ -168,6 +320,41 @@ class BondLinkRequest(BaseModel):
 class BondLinkResponse(BaseModel):
     status: str
     bond_id: str = None
+    bond_name: Optional[str] = None
+
+def generate_bond_name_batch(count: int, avoid: List[str]) -> List[str]:
+    """Generate a batch of candidate bond names for the reservoir."""
+    with usage_tags(endpoint="bond_names"):
+        return llm.generate_bond_names(count, avoid)
+
+# Persistent reservoir of unique, pre-generated bond names
+bond_names = BondNameReservoir(
+    generate_bond_name_batch,
+    assigned={bond_id: bond.get("name") for bond_id, bond in load_bond_store()["bonds"].items()}
+)
+
+@app.on_event("startup")
+async def start_bond_names():
+    bond_names.start()
+
+@app.on_event("shutdown")
+async def stop_bond_names():
+    await bond_names.stop()
+
+def name_bond(bond_id: str) -> str:
+    """
+    Give a bond its unique name from the reservoir (stored in the bond store).
+    Writes the reservoir and bond store files, so handlers run it in a thread.
+    """
+    name = bond_names.take(bond_id)
+    with bond_store_lock:
+        store = load_bond_store()
+        bond = store["bonds"].setdefault(bond_id, {"crystallized": [], "reflected": []})
+        if bond.get("name") != name:
+            bond["name"] = name
+            save_bond_store(store)
+    return name
+
 @app.get("/api/context")
 async def get_context():
     """
@@ -184,54 +371,101 @@ async def get_context():
 async def link_bond(req: BondLinkRequest):
     # TODO: Implement actual DB logic (find bond by code, associate user)
     # This is a placeholder stub for portfolio code
+    # Names come from the pre-generated reservoir, never from a live LLM call
     if req.bond_code == "DEMO123":
         # Simulate bond found and linked
-        return BondLinkResponse(status="linked", bond_id="demo-bond-id")
+        return BondLinkResponse(status="linked", bond_id="demo-bond-id", bond_name=await asyncio.to_thread(name_bond, "demo-bond-id"))
     if req.bond_code == "ALINTATA":
-        return BondLinkResponse(status="linked", bond_id="alintata-bond-id")
+        return BondLinkResponse(status="linked", bond_id="alintata-bond-id", bond_name=await asyncio.to_thread(name_bond, "alintata-bond-id"))
     # New logic: Allow any bond code for testing
     if req.bond_code:
-         return BondLinkResponse(status="linked", bond_id=req.bond_code)
+         return BondLinkResponse(status="linked", bond_id=req.bond_code, bond_name=await asyncio.to_thread(name_bond, req.bond_code))
     raise HTTPException(status_code=404, detail="Bond code not found")
 
+@app.get("/api/bond/names")
+async def get_bond_name_reservoir():
+    """Returns bond name reservoir levels and counters."""
+    return bond_names.snapshot()
+
 # ------------------- Resource Footprint -------------------
 @app.get("/api/resource-footprint")
-async def get_resource_footprint():
+async def get_resource_footprint(history: int = Query(60, ge=0, le=720, description="Past samples to include")):
     """
-    Returns current system/memory resource stats for The Resource Footprint plaque.
-    Includes memory usage and estimated token count for AI operations.
+    Returns system/memory resource stats for The Resource Footprint plaque.
+    Process metrics come from the background sampler (latest sample plus a
+    short history); token usage and cost rates come from the usage meter.
     """
     try:
-        import platform
-        import psutil
-        from logger import estimate_token_count
-
-        mem_mb = get_memory_usage_mb()
-        cpu_percent = psutil.cpu_percent(interval=0.2)
-        sys = platform.system()
-        pyver = platform.python_version()
+        latest = resources.latest()
         
-        # Estimate tokens from recent operations (placeholder - can be enhanced)
-        # In production, track actual token usage from Gemini API responses
-        estimated_tokens = 0
-        try:
-            errors = get_errors()
-            # Rough estimate: count tokens in error messages
-            for error in errors[-10:]:  # Last 10 errors
-                estimated_tokens += estimate_token_count(error.get('message', ''))
-        except:
-            pass
+        # Real token accounting captured from Groq/Gemini responses
+        usage = meter.snapshot()
         
         return {
-            "memory_mb": mem_mb,
-            "cpu_percent": cpu_percent,
-            "estimated_tokens": estimated_tokens,
-            "system": sys,
-            "python_version": pyver
+            "memory_mb": latest["rss_mb"],
+            "cpu_percent": latest["cpu_percent"],
+            "total_tokens": usage["totals"]["total_tokens"],
+            "tokens_per_sec": usage["rates"]["tokens_per_sec"],
+            "cost_per_hour_usd": usage["rates"]["cost_per_hour_usd"],
+            "usage": usage,
+            "system": resources.system,
+            "python_version": resources.python_version,
+            "sample": latest,
+            "history": resources.history(history),
+            "sample_interval_s": resources.interval_s
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to query resource stats: {e}")
 
+# Scrape-time gauges read from the existing snapshots
+metrics.Gauge("aracy_http_requests_in_flight", "HTTP requests in progress.", fn=lambda: resources.in_flight)
+metrics.Gauge("aracy_process_resident_memory_bytes", "Resident memory (latest sample).",
+              fn=lambda: resources.latest()["rss_mb"] * 1024 * 1024)
+metrics.Gauge("aracy_process_cpu_percent", "Process CPU percent (latest sample).", fn=lambda: resources.latest()["cpu_percent"])
+metrics.Gauge("aracy_event_loop_lag_seconds", "Event-loop lag (latest sample).", fn=lambda: resources.latest()["loop_lag_ms"] / 1000)
+metrics.Gauge("aracy_log_queue_depth", "Log entries waiting for the log writer.", fn=lambda: log_pipeline.snapshot()["queued"])
+metrics.Counter("aracy_log_entries_dropped_total", "Log entries dropped by backpressure.", ("level",),
+                fn=lambda: {(level,): count for level, count in log_pipeline.snapshot()["dropped"].items()})
+metrics.Counter("aracy_log_entries_failed_total", "Log entries lost because the log store write failed.",
+                fn=lambda: log_pipeline.snapshot()["failed"])
+metrics.Gauge("aracy_job_queue_depth", "Background jobs waiting to run.", fn=lambda: jobs.snapshot()["queued"])
+metrics.Counter("aracy_jobs_failed_total", "Background jobs dropped after their last retry.", fn=lambda: jobs.snapshot()["failed"])
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus text-format metrics."""
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.on_event("startup")
+async def start_resource_sampler():
+    resources.start()
+
+@app.on_event("shutdown")
+async def stop_resource_sampler():
+    await resources.stop()
+
+@app.on_event("startup")
+async def start_usage_meter():
+    meter.start()
+
+@app.on_event("shutdown")
+async def stop_usage_meter():
+    await meter.stop()
+
+@app.get("/api/llm/providers")
+async def get_provider_health():
+    """
+    Returns rolling health statistics and circuit breaker state
+    for every LLM provider/model that has been called, plus hedging,
+    singleflight coalescing and output parser (rejection reason) stats.
+    """
+    return {
+        "providers": router.snapshot(),
+        "hedging": hedge_stats.snapshot(),
+        "singleflight": flights.snapshot(),
+        "parser": parser_stats.snapshot()
+    }
+
 # ------------------- The Lab: AI Generation with Custom Parameters -------------------
 
 class LabGenerationRequest(BaseModel):
@@ -239,96 +473,10 @@ class LabGenerationRequest(BaseModel):
     language: str = "en"
     catalysts: list = []
     vibe: str = ""
+    deadline_s: Optional[float] = None  # latency SLO override (defaults to LAB_DEADLINE_S)
 
-@app.post("/api/lab/generate")
-async def generate_with_lab(
-    req: LabGenerationRequest,
-    x_bond_id: Optional[str] = Header(None, alias="X-Bond-ID")
-):
-    """
-    Generate 19 endearments using The Lab parameters.
-    Returns array of 19 alints with title, origin, reflection, interaction.
-    
-    Uses a hybrid approach:
-    - 40% (8 alints) from the vault
-    - 60% (11 alints) generated by Claude 3.7
-    """
-    try:
-        if x_bond_id:
-            print(f"Generating alints for Bond ID: {x_bond_id}")
-
-        # Build custom prompt based on Lab parameters
-        catalyst_text = ", ".join(req.catalysts) if req.catalysts else ""
-        vibe_text = req.vibe if req.vibe else ""
-        style = req.style.lower() if req.style else "deep"
-        language = req.language.lower() if req.language else "en"
-        
-        # Step 1: Get alints from the vault (40% - approximately 8 alints)
-        vault_alints = []
-        
-        # Reload the vault to get the latest entries
-        global alints_vault
-        alints_vault = load_alints_vault()
-        
-        # Filter by style/vibe if possible
-        matching_alints = [
-            a for a in alints_vault["alints"] 
-            if style in a.get("vibe", "").lower() or 
-               style in a.get("word", "").lower() or
-               style in a.get("meaning", "").lower()
-        ]
-        
-        # Give higher weight to crystallized alints
-        crystallized_alints = [a for a in matching_alints if a.get("crystallized", False)]
-        non_crystallized_alints = [a for a in matching_alints if not a.get("crystallized", False)]
-        
-        # If we have crystallized alints, ensure they make up at least half of our selection if possible
-        if crystallized_alints:
-            # Determine how many crystallized alints to include (up to 4, or half of what we need)
-            crystallized_count = min(len(crystallized_alints), 4)
-            
-            # Select crystallized alints first
-            selected_crystallized = random.sample(crystallized_alints, crystallized_count)
-            
-            # Then select from non-crystallized to fill the rest
-            remaining_needed = 8 - crystallized_count
-            if remaining_needed > 0 and non_crystallized_alints:
-                selected_non_crystallized = random.sample(
-                    non_crystallized_alints, 
-                    min(remaining_needed, len(non_crystallized_alints))
-                )
-                matching_alints = selected_crystallized + selected_non_crystallized
-            else:
-                matching_alints = selected_crystallized
-        
-        # If we have language preference, try to filter by that too
-        if language != "en":
-            language_matches = [
-                a for a in matching_alints
-                if language in a.get("language", "").lower()
-            ]
-            if language_matches:
-                matching_alints = language_matches
-        
-        # If we don't have enough matching alints, use any from the vault
-        if len(matching_alints) < 8:
-            additional_needed = 8 - len(matching_alints)
-            non_matching = [a for a in alints_vault["alints"] if a not in matching_alints]
-            if non_matching:
-                matching_alints.extend(random.sample(non_matching, min(additional_needed, len(non_matching))))
-        
-        # Select 8 random alints from the matching ones (or fewer if we don't have 8)
-        if matching_alints:
-            vault_alints = random.sample(matching_alints, min(8, len(matching_alints)))
-        
-        # Convert vault alints to simple strings
-        vault_alint_strings = [a["word"] + " - " + a["meaning"] for a in vault_alints]
-        
-        # Step 2: Generate the remaining alints using Claude 3.7
-        num_to_generate = 19 - len(vault_alint_strings)
-        
-        # Sophisticated system instruction for Claude 3.7 Sonnet
-        system_instruction = """
+# Sophisticated system instruction for the Lab generator
+LAB_SYSTEM_INSTRUCTION = """
         You are a Celestial Etymologist - a master of rare linguistic alchemy who crafts exquisite 'alints' (affectionate linguistic treasures).
         
         Your alints blend:
@@ -338,8 +486,94 @@ async def generate_with_lab(
         
         Each alint must be a single sentence, rare in construction yet clear in meaning.
         """
+
+# Generic alints used to pad a Lab response when generation comes up short
+GENERIC_ALINTS = [
+    "Lumière - The light that guides my soul through darkness",
+    "Serendipity - The fortunate accident of finding you when I wasn't looking",
+    "Ethereal - Delicate and light in a way that seems too perfect for this world",
+    "Ineffable - Too great to be expressed in words",
+    "Quintessence - The most perfect embodiment of something"
+]
+
+def select_vault_alints(style: str, language: str, count: int = 8, reload: bool = True) -> List[Dict]:
+    """
+    Select alints from the vault for a Lab request (40% - approximately 8 alints).
+    
+    Args:
+        style: Normalized Lab style (silly, deep, astro, poetic, scientific)
+        language: Normalized language code
+        count: Number of vault alints to select
+        reload: Re-read the vault file first (False uses the in-memory vault)
+    
+    Returns:
+        List of vault alint dictionaries
+    """
+    vault_alints = []
+    
+    # Reload the vault to get the latest entries
+    global alints_vault
+    if reload:
+        with span("vault.reload") as s:
+            alints_vault = load_alints_vault()
+            s.set(**{"vault.alints": len(alints_vault.get("alints", []))})
+    
+    # Filter by style/vibe if possible
+    matching_alints = [
+        a for a in alints_vault["alints"] 
+        if style in a.get("vibe", "").lower() or 
+           style in a.get("word", "").lower() or
+           style in a.get("meaning", "").lower()
+    ]
+    
+    # Give higher weight to crystallized alints
+    crystallized_alints = [a for a in matching_alints if a.get("crystallized", False)]
+    non_crystallized_alints = [a for a in matching_alints if not a.get("crystallized", False)]
+    
+    # If we have crystallized alints, ensure they make up at least half of our selection if possible
+    if crystallized_alints:
+        # Determine how many crystallized alints to include (up to 4, or half of what we need)
+        crystallized_count = min(len(crystallized_alints), count // 2)
         
-        user_message = f"""
+        # Select crystallized alints first
+        selected_crystallized = random.sample(crystallized_alints, crystallized_count)
+        
+        # Then select from non-crystallized to fill the rest
+        remaining_needed = count - crystallized_count
+        if remaining_needed > 0 and non_crystallized_alints:
+            selected_non_crystallized = random.sample(
+                non_crystallized_alints, 
+                min(remaining_needed, len(non_crystallized_alints))
+            )
+            matching_alints = selected_crystallized + selected_non_crystallized
+        else:
+            matching_alints = selected_crystallized
+    
+    # If we have language preference, try to filter by that too
+    if language != "en":
+        language_matches = [
+            a for a in matching_alints
+            if language in a.get("language", "").lower()
+        ]
+        if language_matches:
+            matching_alints = language_matches
+    
+    # If we don't have enough matching alints, use any from the vault
+    if len(matching_alints) < count:
+        additional_needed = count - len(matching_alints)
+        non_matching = [a for a in alints_vault["alints"] if a not in matching_alints]
+        if non_matching:
+            matching_alints.extend(random.sample(non_matching, min(additional_needed, len(non_matching))))
+    
+    # Select random alints from the matching ones (or fewer if we don't have enough)
+    if matching_alints:
+        vault_alints = random.sample(matching_alints, min(count, len(matching_alints)))
+    
+    return vault_alints
+
+def build_lab_message(num_to_generate: int, style: str, language: str, catalyst_text: str, vibe_text: str) -> str:
+    """Build the Lab user message asking for num_to_generate new alints."""
+    return f"""
 Create exactly {num_to_generate} unique endearments/alints.
 
 Style: {style}
@@ -352,110 +586,373 @@ Where "Word" is the endearment term and "Meaning" is its poetic definition.
 
 Return as an array of {num_to_generate} strings.
 """
+
+def complete_to_nineteen(alints: List[str]) -> List[str]:
+    """Pad (generic alints, then duplicates) or truncate a Lab result to exactly 19."""
+    all_alints = list(alints)
+    
+    if len(all_alints) < 19:
+        # If we don't have enough, pad with generic ones
+        generic_alints = list(GENERIC_ALINTS)
+        while len(all_alints) < 19 and generic_alints:
+            all_alints.append(generic_alints.pop(0))
+    
+    # If we still don't have 19, duplicate some
+    while len(all_alints) < 19:
+        all_alints.append(random.choice(all_alints))
+    
+    # If we have more than 19, truncate
+    return all_alints[:19]
+
+def save_generated_alints(generated_alints: List[str], style: str, language: str):
+    """Step 5: Save exceptional new alints to the vault."""
+    for alint_str in generated_alints:
+        # Only process properly formatted, high-quality alints
+        if is_quality_alint(alint_str):
+            word, meaning = alint_str.split(" - ", 1)
+            new_alint = {
+                "word": word.strip(),
+                "meaning": meaning.strip(),
+                "language": language,
+                "vibe": style
+            }
+            add_alint_to_vault(new_alint)  # raises on write failure, so the job is retried
+
+# Generated alints are requested in small concurrent chunks of this size
+LAB_CHUNK_SIZE = 4
+# Maximum fan-out rounds (the first round plus top-ups for the missing remainder)
+LAB_MAX_ROUNDS = 3
+
+def split_into_chunks(total: int, chunk_size: int = LAB_CHUNK_SIZE) -> List[int]:
+    """Split a requested count into chunk sizes, e.g. 11 -> [4, 4, 3]."""
+    return [min(chunk_size, total - start) for start in range(0, total, chunk_size)]
+
+async def generate_alints_fanout(
+    num_to_generate: int,
+    style: str,
+    language: str,
+    catalyst_text: str,
+    vibe_text: str
+) -> List[str]:
+    """
+    Generate alints with concurrent small completions instead of one long one.
+    
+    Each round fans out chunks of at most LAB_CHUNK_SIZE alints, merging and
+    deduplicating results as they arrive. Later rounds only request the
+    missing remainder, so latency is bounded by the slowest small call.
+    
+    Raises:
+        The last generation error if no alint could be generated at all
+    """
+    generated_alints = []
+    seen_words = set()
+    last_error = None
+    
+    for attempt in range(LAB_MAX_ROUNDS):
+        missing = num_to_generate - len(generated_alints)
+        if missing <= 0:
+            break
+        
+        current_span().set(**{"lab.rounds": attempt + 1})
+        
+        # Jittered exponential backoff before every top-up round
+        if attempt > 0:
+            with span("lab.backoff", **{"lab.round": attempt + 1}):
+                await asyncio.sleep(backoff_delay(attempt - 1))
+        
+        chunks = split_into_chunks(missing)
+        avoid_text = ", ".join(a.split(" - ", 1)[0] for a in generated_alints if isinstance(a, str))
+        
+        def run_chunk(index: int, size: int) -> str:
+            user_message = build_lab_message(size, style, language, catalyst_text, vibe_text)
+            if len(chunks) > 1:
+                user_message += f"\nThis is batch {index + 1} of {len(chunks)}; make every term distinct from other batches.\n"
+            if avoid_text:
+                user_message += f"\nDo not reuse these terms: {avoid_text}\n"
+            return llm.generate_alint(
+                LAB_SYSTEM_INSTRUCTION + "\n\n" + user_message, category=style, task=TASK_LAB_LIST, count=size
+            )
         
-        # Implement retry logic
-        max_retries = 3
-        generated_alints = []
+        tasks = [asyncio.create_task(asyncio.to_thread(run_chunk, i, size)) for i, size in enumerate(chunks)]
         
-        for attempt in range(max_retries):
+        # Merge results in completion order
+        for finished in asyncio.as_completed(tasks):
             try:
-                # Generate using LLM
-                result = llm.generate_alint(system_instruction + "\n\n" + user_message, category=style)
-                
-                try:
-                    # Try to parse as JSON first
-                    parsed = json.loads(result)
-                    
-                    # Handle different response formats
-                    if isinstance(parsed, list):
-                        generated_alints = parsed
-                    elif isinstance(parsed, dict) and "alints" in parsed:
-                        generated_alints = parsed["alints"]
-                    elif isinstance(parsed, dict) and "endearments" in parsed:
-                        generated_alints = parsed["endearments"]
-                    else:
-                        # Extract text lines if not in expected format
-                        generated_alints = []
-                        for line in result.strip().split('\n'):
-                            line = line.strip()
-                            # Remove numbering if present
-                            if line and (line[0].isdigit() or line[0] == '-'):
-                                line = re.sub(r'^\d+[\.\)-]\s*|-\s*', '', line).strip()
-                            if line:
-                                generated_alints.append(line)
-                    
-                    # Validate we have enough generated alints
-                    if len(generated_alints) >= num_to_generate:
-                        generated_alints = generated_alints[:num_to_generate]
-                        break
-                    
-                    # If we don't have enough, log and retry
-                    log_error(f"Generated {len(generated_alints)} alints instead of {num_to_generate} on attempt {attempt+1}. Retrying...")
-                    
-                except json.JSONDecodeError:
-                    # If not valid JSON, try to extract lines
-                    generated_alints = []
-                    for line in result.strip().split('\n'):
-                        line = line.strip()
-                        # Remove numbering if present
-                        if line and (line[0].isdigit() or line[0] == '-'):
-                            line = re.sub(r'^\d+[\.\)-]\s*|-\s*', '', line).strip()
-                        if line:
-                            generated_alints.append(line)
-                    
-                    # Validate we have enough generated alints
-                    if len(generated_alints) >= num_to_generate:
-                        generated_alints = generated_alints[:num_to_generate]
-                        break
-                    
-                    # If we don't have enough, log and retry
-                    log_error(f"Generated {len(generated_alints)} alints instead of {num_to_generate} on attempt {attempt+1}. Retrying...")
-            
+                result = await finished
             except Exception as e:
-                log_error(f"Error on attempt {attempt+1}: {str(e)}")
-                if attempt == max_retries - 1:
-                    raise
+                last_error = e
+                log_error(f"Error on attempt {attempt+1}: {str(e)}", level="ERROR")
+                continue
+            
+            # One pass over JSON, truncated JSON or plain lines; duplicates
+            # across chunks are rejected through the shared seen_words set
+            with span("lab.parse") as s:
+                alints, rejections = parse_alints(result, seen=seen_words)
+                s.set(**{"lab.parsed": len(alints), "lab.rejected": len(rejections)})
+            generated_alints.extend(alints[:num_to_generate - len(generated_alints)])
+            if rejections:
+                reasons = Counter(reason for _, reason in rejections)
+                log_error(f"Rejected {len(rejections)} Lab items on attempt {attempt+1}: {dict(reasons)}", level="INFO")
         
-        # Step 3: Combine vault alints and generated alints
-        all_alints = vault_alint_strings + generated_alints
+        if len(generated_alints) < num_to_generate:
+            # If we don't have enough, log and top up only the remainder
+            log_error(f"Generated {len(generated_alints)} alints instead of {num_to_generate} on attempt {attempt+1}. Retrying...", level="ERROR")
+    
+    if not generated_alints and last_error is not None:
+        raise last_error
+    
+    return generated_alints
+
+async def generate_for_pool(style: str, language: str, count: int) -> List[str]:
+    """Generate plain (no catalysts, no vibe) alints to keep the warm pool filled."""
+    with usage_tags(endpoint="alint_pool"):
+        return await generate_alints_fanout(count, style, language, "", "")
+
+# Warm pool of pre-generated alints per (style, language)
+alint_pool = AlintPool(generate_for_pool, ALINT_POOL_LANGUAGES)
+
+@app.on_event("startup")
+async def start_alint_pool():
+    if ALINT_POOL_ENABLED:
+        alint_pool.start()
+
+@app.on_event("shutdown")
+async def stop_alint_pool():
+    await alint_pool.stop()
+
+@app.get("/api/lab/pool")
+async def get_alint_pool_status():
+    """Returns warm pool fill levels and hit/miss counters."""
+    return {"enabled": ALINT_POOL_ENABLED, **alint_pool.snapshot()}
+
+async def run_lab_generation(style: str, language: str, catalyst_text: str, vibe_text: str) -> List[str]:
+    """
+    Run the Lab pipeline (vault selection, generation, padding, vault saves).
+    
+    Returns:
+        Exactly 19 alint strings
+    """
+    # Step 1: Get alints from the vault (40% - approximately 8 alints)
+    with span("lab.vault_select"):
+        vault_alints = select_vault_alints(style, language)
+    
+    # Convert vault alints to simple strings
+    vault_alint_strings = [a["word"] + " - " + a["meaning"] for a in vault_alints]
+    
+    # Step 2: Generate the remaining alints using Claude 3.7
+    num_to_generate = 19 - len(vault_alint_strings)
+    
+    # Drain the warm pool first (plain requests only: catalysts and vibe
+    # personalize the prompt, so those always go live)
+    generated_alints = []
+    if ALINT_POOL_ENABLED and not catalyst_text and not vibe_text:
+        with span("lab.pool_take") as s:
+            generated_alints = alint_pool.take(style, language, num_to_generate)
+            s.set(**{"lab.pool_hits": len(generated_alints)})
+    else:
+        alint_pool.note_activity()
+    
+    # Fan out concurrent chunked requests, topping up only what is missing
+    if len(generated_alints) < num_to_generate:
+        with span("lab.fanout", **{"lab.requested": num_to_generate - len(generated_alints)}):
+            generated_alints += await generate_alints_fanout(
+                num_to_generate - len(generated_alints), style, language, catalyst_text, vibe_text
+            )
+    
+    # Step 3: Combine vault alints and generated alints
+    # Step 4: Ensure we have exactly 19 alints
+    with span("lab.complete", **{"lab.generated": len(generated_alints)}):
+        all_alints = complete_to_nineteen(vault_alint_strings + generated_alints)
+    
+    # Step 5: Save exceptional new alints to the vault (after the response;
+    # the job continues this trace as job.save_generated_alints)
+    jobs.submit("save_generated_alints", generated_alints=generated_alints, style=style, language=language)
+    
+    return all_alints
+
+def provisional_alints(style: str, language: str) -> List[str]:
+    """Degraded-mode Lab result: a full 19 from the in-memory vault (no disk, no LLM)."""
+    vault_alints = select_vault_alints(style, language, count=19, reload=False)
+    return complete_to_nineteen([a["word"] + " - " + a["meaning"] for a in vault_alints])
+
+def save_daily_set(bond_id: str, alints: List[str]):
+    """Store a bond's freshly generated Lab set (delivered after a provisional response)."""
+    with bond_store_lock:
+        store = load_bond_store(strict=True)
+        bond = store["bonds"].setdefault(bond_id, {"crystallized": [], "reflected": []})
+        bond["daily_set"] = {
+            "date": datetime.date.today().isoformat(),
+            "generated_at": datetime.datetime.now().isoformat(timespec='seconds'),
+            "alints": list(alints)
+        }
+        if not save_bond_store(store):
+            raise OSError("bond store write failed")  # retried by the job queue
+
+# Post-response persistence jobs
+jobs.register("save_generated_alints", save_generated_alints)
+jobs.register("save_daily_set", save_daily_set)
+jobs.register("log", log_error)  # replays log jobs journaled by older versions
+
+@app.on_event("startup")
+async def start_job_queue():
+    jobs.start()
+
+@app.on_event("shutdown")
+async def stop_job_queue():
+    await jobs.stop()
+
+@app.get("/api/traces")
+async def get_recent_traces(limit: int = Query(10, ge=1, le=50)):
+    """Returns exporter settings/counters and the most recently exported traces (OTLP/JSON)."""
+    return {**exporter.snapshot(), "traces": list(exporter.recent)[-limit:]}
+
+def require_admin(x_admin_token: Optional[str] = Header(None, alias="X-Admin-Token")):
+    """Admin endpoints: disabled (404) unless ADMIN_TOKEN is set, 403 on a wrong token."""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+@app.get("/api/admin/profile", dependencies=[Depends(require_admin)])
+async def profile_worker(seconds: float = Query(10, gt=0), tasks: bool = True):
+    """
+    Wall-clock sampling profile of this worker for `seconds` (threads and,
+    with tasks=true, asyncio task await chains). Returns collapsed stacks,
+    e.g. `curl ... | flamegraph.pl > lab.svg`.
+    """
+    try:
+        collapsed, samples = await profiler.profile(min(seconds, PROFILE_MAX_SECONDS), include_tasks=tasks)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return PlainTextResponse(collapsed, headers={"X-Profile-Samples": str(samples)})
+
+@app.post("/api/admin/profile/requests", dependencies=[Depends(require_admin)])
+async def arm_request_profile(
+    route: str,
+    count: int = Query(1, ge=1),
+    method: Optional[str] = None,
+    tasks: bool = True,
+):
+    """Profile the next `count` requests to a route template (e.g. /api/lab/generate)."""
+    method = method.upper() if method else None
+    target = next((r for r in app.routes if getattr(r, "path", None) == route
+                   and (method is None or method in (getattr(r, "methods", None) or ()))), None)
+    if target is None:
+        raise HTTPException(status_code=404, detail=f"No route matching {route}")
+    try:
+        profiler.arm(target, min(count, PROFILE_MAX_REQUESTS), include_tasks=tasks)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return profiler.snapshot()
+
+@app.get("/api/admin/profile/requests", dependencies=[Depends(require_admin)])
+async def get_request_profile():
+    """Collapsed stacks of the last finished request profile, or its progress (202) while armed."""
+    result = profiler.last_result
+    if result is None:
+        return JSONResponse(status_code=202, content=profiler.snapshot())
+    return PlainTextResponse(result["collapsed"], headers={
+        "X-Profile-Route": result["route"],
+        "X-Profile-Requests": str(result["requests"]),
+        "X-Profile-Samples": str(result["samples"]),
+    })
+
+@app.delete("/api/admin/profile/requests", dependencies=[Depends(require_admin)])
+async def cancel_request_profile():
+    """Disarm request profiling; stacks sampled so far become the result."""
+    if not profiler.cancel():
+        raise HTTPException(status_code=409, detail="No request profile armed")
+    return profiler.snapshot()
+
+@app.post("/api/admin/logs/compact", dependencies=[Depends(require_admin)])
+async def compact_logs():
+    """Run a log retention pass now (normally every LOG_COMPACT_INTERVAL_S)."""
+    return await asyncio.to_thread(log_compactor.compact_once)
+
+@app.get("/api/jobs")
+async def get_job_queue_status():
+    """Returns background job queue depth and counters."""
+    return jobs.snapshot()
+
+# Bonds whose Lab generation is still running after a provisional response
+pending_daily_sets: Dict[str, asyncio.Future] = {}
+
+def deliver_daily_set_later(bond_id: str, generation: asyncio.Future):
+    """Keep generating after the deadline and store the result as the bond's daily set."""
+    pending_daily_sets[bond_id] = generation
+    
+    def on_done(task: asyncio.Future):
+        if pending_daily_sets.get(bond_id) is task:
+            pending_daily_sets.pop(bond_id, None)
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            log_error(f"Background Lab generation for {bond_id} failed: {task.exception()}", level="ERROR")
+            return
+        jobs.submit("save_daily_set", bond_id=bond_id, alints=list(task.result()))
+    
+    generation.add_done_callback(on_done)
+
+@app.post("/api/lab/generate")
+@traced("lab.generate")
+async def generate_with_lab(
+    req: LabGenerationRequest,
+    x_bond_id: Optional[str] = Header(None, alias="X-Bond-ID")
+):
+    """
+    Generate 19 endearments using The Lab parameters.
+    Returns array of 19 alints with title, origin, reflection, interaction.
+    
+    Uses a hybrid approach:
+    - 40% (8 alints) from the vault
+    - 60% (11 alints) generated by Claude 3.7
+    
+    Concurrent identical requests (same normalized parameters) share one
+    in-flight generation via singleflight.
+    
+    Degraded mode (off unless LAB_DEADLINE_S or req.deadline_s is set): if
+    generation misses that latency SLO, a full 19 from the vault is returned
+    marked provisional.
+    Generation continues in the background and its result becomes the bond's
+    daily set (GET /api/lab/daily/{bond_id}).
+    """
+    try:
+        if x_bond_id:
+            print(f"Generating alints for Bond ID: {x_bond_id}")
+
+        # Build custom prompt from the same normalized parameters as the
+        # singleflight key, so coalesced followers get what they asked for
+        style, language, catalysts, vibe_text = normalize_lab_request(req.style, req.language, req.catalysts, req.vibe)
+        catalyst_text = ", ".join(catalysts)
+        current_span().set(**{"lab.style": style, "lab.language": language, "bond.id": x_bond_id})
         
-        # Step 4: Ensure we have exactly 19 alints
-        if len(all_alints) < 19:
-            # If we don't have enough, pad with generic ones
-            generic_alints = [
-                "Lumière - The light that guides my soul through darkness",
-                "Serendipity - The fortunate accident of finding you when I wasn't looking",
-                "Ethereal - Delicate and light in a way that seems too perfect for this world",
-                "Ineffable - Too great to be expressed in words",
-                "Quintessence - The most perfect embodiment of something"
-            ]
-            while len(all_alints) < 19 and generic_alints:
-                all_alints.append(generic_alints.pop(0))
-                
-        # If we still don't have 19, duplicate some
-        while len(all_alints) < 19:
-            all_alints.append(random.choice(all_alints))
-            
-        # If we have more than 19, truncate
-        all_alints = all_alints[:19]
+        key = lab_request_key(style, language, catalysts, vibe_text)
+        with usage_tags(endpoint="/api/lab/generate", bond=x_bond_id):
+            generation = asyncio.ensure_future(flights.do(
+                key, lambda: run_lab_generation(style, language, catalyst_text, vibe_text)
+            ))
         
-        # Step 5: Save exceptional new alints to the vault
-        for alint_str in generated_alints:
-            # Only process properly formatted alints
-            if " - " in alint_str:
-                word, meaning = alint_str.split(" - ", 1)
-                
-                # Check if this is a high-quality alint worth saving
-                if len(word) > 3 and len(meaning) > 15:
-                    new_alint = {
-                        "word": word.strip(),
-                        "meaning": meaning.strip(),
-                        "language": language,
-                        "vibe": style
-                    }
-                    save_alint_to_vault(new_alint)
+        deadline = req.deadline_s if req.deadline_s is not None else LAB_DEADLINE_S
+        if deadline <= 0:
+            return {"alints": list(await generation)}
+        
+        try:
+            all_alints = await asyncio.wait_for(asyncio.shield(generation), timeout=deadline)
+            return {"alints": list(all_alints)}
+        except asyncio.TimeoutError:
+            log_error(f"Lab generation missed its {deadline}s deadline; serving provisional vault alints", level="WARNING")
+            current_span().set(**{"lab.provisional": True, "lab.deadline_s": deadline})
         
-        return {"alints": all_alints}
+        if x_bond_id:
+            deliver_daily_set_later(x_bond_id, generation)
+        else:
+            # Nobody collects the result; just consume any late error
+            generation.add_done_callback(lambda task: task.cancelled() or task.exception())
+        return {
+            "alints": provisional_alints(style, language),
+            "provisional": True,
+            "daily_set": f"/api/lab/daily/{x_bond_id}" if x_bond_id else None
+        }
     
     except Exception as e:
         log_error(f"Lab generation failed: {str(e)}")
@@ -464,14 +961,135 @@ Return as an array of {num_to_generate} strings.
             content={"error": f"Failed to generate alints: {str(e)}"}
         )
 
+@app.get("/api/lab/daily/{bond_id}")
+async def get_daily_set(bond_id: str):
+    """
+    The bond's latest generated Lab set.
+    Status is "pending" while a generation that missed its deadline is still
+    running, "ready" once today's set is stored, and "none" otherwise.
+    """
+    bond = load_bond_store()["bonds"].get(bond_id, {})
+    daily_set = bond.get("daily_set")
+    if bond_id in pending_daily_sets:
+        return {"status": "pending", "daily_set": daily_set}
+    if daily_set and daily_set.get("date") == datetime.date.today().isoformat():
+        return {"status": "ready", "daily_set": daily_set}
+    return {"status": "none", "daily_set": daily_set}
+
+@app.post("/api/lab/generate/stream")
+async def stream_lab_generation(
+    req: LabGenerationRequest,
+    x_bond_id: Optional[str] = Header(None, alias="X-Bond-ID")
+):
+    """
+    Streaming variant of The Lab (Server-Sent Events).
+    
+    Emits the vault alints immediately, then every generated alint as soon as
+    it is parsed from the token stream, then the final 19 and [DONE].
+    Parameters are normalized as in generate_with_lab. If the stream fails
+    or ends short, the remainder comes from the non-streamed fan-out (with
+    its Gemini failover) before the result is padded.
+    """
+    style, language, catalysts, vibe_text = normalize_lab_request(req.style, req.language, req.catalysts, req.vibe)
+    catalyst_text = ", ".join(catalysts)
+    
+    async def lab_event_stream():
+        with span("lab.stream", **{"lab.style": style, "lab.language": language, "bond.id": x_bond_id}) as s:
+            try:
+                if x_bond_id:
+                    print(f"Streaming alints for Bond ID: {x_bond_id}")
+                
+                # Step 1: Vault alints go out before the LLM is even called
+                with span("lab.vault_select"):
+                    vault_alints = await asyncio.to_thread(select_vault_alints, style, language)
+                vault_alint_strings = [a["word"] + " - " + a["meaning"] for a in vault_alints]
+                yield f"data: {json.dumps({'vault': vault_alint_strings})}\n\n"
+                
+                # Step 2: Stream the remaining alints as they are parsed
+                num_to_generate = 19 - len(vault_alint_strings)
+                user_message = build_lab_message(num_to_generate, style, language, catalyst_text, vibe_text)
+                parser = AlintParser()
+                generated_alints = []
+                
+                def event(alint):
+                    generated_alints.append(alint)
+                    return f"data: {json.dumps({'alint': alint, 'index': len(vault_alint_strings) + len(generated_alints) - 1})}\n\n"
+                
+                with usage_tags(endpoint="/api/lab/generate/stream", bond=x_bond_id):
+                    try:
+                        token_stream = llm.stream_alint(
+                            LAB_SYSTEM_INSTRUCTION + "\n\n" + user_message,
+                            category=style, task=TASK_LAB_LIST, count=num_to_generate
+                        )
+                        async for delta in iterate_in_threadpool(token_stream):
+                            for alint in parser.feed(delta):
+                                if len(generated_alints) < num_to_generate:
+                                    yield event(alint)
+                        for alint in parser.finish():
+                            if len(generated_alints) < num_to_generate:
+                                yield event(alint)
+                    except Exception as e:
+                        log_error(f"Lab stream generation failed: {str(e)}")
+                        s.set(**{"lab.stream_error": str(e)[:200]})
+                    
+                    # Top up through the non-streamed path (Groq with Gemini failover)
+                    missing = num_to_generate - len(generated_alints)
+                    if missing > 0:
+                        s.set(**{"lab.fallback": missing})
+                        try:
+                            with span("lab.fanout", **{"lab.requested": missing}):
+                                extra = await generate_alints_fanout(missing, style, language, catalyst_text, vibe_text)
+                        except Exception as e:
+                            log_error(f"Lab stream fallback failed: {str(e)}")
+                            extra = []
+                        for alint in extra:
+                            word = alint.split(" - ", 1)[0].lower()
+                            if word not in parser.seen and len(generated_alints) < num_to_generate:
+                                parser.seen.add(word)
+                                yield event(alint)
+                
+                s.set(**{"lab.generated": len(generated_alints)})
+                if len(generated_alints) < num_to_generate:
+                    log_error(f"Streamed {len(generated_alints)} alints instead of {num_to_generate}. Padding result.", level="ERROR")
+                
+                # Step 5: Queue the save of exceptional new alints before the final
+                # events: a client may close on [DONE], which closes this generator
+                jobs.submit("save_generated_alints", generated_alints=generated_alints, style=style, language=language)
+                
+                # Steps 3-4: Final, padded set of 19
+                all_alints = complete_to_nineteen(vault_alint_strings + generated_alints)
+                yield f"data: {json.dumps({'result': {'alints': all_alints}})}\n\n"
+                yield "data: [DONE]\n\n"
+            
+            except Exception as e:
+                log_error(f"Lab stream failed: {str(e)}")
+                yield f"data: {json.dumps({'error': f'Failed to generate alints: {str(e)}'})}\n\n"
+                yield "data: [DONE]\n\n"
+    
+    return StreamingResponse(lab_event_stream(), media_type="text/event-stream")
+
 # ------------------- Alints Vault Management -------------------
 
 class CrystallizeRequest(BaseModel):
     alints: List[Dict[str, str]]
 
+def append_crystallized(bond_id: str, alints: List[Dict]):
+    """Append crystallized alints to a bond's history in the Bond Store."""
+    with bond_store_lock:
+        store = load_bond_store(strict=True)
+        if bond_id not in store["bonds"]:
+            store["bonds"][bond_id] = {"crystallized": [], "reflected": []}
+        store["bonds"][bond_id].setdefault("crystallized", []).extend(alints)
+        if not save_bond_store(store):
+            raise OSError("bond store write failed")  # retried by the job queue
+
+jobs.register("append_crystallized", append_crystallized)
+
 @app.post("/api/vault/crystallize")
+@traced("vault.crystallize")
 async def crystallize_alints(
     req: CrystallizeRequest,
+    background_tasks: BackgroundTasks,
     x_bond_id: Optional[str] = Header(None, alias="X-Bond-ID")
 ):
     """
@@ -501,25 +1119,28 @@ async def crystallize_alints(
             }
             
             # Save to vault with crystallized flag
-            if save_alint_to_vault(alint, crystallized=True):
+            with span("vault.save", **{"alint.word": alint["word"]}) as s:
+                saved = save_alint_to_vault(alint, crystallized=True)
+                s.set(**{"vault.saved": bool(saved)})
+            if saved:
                 crystallized_count += 1
                 crystallized_list.append(alint)
 
-        # Save to Bond Store
+        # Save to Bond Store (queued after the response)
         if x_bond_id:
-            store = load_bond_store()
-            if x_bond_id not in store["bonds"]:
-                store["bonds"][x_bond_id] = {"crystallized": [], "reflected": []}
-            
             # Append new crystallized alints to the bond history
             # Add timestamp
             for c_alint in crystallized_list:
                 c_alint["timestamp"] = datetime.datetime.now().isoformat()
-                store["bonds"][x_bond_id]["crystallized"].append(c_alint)
             
-            save_bond_store(store)
+            # Background tasks run after this span ends: hand the job its trace explicitly
+            background_tasks.add_task(
+                jobs.submit, "append_crystallized", trace=current_span().context(),
+                bond_id=x_bond_id, alints=crystallized_list
+            )
             print(f"Crystallized {len(crystallized_list)} alints for bond {x_bond_id}")
         
+        current_span().set(**{"vault.crystallized": crystallized_count, "bond.id": x_bond_id})
         return {
             "status": "success", 
             "message": f"Crystallized {crystallized_count} alints",
@@ -580,21 +1201,22 @@ class ReflectRequest(BaseModel):
 async def mark_reflected(req: ReflectRequest):
     """Mark an endearment as reflected upon."""
     try:
-        store = load_bond_store()
-        if req.bond_id not in store["bonds"]:
-            store["bonds"][req.bond_id] = {"crystallized": [], "reflected": []}
-        
-        reflected_list = store["bonds"][req.bond_id].get("reflected", [])
-        
-        if req.reflected:
-            if req.index not in reflected_list:
-                reflected_list.append(req.index)
-        else:
-            if req.index in reflected_list:
-                reflected_list.remove(req.index)
-        
-        store["bonds"][req.bond_id]["reflected"] = reflected_list
-        save_bond_store(store)
+        with bond_store_lock:
+            store = load_bond_store()
+            if req.bond_id not in store["bonds"]:
+                store["bonds"][req.bond_id] = {"crystallized": [], "reflected": []}
+            
+            reflected_list = store["bonds"][req.bond_id].get("reflected", [])
+            
+            if req.reflected:
+                if req.index not in reflected_list:
+                    reflected_list.append(req.index)
+            else:
+                if req.index in reflected_list:
+                    reflected_list.remove(req.index)
+            
+            store["bonds"][req.bond_id]["reflected"] = reflected_list
+            save_bond_store(store)
         return {"status": "success"}
     except Exception as e:
         log_error(f"Reflect error: {e}")
@@ -627,21 +1249,19 @@ async def update_delivery_time(req: DeliveryTimeRequest):
 
 # ------------------- The Riddle: Quiz Generation & Badges -------------------
 
-@app.get("/api/quiz/generate/{bond_id}")
-async def generate_quiz(bond_id: str):
-    """Generate quiz questions based on bond context."""
-    try:
-        # Get Muse context
-        muse = get_muse_context()
-        
-        quiz_prompt = f"""
+@functools.lru_cache(maxsize=1)
+def build_quiz_prompt() -> str:
+    """Quiz prompt from the Muse context (built once per process)."""
+    muse = get_muse_context()
+    
+    return f"""
 Generate 5 quiz questions about chemistry, astrology, and {muse['name']}'s profile.
 
 Context:
 - Name: {muse['name']}
 - Profession: {muse['profession']}
 - Traits: {muse['traits']}
-- Astrology: {muse['astro_chart']}
+- Astrology: {muse['astro_summary']}
 
 Each question should be a JSON object with:
 - question: the question text
@@ -650,30 +1270,87 @@ Each question should be a JSON object with:
 
 Return as JSON object with "questions" array.
 """
-        
-        result = llm.generate_alint(quiz_prompt, category="general")
-        
-        import json
-        try:
-            parsed = json.loads(result)
-            if "questions" in parsed:
-                return parsed
-            else:
-                return {"questions": parsed if isinstance(parsed, list) else []}
-        except:
-            # Fallback mock quiz
-            return {
-                "questions": [
-                    {
-                        "question": f"What is {muse['name']}'s Sun sign?",
-                        "answers": ["Aquarius", "Pisces", "Aries", "Taurus"],
-                        "correctAnswer": 1
-                    }
-                ]
+
+def fallback_quiz() -> Dict:
+    """One-question quiz served (and not cached) when generation fails."""
+    muse = get_muse_context()
+    return {
+        "questions": [
+            {
+                "question": f"What is {muse['name']}'s Sun sign?",
+                "answers": ["Aquarius", "Pisces", "Aries", "Taurus"],
+                "correctAnswer": 1
             }
+        ]
+    }
+
+async def build_quiz(bond_id: str) -> Dict:
+    """
+    Run one quiz completion and validate it.
+    
+    Raises:
+        ValueError: If the completion is not JSON or has too few valid questions
+    """
+    result = await asyncio.to_thread(
+        llm.generate_alint, build_quiz_prompt(), category="general", task=TASK_QUIZ, count=5
+    )
+    with span("quiz.validate") as s:
+        quiz = validate_quiz(json.loads(result))
+        s.set(**{"quiz.questions": len(quiz["questions"])})
+    return quiz
+
+async def build_daily_quiz(bond_id: str) -> Dict:
+    """Generate, validate and cache the bond's quiz for today."""
+    try:
+        quiz = await build_quiz(bond_id)
+    except ValueError as e:
+        log_error(f"Quiz for {bond_id} failed validation: {e}", level="WARNING")
+        return fallback_quiz()
+    with span("quiz.cache_put"):
+        await quiz_cache.put(bond_id, quiz)
+    return quiz
+
+async def precompute_quiz(bond_id: str) -> Dict:
+    with usage_tags(endpoint="quiz_precompute", bond=bond_id):
+        return await build_quiz(bond_id)
+
+# Per-bond, per-day quiz cache (optionally precomputed overnight)
+quiz_cache = QuizCache()
+
+@app.on_event("startup")
+async def start_quiz_precompute():
+    if QUIZ_PRECOMPUTE_ENABLED:
+        quiz_cache.start(precompute_quiz, lambda: list(load_bond_store()["bonds"]))
+
+@app.on_event("shutdown")
+async def stop_quiz_precompute():
+    await quiz_cache.stop()
+
+@app.get("/api/quiz/generate/{bond_id}")
+@traced("quiz.generate")
+async def generate_quiz(bond_id: str):
+    """
+    Get the bond's quiz for today.
+    The first load of the day generates and caches it; later loads are
+    served from the cache, so the quiz does not change mid-session.
+    Concurrent first loads for the same bond share one in-flight completion.
+    """
+    bond_id = bond_id.strip()
+    cached = quiz_cache.get(bond_id)
+    current_span().set(**{"bond.id": bond_id, "quiz.cache_hit": cached is not None})
+    if cached is not None:
+        return cached
+    try:
+        with usage_tags(endpoint="/api/quiz/generate", bond=bond_id):
+            return await flights.do(f"quiz:{bond_id}:{today()}", lambda: build_daily_quiz(bond_id))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Quiz generation failed: {e}")
 
+@app.get("/api/quiz/cache")
+async def get_quiz_cache_status():
+    """Returns daily quiz cache size and hit/miss counters."""
+    return {"precompute_enabled": QUIZ_PRECOMPUTE_ENABLED, **quiz_cache.snapshot()}
+
 @app.get("/api/quiz/badges/{bond_id}")
 async def get_unlocked_badges(bond_id: str):
     """Get all unlocked badges for a bond."""
@@ -701,3 +1378,8 @@ async def save_quiz_results(req: QuizResultsRequest):
     """Save quiz results."""
     # TODO: Implement Supabase insert
     return {"status": "success"}
+
+# Registered last so it runs after every other shutdown hook has logged
+@app.on_event("shutdown")
+async def flush_logs():
+    await asyncio.to_thread(log_pipeline.close)
@@ -0,0 +1,259 @@
+"""
+metrics.py
+
+Prometheus Metrics for ARACY.
+Counters, gauges and histograms rendered in the Prometheus text exposition
+format at /metrics, plus the ASGI middleware that records request counts,
+status codes and latency per route template.
+
+Writers never take a lock: each thread updates its own shard of a metric
+(thread-local dict), and rendering sums the shards. Gauges and counters can
+also be backed by a callback that reads an existing snapshot at scrape time.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# Latency buckets (seconds)
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60)
+WRITE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Shards:
+    """Per-thread dicts: each thread only ever writes its own shard."""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._all = []
+        self._lock = threading.Lock()  # only taken when a thread creates its shard
+
+    def mine(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = {}
+            with self._lock:
+                self._all.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def all(self):
+        with self._lock:
+            return list(self._all)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, help, labels=(), fn=None):
+        """
+        Args:
+            name: Metric name
+            help: HELP text
+            labels: Label names
+            fn: Optional callback returning the value (no labels) or a
+                {label values tuple: value} dict, read at scrape time
+        """
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.fn = fn
+        self._shards = _Shards()
+        registry.register(self)
+
+    def _key(self, label_values):
+        if len(label_values) != len(self.labels):
+            raise ValueError(f"{self.name} expects labels {self.labels}")
+        return tuple(str(v) for v in label_values)
+
+    def values(self):
+        """{label values tuple: value} summed across shards (or from the callback)."""
+        if self.fn is not None:
+            result = self.fn()
+            return result if isinstance(result, dict) else {(): result}
+        merged = {}
+        for shard in self._shards.all():
+            for key, value in list(shard.items()):
+                merged[key] = merged.get(key, 0) + value
+        return merged
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in sorted(self.values().items()):
+            if value is None:
+                continue
+            lines.append(f"{self.name}{_labels(self.labels, key)} {_number(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonic counter."""
+    kind = "counter"
+
+    def inc(self, *label_values, amount=1):
+        key = self._key(label_values)
+        shard = self._shards.mine()
+        shard[key] = shard.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Point-in-time value (set directly, or read from a callback)."""
+    kind = "gauge"
+
+    def __init__(self, name, help, labels=(), fn=None):
+        super().__init__(name, help, labels, fn)
+        self._values = {}
+
+    def set(self, value, *label_values):
+        # A single dict store: last writer wins, no lock needed
+        self._values[self._key(label_values)] = value
+
+    def values(self):
+        if self.fn is not None:
+            return super().values()
+        return dict(self._values)
+
+
+class Histogram(_Metric):
+    """Bucketed distribution with _bucket, _sum and _count series."""
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=HTTP_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labels)
+
+    def observe(self, value, *label_values):
+        key = self._key(label_values)
+        shard = self._shards.mine()
+        cell = shard.get(key)
+        if cell is None:
+            # per-bucket counts (last slot = +Inf), then sum, then count
+            cell = [0] * (len(self.buckets) + 3)
+            shard[key] = cell
+        cell[bisect.bisect_left(self.buckets, value)] += 1
+        cell[-2] += value
+        cell[-1] += 1
+
+    @contextmanager
+    def time(self, *label_values):
+        """Observe the duration of the with-block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *label_values)
+
+    def values(self):
+        merged = {}
+        for shard in self._shards.all():
+            for key, cell in list(shard.items()):
+                total = merged.setdefault(key, [0] * len(cell))
+                for i, value in enumerate(list(cell)):
+                    total[i] += value
+        return merged
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        bounds = self.buckets + (float("inf"),)
+        for key, cell in sorted(self.values().items()):
+            cumulative = 0
+            for bound, count in zip(bounds, cell):
+                cumulative += count
+                le = f'le="{_number(float(bound))}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {_number(float(cell[-2]))}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {cell[-1]}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self._metrics:
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                lines.append(f"# {metric.name} unavailable: {_escape(e)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+# Metrics recorded by the modules that own the measured code
+http_requests = Counter(
+    "aracy_http_requests_total", "HTTP requests by route template and status.",
+    ("method", "route", "status"))
+http_latency = Histogram(
+    "aracy_http_request_duration_seconds", "HTTP request latency by route template.",
+    ("method", "route"), HTTP_BUCKETS)
+llm_latency = Histogram(
+    "aracy_llm_request_duration_seconds", "LLM provider call latency.",
+    ("provider", "model", "outcome"), LLM_BUCKETS)
+bond_store_write_latency = Histogram(
+    "aracy_bond_store_write_duration_seconds", "Bond store write latency.",
+    (), WRITE_BUCKETS)
+vault_alints = Gauge(
+    "aracy_vault_alints", "Alints in the vault (as of the last vault read).")
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request count, status and latency per route
+    template (e.g. /api/quiz/generate/{bond_id}); unmatched paths share one
+    label so arbitrary URLs cannot blow up the series count.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            method = scope.get("method", "GET")
+            http_requests.inc(method, template, status)
+            http_latency.observe(time.perf_counter() - start, method, template)
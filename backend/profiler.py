@@ -0,0 +1,322 @@
+"""
+profiler.py
+
+On-demand Sampling Profiler for ARACY's workers.
+A background thread samples every thread's stack (sys._current_frames) and,
+optionally, the await chain of every asyncio task at PROFILE_INTERVAL_MS,
+and aggregates them as collapsed stacks ("frame;frame;frame count"), the
+input format of flamegraph.pl, speedscope and similar tools.
+
+Two modes:
+- time-boxed: sample the whole worker for N seconds (wall clock, so idle
+  and awaiting stacks are included);
+- next N requests: sample only while matching requests are in flight,
+  keeping the tasks of those requests (including the tasks they create,
+  recorded by a task factory installed only while armed) and executor
+  threads running app code.
+
+Nothing runs while idle: the request hook is a single attribute check.
+"""
+
+import asyncio
+import contextvars
+import os
+import sys
+import threading
+import weakref
+from collections import Counter
+
+from starlette.routing import Match
+
+from config import PROFILE_INTERVAL_MS
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+WORKER_THREAD_PREFIXES = ("asyncio_", "AnyIO worker")  # to_thread / sync endpoint pools
+
+# Set for the duration of a profiled request; copied into the tasks it creates
+_profiled = contextvars.ContextVar("profiled_request", default=False)
+
+
+def _label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+def _thread_stack(frame):
+    """Frames from the thread's root down to the sampled frame."""
+    stack = []
+    while frame is not None:
+        stack.append(frame)
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def _task_stack(task):
+    """Frames of a task's await chain, outermost coroutine first."""
+    stack = []
+    coro = task.get_coro()
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None) or getattr(coro, "ag_frame", None)
+        if frame is None:
+            break
+        stack.append(frame)
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None) or getattr(coro, "ag_await", None)
+    return stack
+
+
+def _runs_app_code(stack):
+    return any(frame.f_code.co_filename.startswith(APP_DIR) for frame in stack)
+
+
+class SamplingProfiler:
+    """
+    Wall-clock stack sampler with collapsed-stack output.
+
+    Args:
+        interval_s: Seconds between samples
+    """
+
+    def __init__(self, interval_s=PROFILE_INTERVAL_MS / 1000):
+        self.interval_s = interval_s
+        self.stacks = Counter()
+        self.samples = 0
+        self.loop = None
+        self.include_tasks = True
+        self.requests_only = False  # request mode: keep profiled requests' stacks only
+        self.tasks = weakref.WeakSet()  # request mode: tasks of profiled requests
+        self._previous_factory = None
+        self.mode = None  # None (idle), "timed" or "requests"
+        self._thread = None
+        self._stop = None
+        self._lock = threading.Lock()
+        # Request mode
+        self.route = None
+        self.remaining = 0
+        self.in_flight = 0
+        self._stopping = 0  # sampler threads signalled to stop but not yet joined
+        self.profiled_requests = 0
+        self.last_result = None
+
+    # --- Sampling ---
+
+    def _sample_once(self):
+        own = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            stack = _thread_stack(frame)
+            name = str(names.get(ident, ident))
+            if self.requests_only and not (name.startswith(WORKER_THREAD_PREFIXES) and _runs_app_code(stack)):
+                continue  # request mode: skip idle workers and background threads
+            path = [f"thread:{name}"] + [_label(f) for f in stack]
+            self.stacks[";".join(path)] += 1
+
+        if self.include_tasks and self.loop is not None:
+            try:
+                tasks = list(self.tasks) if self.requests_only else asyncio.all_tasks(self.loop)
+            except RuntimeError:
+                tasks = []  # the set changed while copying; next sample
+            for task in tasks:
+                try:
+                    if task.done():
+                        continue
+                    stack = _task_stack(task)
+                except Exception:
+                    continue  # the task changed under us; skip this sample
+                if stack:
+                    path = [f"task:{task.get_name()}"] + [_label(f) for f in stack]
+                    self.stacks[";".join(path)] += 1
+        self.samples += 1
+
+    def _run(self, stop):
+        while not stop.wait(self.interval_s):
+            try:
+                self._sample_once()
+            except Exception as e:
+                print(f"⚠ Profiler sample failed: {e}")
+
+    def _start_sampling(self):
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(self._stop,), name="profiler", daemon=True)
+        self._thread.start()
+
+    def _stop_sampling(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def collapsed(self):
+        """Aggregated samples in collapsed-stack format."""
+        return "\n".join(f"{stack} {count}" for stack, count in sorted(self.stacks.items())) + "\n"
+
+    def _reset(self, mode, include_tasks):
+        self.mode = mode
+        self.stacks = Counter()
+        self.samples = 0
+        self.include_tasks = include_tasks
+        self.loop = asyncio.get_running_loop()
+
+    # --- Time-boxed mode ---
+
+    async def profile(self, seconds, include_tasks=True):
+        """
+        Sample the whole worker for `seconds`.
+
+        Returns:
+            (collapsed stacks, sample count)
+
+        Raises:
+            RuntimeError: If a profile is already running
+        """
+        with self._lock:
+            if self.mode is not None:
+                raise RuntimeError(f"profiler busy ({self.mode})")
+            self._reset("timed", include_tasks)
+            self.requests_only = False
+        try:
+            self._start_sampling()
+            await asyncio.sleep(seconds)
+        finally:
+            await asyncio.to_thread(self._stop_sampling)
+            with self._lock:
+                self.mode = None
+        return self.collapsed(), self.samples
+
+    # --- Next-N-requests mode ---
+
+    def arm(self, route, count, include_tasks=True):
+        """
+        Profile the next `count` requests matching `route` (a Starlette route).
+
+        Raises:
+            RuntimeError: If a profile is already running
+        """
+        with self._lock:
+            if self.mode is not None:
+                raise RuntimeError(f"profiler busy ({self.mode})")
+            self._reset("requests", include_tasks)
+            self.requests_only = True
+            self.tasks = weakref.WeakSet()
+            self._previous_factory = self.loop.get_task_factory()
+            self.loop.set_task_factory(self._task_factory)
+            self.route = route
+            self.remaining = count
+            self.in_flight = 0
+            self.profiled_requests = 0
+            self.last_result = None
+
+    def claim(self, scope):
+        """Return True if this request should be profiled (consumes one slot)."""
+        if self.route is None:
+            return False
+        match, _ = self.route.matches(scope)
+        if match != Match.FULL:
+            return False
+        with self._lock:
+            if self.route is None or self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
+    def _task_factory(self, loop, coro, **kwargs):
+        """Create tasks as usual, remembering those created inside a profiled request."""
+        if self._previous_factory is not None:
+            task = self._previous_factory(loop, coro, **kwargs)
+        else:
+            task = asyncio.Task(coro, loop=loop, **kwargs)
+        context = kwargs.get("context")
+        if context.get(_profiled, False) if context is not None else _profiled.get():
+            self.tasks.add(task)
+        return task
+
+    def request_started(self, task):
+        with self._lock:
+            self.tasks.add(task)
+            self.in_flight += 1
+            if self._thread is None:
+                self._start_sampling()
+
+    async def request_finished(self, task):
+        with self._lock:
+            self.in_flight -= 1
+            self.profiled_requests += 1
+            if self.in_flight > 0:
+                return
+            # Signal the sampler here, but join it off the loop
+            thread, self._thread = self._thread, None
+            if thread is None:
+                return
+            self._stop.set()
+            self._stopping += 1
+        await asyncio.to_thread(thread.join)
+        with self._lock:
+            self._stopping -= 1
+            if self.mode == "requests" and self.remaining <= 0 and self.in_flight == 0 and not self._stopping:
+                self._finish()
+
+    def cancel(self):
+        """Disarm request mode, keeping whatever was sampled so far."""
+        with self._lock:
+            if self.mode != "requests":
+                return False
+            self.remaining = 0
+            if self.in_flight == 0 and not self._stopping:
+                self._finish()
+            return True
+
+    def _finish(self):
+        """Publish the request profile and go idle (caller holds the lock)."""
+        self.last_result = {
+            "route": self.route.path,
+            "requests": self.profiled_requests,
+            "samples": self.samples,
+            "collapsed": self.collapsed(),
+        }
+        if self.loop.get_task_factory() == self._task_factory:
+            self.loop.set_task_factory(self._previous_factory)
+        self._previous_factory = None
+        self.route = None
+        self.requests_only = False
+        self.mode = None
+
+    def snapshot(self):
+        """Serializable view of the profiler state."""
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "interval_ms": round(self.interval_s * 1000, 2),
+                "route": self.route.path if self.route is not None else None,
+                "remaining": self.remaining,
+                "in_flight": self.in_flight,
+                "profiled_requests": self.profiled_requests,
+                "samples": self.samples,
+                "result_ready": self.last_result is not None,
+            }
+
+
+class ProfileRequestsMiddleware:
+    """ASGI middleware feeding requests claimed by the profiler into it."""
+
+    def __init__(self, app, profiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.profiler.claim(scope):
+            await self.app(scope, receive, send)
+            return
+        token = _profiled.set(True)
+        task = asyncio.current_task()
+        self.profiler.request_started(task)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _profiled.reset(token)
+            await self.profiler.request_finished(task)
+
+
+# Shared profiler used by main
+profiler = SamplingProfiler()
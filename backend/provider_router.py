@@ -0,0 +1,267 @@
+"""
+provider_router.py
+
+Provider Health Router for ARACY's LLM layer.
+Keeps rolling success-rate and latency statistics per (provider, model),
+trips a circuit breaker on unhealthy ones and computes jittered backoff.
+
+When a provider is known to be down its breaker is open, so callers skip it
+immediately instead of paying the full timeout chain on every request. Only
+errors that say something about the provider's health (transport errors,
+timeouts, 5xx and 429) count against it; a rejected request (4xx) or an
+error raised by our own code is recorded without tripping the breaker.
+"""
+
+import math
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from metrics import llm_latency
+from config import (
+    ROUTER_WINDOW_SIZE,
+    ROUTER_MIN_CALLS,
+    ROUTER_FAILURE_RATE,
+    ROUTER_CONSECUTIVE_FAILURES,
+    ROUTER_COOLDOWN_S,
+    BACKOFF_BASE_S,
+    BACKOFF_MAX_S,
+)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+# Status codes that mean the provider, not the request, is the problem
+_PROVIDER_STATUS = {408, 429}
+# Exception class names used by the SDKs and httpx for transport failures
+_TRANSPORT_NAMES = ("Timeout", "Connection", "Connect", "Network", "Transport", "Unavailable")
+
+
+def is_provider_failure(error):
+    """
+    Return True if an exception should count against the provider's health.
+
+    Transport errors, timeouts, 5xx and 429 do; 4xx request errors (bad
+    prompt, Groq json_validate_failed) and our own ValueErrors do not.
+    """
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(error, "code", None)  # google exceptions
+    if isinstance(status, int):
+        return status >= 500 or status in _PROVIDER_STATUS
+    return any(part in type(error).__name__ for part in _TRANSPORT_NAMES)
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers (None when empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class ProviderHealth:
+    """
+    Rolling health statistics and circuit breaker for one provider/model.
+
+    The breaker opens when the recent failure rate or the run of consecutive
+    failures crosses its threshold. After a cooldown a single probe call is
+    let through (half-open); its outcome closes or re-opens the breaker.
+    """
+
+    def __init__(self, provider, model):
+        self.provider = provider
+        self.model = model
+        self.window = deque(maxlen=ROUTER_WINDOW_SIZE)  # (ok, latency_s)
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.consecutive_failures = 0
+        self.probe_in_flight = False
+        self.probe_started_at = 0.0
+        self.last_error = None
+        self.client_errors = 0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Return True if a call may be sent to this provider/model now."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= ROUTER_COOLDOWN_S:
+                self.state = HALF_OPEN
+                self.probe_in_flight = False
+            # A probe that never reported back must not keep the breaker shut
+            probe_stale = time.monotonic() - self.probe_started_at >= ROUTER_COOLDOWN_S
+            if self.state == HALF_OPEN and (not self.probe_in_flight or probe_stale):
+                self.probe_in_flight = True
+                self.probe_started_at = time.monotonic()
+                return True
+            return False
+
+    def is_open(self):
+        """Return True while the breaker rejects calls (without claiming a probe)."""
+        with self._lock:
+            if self.state == OPEN:
+                return time.monotonic() - self.opened_at < ROUTER_COOLDOWN_S
+            return self.state == HALF_OPEN and self.probe_in_flight
+
+    def record(self, ok, latency_s, error=None):
+        """Record the outcome of one call and update the breaker state."""
+        with self._lock:
+            self.window.append((ok, latency_s))
+            self.probe_in_flight = False
+
+            if ok:
+                self.consecutive_failures = 0
+                self.state = CLOSED
+                return
+
+            self.consecutive_failures += 1
+            self.last_error = str(error)[:200] if error else None
+
+            failures = sum(1 for success, _ in self.window if not success)
+            failure_rate = failures / len(self.window)
+            tripped = (
+                self.state == HALF_OPEN
+                or self.consecutive_failures >= ROUTER_CONSECUTIVE_FAILURES
+                or (len(self.window) >= ROUTER_MIN_CALLS and failure_rate >= ROUTER_FAILURE_RATE)
+            )
+            if tripped:
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def record_client_error(self, error):
+        """
+        Record a call the provider answered with an error that is not its
+        fault (4xx, our own parsing): the breaker and window are untouched,
+        except that a half-open probe counts as answered.
+        """
+        with self._lock:
+            self.client_errors += 1
+            self.last_error = str(error)[:200]
+            if self.state == HALF_OPEN and self.probe_in_flight:
+                self.probe_in_flight = False
+                self.consecutive_failures = 0
+                self.state = CLOSED
+
+    def latencies(self, successful_only=True):
+        """Latencies (seconds) currently in the rolling window."""
+        with self._lock:
+            return [latency for ok, latency in self.window if ok or not successful_only]
+
+    def snapshot(self):
+        """Serializable view of the current statistics."""
+        with self._lock:
+            calls = len(self.window)
+            successes = sum(1 for ok, _ in self.window if ok)
+            latencies = [latency for ok, latency in self.window if ok]
+            state = self.state
+            if state == OPEN and time.monotonic() - self.opened_at >= ROUTER_COOLDOWN_S:
+                state = HALF_OPEN
+        return {
+            "provider": self.provider,
+            "model": self.model,
+            "state": state,
+            "calls": calls,
+            "success_rate": round(successes / calls, 3) if calls else None,
+            "p50_ms": round(percentile(latencies, 50) * 1000, 1) if latencies else None,
+            "p95_ms": round(percentile(latencies, 95) * 1000, 1) if latencies else None,
+            "consecutive_failures": self.consecutive_failures,
+            "client_errors": self.client_errors,
+            "last_error": self.last_error,
+        }
+
+
+class ProviderRouter:
+    """
+    Registry of ProviderHealth entries shared by every LLM call site.
+    """
+
+    def __init__(self):
+        self._health = {}
+        self._lock = threading.Lock()
+
+    def health(self, provider, model):
+        """Get (or create) the health entry for a provider/model."""
+        key = (provider, model)
+        with self._lock:
+            entry = self._health.get(key)
+            if entry is None:
+                entry = ProviderHealth(provider, model)
+                self._health[key] = entry
+            return entry
+
+    def is_available(self, provider, model):
+        """
+        Return True if the breaker for provider/model lets a call through.
+
+        In the half-open state this claims the single probe slot, so only
+        call it right before actually sending the request.
+        """
+        return self.health(provider, model).allow()
+
+    def is_provider_down(self, provider):
+        """Return True if every tracked model of a provider has an open breaker."""
+        with self._lock:
+            entries = [h for (p, _), h in self._health.items() if p == provider]
+        return bool(entries) and all(entry.is_open() for entry in entries)
+
+    @contextmanager
+    def track(self, provider, model):
+        """
+        Time a provider call and record its outcome.
+
+        Usage:
+            with router.track("groq", model_id):
+                response = client.chat.completions.create(...)
+        """
+        entry = self.health(provider, model)
+        start = time.monotonic()
+        try:
+            yield entry
+        except Exception as e:
+            latency = time.monotonic() - start
+            if is_provider_failure(e):
+                entry.record(False, latency, e)
+                llm_latency.observe(latency, provider, model, "error")
+            else:
+                entry.record_client_error(e)
+                llm_latency.observe(latency, provider, model, "client_error")
+            raise
+        latency = time.monotonic() - start
+        entry.record(True, latency)
+        llm_latency.observe(latency, provider, model, "ok")
+
+    def snapshot(self):
+        """Serializable view of every tracked provider/model."""
+        with self._lock:
+            entries = list(self._health.values())
+        return [entry.snapshot() for entry in entries]
+
+
+def backoff_delay(attempt, base=None, cap=None):
+    """
+    Full-jitter exponential backoff delay for a retry attempt.
+
+    Args:
+        attempt: Zero-based retry attempt number
+        base: Base delay in seconds (defaults to BACKOFF_BASE_S)
+        cap: Maximum delay in seconds (defaults to BACKOFF_MAX_S)
+
+    Returns:
+        Delay in seconds, uniformly drawn from [0, min(cap, base * 2**attempt)]
+    """
+    base = BACKOFF_BASE_S if base is None else base
+    cap = BACKOFF_MAX_S if cap is None else cap
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+# Shared router used by llm_wrapper and main
+router = ProviderRouter()
@@ -0,0 +1,709 @@
+"""
+providers.py
+
+Unified LLM Provider Layer for ARACY.
+One interface (complete / stream) with Groq and Gemini adapters that share
+long-lived, pooled keep-alive HTTP clients, so requests reuse TLS connections
+instead of paying a handshake per call.
+
+Both llm_wrapper.py (LLMWrapper) and gemini_wrapper.py (GeminiWrapper) sit on
+top of this module; it also owns the shared Mirror Lab prompt construction.
+
+GAMP5 COMPLIANCE: This module receives data through function parameters only.
+No hardcoded personal data. All context is injected at runtime from config.py.
+"""
+
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from types import SimpleNamespace
+
+import httpx
+
+from config import (
+    get_muse_context,
+    get_api_keys,
+    LLM_POOL_SIZE,
+    LLM_KEEPALIVE_S,
+    LLM_CONNECT_TIMEOUT_S,
+    LLM_READ_TIMEOUT_S,
+    LLM_MAX_RETRIES,
+    LLM_MAX_TOKENS,
+    LLM_MOCK_SEED,
+    LLM_MOCK_LATENCY,
+    LLM_MOCK_LATENCY_MS,
+    LLM_MOCK_LATENCY_SPREAD,
+    LLM_MOCK_ERROR_RATE,
+    LLM_MOCK_TOKENS_PER_S,
+)
+from logic_protocols.mirror_config import get_identity_prompt, get_compact_identity_prompt
+from provider_router import router
+from token_budget import TASK_REFLECTION, identity_variant
+from usage_meter import meter, record_groq_usage, record_gemini_usage
+from tracing import span, start_span
+
+# System prompt for JSON-mode alint generation
+JSON_SYSTEM_PROMPT = "You are the Mirror Lab's Divine Muse Engine. You MUST respond with valid JSON only, no markdown, no code blocks, no explanations. Just pure JSON."
+
+# System prompt for streamed, line-based alint generation
+LINES_SYSTEM_PROMPT = "You are the Mirror Lab's Divine Muse Engine. Respond with one alint per line in the form 'Word - Meaning'. No JSON, no markdown, no numbering, no explanations."
+
+# System prompt for bond name generation
+BOND_NAME_SYSTEM_PROMPT = "You generate mystical bond names. Respond with ONLY the bond name, no explanations."
+
+# System prompt for batch bond name generation
+BOND_NAMES_SYSTEM_PROMPT = "You generate mystical bond names. Respond with ONLY the bond names, one per line, no numbering, no explanations."
+
+# Category-specific tone instructions appended to the identity prompt
+CATEGORY_INSTRUCTIONS = {
+    "silly": "\n\nTone: Playful, whimsical, lighthearted. Include a fun chemistry pun or cosmic joke.",
+    "deep": "\n\nTone: Profound, introspective, emotionally resonant. Explore the depths of connection.",
+    "astro": "\n\nTone: Mystical, celestial, prophetic. Focus heavily on current astrological transits and their meaning.",
+    "general": ""
+}
+
+# Gemini models tried (in order) when Groq is unavailable
+GEMINI_FALLBACK_MODELS = ["gemini-2.0-flash", "gemini-2.5-flash", "gemini-flash-latest"]
+
+
+def build_alint_prompt(name, profession, traits, astro_full_chart, category="general", prompt=None):
+    """
+    Build the Mirror Lab prompt shared by every provider.
+
+    Args:
+        name: The Muse's name
+        profession: The Muse's professional identity
+        traits: The Muse's personality traits and interests
+        astro_full_chart: Complete formatted astrological chart
+        category: Type of alint (general, silly, deep, astro)
+        prompt: Optional additional user prompt
+
+    Returns:
+        Fully populated prompt string
+    """
+    # Build the identity prompt with injected data
+    identity_prompt = get_identity_prompt(
+        name=name,
+        profession=profession,
+        traits=traits,
+        astro_full_chart=astro_full_chart
+    )
+
+    full_prompt = identity_prompt + CATEGORY_INSTRUCTIONS.get(category, "")
+
+    # Optionally append extra user prompt
+    if prompt:
+        full_prompt = f"{full_prompt}\n\nAdditional Context:\n{prompt}"
+
+    return full_prompt
+
+
+def build_muse_alint_prompt(category="general", prompt=None, task=TASK_REFLECTION):
+    """
+    Build the Mirror Lab prompt from the Muse context in config.py.
+
+    The task picks the prompt variant (see token_budget.TASK_PROFILES):
+    reflections get the full identity template, Lab lists the compact one,
+    and self-contained prompts such as the quiz get no identity prompt.
+    """
+    muse = get_muse_context()
+    variant = identity_variant(task)
+
+    if variant is None:
+        return prompt or ""
+
+    if variant == "compact":
+        compact_prompt = get_compact_identity_prompt(
+            name=muse['name'],
+            profession=muse['profession'],
+            astro_summary=muse['astro_summary']
+        ) + CATEGORY_INSTRUCTIONS.get(category, "")
+        return f"{compact_prompt}\n\n{prompt}" if prompt else compact_prompt
+
+    return build_alint_prompt(
+        name=muse['name'],
+        profession=muse['profession'],
+        traits=muse['traits'],
+        astro_full_chart=muse['astro_chart'],
+        category=category,
+        prompt=prompt
+    )
+
+
+def build_bond_name_prompt():
+    """Build the bond name prompt from the Muse context in config.py."""
+    muse = get_muse_context()
+
+    return f"""
+Generate a mystical, unique bond name for a cosmic connection.
+
+Context:
+- Muse: {muse['name']}, {muse['profession']}
+- Traits: {muse['traits']}
+- Astrological Signature: {muse['astro_summary']}
+
+Requirements:
+1. Combine MOLECULAR chemistry terms with CELESTIAL imagery
+2. Use 2-3 words maximum
+3. Should feel like an alchemical formula or cosmic spell
+4. Examples: "COVALENT STARDUST", "TRANSMUTE BOND", "NEBULA CATALYST"
+5. Return ONLY the bond name, nothing else
+
+Generate the bond name now:
+"""
+
+
+def build_bond_names_prompt(count, avoid=None):
+    """
+    Build the batch bond name prompt (one name per line).
+
+    Args:
+        count: Number of candidate names requested
+        avoid: Optional names that are already taken
+    """
+    muse = get_muse_context()
+    avoid_text = f"\nDo not reuse any of these names: {', '.join(avoid)}\n" if avoid else ""
+
+    return f"""
+Generate {count} mystical, unique bond names for cosmic connections.
+
+Context:
+- Muse: {muse['name']}, {muse['profession']}
+- Astrological Signature: {muse['astro_summary']}
+
+Requirements:
+1. Combine MOLECULAR chemistry terms with CELESTIAL imagery
+2. Use 2-3 words maximum per name
+3. Each should feel like an alchemical formula or cosmic spell
+4. Examples: "COVALENT STARDUST", "TRANSMUTE BOND", "NEBULA CATALYST"
+5. Every name must be different from the others
+6. Return ONLY the names, one per line, nothing else
+{avoid_text}
+Generate the {count} bond names now:
+"""
+
+
+def build_muse_prompt(base_prompt):
+    """
+    Legacy function for backward compatibility.
+    Incorporates Muse context into a base prompt.
+
+    Args:
+        base_prompt: The base prompt to enhance with Muse context
+
+    Returns:
+        Enhanced prompt with Muse details prepended
+    """
+    muse = get_muse_context()
+    muse_desc = (
+        f"Muse Name: {muse['name']}\n"
+        f"Birth Date: {muse['birth_date']}\n"
+        f"Profession: {muse['profession']}\n"
+        f"Traits: {muse['traits']}\n"
+        f"Astro Chart:\n{muse['astro_chart']}\n"
+    )
+    return f"{muse_desc}\n{base_prompt}"
+
+
+def get_best_model(client):
+    """
+    The Model Hunter: Dynamically discovers the best available Groq model.
+
+    Priority Logic:
+    1. The Muse: Newest Mixtral model
+    2. The Scholar: Newest Llama-3 model (8b or 70b)
+    3. The Survivor: Most recent model with JSON mode support
+
+    Args:
+        client: Initialized Groq client
+
+    Returns:
+        str: Model ID to use
+    """
+    try:
+        # Fetch all available models
+        models = client.models.list()
+
+        if not models or not hasattr(models, 'data'):
+            raise ValueError("No models returned from Groq API")
+
+        model_list = models.data
+
+        # Priority 1: Find newest Mixtral model
+        mixtral_models = [m for m in model_list if 'mixtral' in m.id.lower()]
+        if mixtral_models:
+            # Sort by created timestamp (newest first)
+            mixtral_models.sort(key=lambda x: x.created if hasattr(x, 'created') else 0, reverse=True)
+            selected = mixtral_models[0].id
+            print(f"✧ Model Hunter: Found Mixtral (The Muse) → {selected}")
+            return selected
+
+        # Priority 2: Find newest Llama-3 model (8b or 70b)
+        llama3_models = [m for m in model_list if 'llama-3' in m.id.lower() or 'llama3' in m.id.lower()]
+        if llama3_models:
+            # Prefer 70b over 8b, then sort by created timestamp
+            llama3_70b = [m for m in llama3_models if '70b' in m.id.lower()]
+            llama3_8b = [m for m in llama3_models if '8b' in m.id.lower()]
+
+            if llama3_70b:
+                llama3_70b.sort(key=lambda x: x.created if hasattr(x, 'created') else 0, reverse=True)
+                selected = llama3_70b[0].id
+                print(f"✧ Model Hunter: Found Llama-3 70B (The Scholar) → {selected}")
+                return selected
+            elif llama3_8b:
+                llama3_8b.sort(key=lambda x: x.created if hasattr(x, 'created') else 0, reverse=True)
+                selected = llama3_8b[0].id
+                print(f"✧ Model Hunter: Found Llama-3 8B (The Scholar) → {selected}")
+                return selected
+
+        # Priority 3: Most recent model with JSON mode support
+        # Filter models that likely support JSON mode (chat models)
+        chat_models = [m for m in model_list if 'chat' in m.id.lower() or 'instruct' in m.id.lower() or 'versatile' in m.id.lower()]
+        if chat_models:
+            chat_models.sort(key=lambda x: x.created if hasattr(x, 'created') else 0, reverse=True)
+            selected = chat_models[0].id
+            print(f"✧ Model Hunter: Found recent chat model (The Survivor) → {selected}")
+            return selected
+
+        # Last resort: pick first available model
+        if model_list:
+            selected = model_list[0].id
+            print(f"✧ Model Hunter: Using first available model (Emergency) → {selected}")
+            return selected
+
+        raise ValueError("No models available")
+
+    except Exception as e:
+        # Hard fallback if discovery fails
+        fallback = "llama-3.3-70b-versatile"
+        print(f"⚠ Model Hunter failed: {e}. Using hard fallback → {fallback}")
+        return fallback
+
+
+def _pooled_limits():
+    """Connection pool limits shared by every provider's HTTP client."""
+    return httpx.Limits(
+        max_connections=LLM_POOL_SIZE,
+        max_keepalive_connections=LLM_POOL_SIZE,
+        keepalive_expiry=LLM_KEEPALIVE_S
+    )
+
+
+def _timeout():
+    return httpx.Timeout(LLM_READ_TIMEOUT_S, connect=LLM_CONNECT_TIMEOUT_S)
+
+
+class LLMProvider:
+    """
+    Common interface for LLM providers.
+
+    Adapters hold one long-lived client each; every call goes through the
+    provider router (circuit breaker + health stats) and the usage meter.
+    """
+
+    name = "base"
+
+    def __init__(self, api_key):
+        self.api_key = api_key
+        self._default_model = None
+        self._lock = threading.Lock()
+
+    def default_model(self):
+        """Model used when the caller does not pick one."""
+        raise NotImplementedError
+
+    def complete(self, model, prompt, system=None, json_mode=False, temperature=0.8,
+                 max_tokens=LLM_MAX_TOKENS, category="general"):
+        """
+        Run one completion and return its text.
+
+        Raises:
+            RuntimeError: If the breaker for provider/model is open
+        """
+        if not router.is_available(self.name, model):
+            raise RuntimeError(f"circuit open for {self.name}/{model}")
+
+        attributes = {"llm.provider": self.name, "llm.model": model, "llm.max_tokens": max_tokens, "llm.json_mode": json_mode}
+        with span("llm.complete", **attributes):
+            start = time.monotonic()
+            with router.track(self.name, model):
+                response = self._complete(model, prompt, system, json_mode, temperature, max_tokens)
+            self._record_usage(response, model, category, time.monotonic() - start)
+            return self._text(response)
+
+    def stream(self, model, prompt, system=None, temperature=0.8, max_tokens=LLM_MAX_TOKENS, category="general"):
+        """
+        Stream a completion, yielding text deltas.
+
+        Raises:
+            RuntimeError: If the breaker for provider/model is open
+        """
+        if not router.is_available(self.name, model):
+            raise RuntimeError(f"circuit open for {self.name}/{model}")
+
+        # Each delta may be pulled from a different worker thread context, so
+        # this span is ended explicitly instead of being made current
+        stream_span = start_span("llm.stream", **{"llm.provider": self.name, "llm.model": model, "llm.max_tokens": max_tokens})
+        try:
+            with router.track(self.name, model):
+                yield from self._stream(model, prompt, system, temperature, max_tokens, category)
+        except Exception as e:
+            stream_span.fail(e)
+            raise
+        finally:
+            stream_span.end()
+
+    def complete_first(self, models, prompt, system=None, json_mode=False, temperature=0.8,
+                       max_tokens=LLM_MAX_TOKENS, category="general"):
+        """
+        Try models in order, skipping open breakers, and return the first answer.
+
+        Raises:
+            RuntimeError: If every model failed or was skipped
+        """
+        for model_name in models:
+            try:
+                text = self.complete(model_name, prompt, system, json_mode, temperature, max_tokens, category)
+                if text:
+                    return text
+
+            except Exception as model_error:
+                # Silently skip open breakers and 429 quota errors, try next model
+                if "circuit open" in str(model_error) or "429" in str(model_error) or "RESOURCE_EXHAUSTED" in str(model_error):
+                    continue
+                print(f"⚠ {self.name} model {model_name} failed: {model_error}")
+                continue
+
+        raise RuntimeError(f"All {self.name} models exhausted or unavailable")
+
+    def _complete(self, model, prompt, system, json_mode, temperature, max_tokens):
+        raise NotImplementedError
+
+    def _stream(self, model, prompt, system, temperature, max_tokens, category):
+        raise NotImplementedError
+
+    def _record_usage(self, response, model, category, latency_s):
+        pass
+
+    def _text(self, response):
+        raise NotImplementedError
+
+
+class GroqProvider(LLMProvider):
+    """Groq adapter on a pooled, keep-alive httpx client."""
+
+    name = "groq"
+
+    def __init__(self, api_key):
+        super().__init__(api_key)
+        from groq import Groq
+
+        self.http_client = httpx.Client(limits=_pooled_limits(), timeout=_timeout())
+        self.client = Groq(
+            api_key=api_key,
+            http_client=self.http_client,
+            timeout=_timeout(),
+            max_retries=LLM_MAX_RETRIES
+        )
+
+    def default_model(self):
+        """Run the Model Hunter once per process and reuse its answer."""
+        with self._lock:
+            if self._default_model is None:
+                self._default_model = get_best_model(self.client)
+            return self._default_model
+
+    def _complete(self, model, prompt, system, json_mode, temperature, max_tokens):
+        messages = []
+        if system:
+            messages.append({"role": "system", "content": system})
+        messages.append({"role": "user", "content": prompt})
+
+        options = {"response_format": {"type": "json_object"}} if json_mode else {}
+        return self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **options
+        )
+
+    def _stream(self, model, prompt, system, temperature, max_tokens, category):
+        start = time.monotonic()
+        messages = []
+        if system:
+            messages.append({"role": "system", "content": system})
+        messages.append({"role": "user", "content": prompt})
+
+        stream = self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True
+        )
+
+        for chunk in stream:
+            # Groq reports usage on the final chunk under x_groq
+            x_groq = getattr(chunk, "x_groq", None)
+            if x_groq is not None and getattr(x_groq, "usage", None) is not None:
+                record_groq_usage(x_groq, model, category, time.monotonic() - start)
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+
+    def _record_usage(self, response, model, category, latency_s):
+        record_groq_usage(response, model, category, latency_s)
+
+    def _text(self, response):
+        return response.choices[0].message.content
+
+
+class GeminiProvider(LLMProvider):
+    """Gemini adapter on a pooled, keep-alive google-genai client."""
+
+    name = "gemini"
+
+    def __init__(self, api_key):
+        super().__init__(api_key)
+        from google import genai
+        from google.genai import types
+
+        self.client = genai.Client(
+            api_key=api_key,
+            http_options=types.HttpOptions(
+                timeout=int(LLM_READ_TIMEOUT_S * 1000),
+                client_args={"limits": _pooled_limits()}
+            )
+        )
+
+    def default_model(self):
+        return GEMINI_FALLBACK_MODELS[0]
+
+    def _complete(self, model, prompt, system, json_mode, temperature, max_tokens):
+        from google.genai import types
+
+        config = types.GenerateContentConfig(
+            system_instruction=system,
+            response_mime_type="application/json" if json_mode else None,
+            temperature=temperature,
+            max_output_tokens=max_tokens
+        )
+        return self.client.models.generate_content(
+            model=model,
+            contents=prompt,
+            config=config
+        )
+
+    def _stream(self, model, prompt, system, temperature, max_tokens, category):
+        from google.genai import types
+
+        start = time.monotonic()
+        last_chunk = None
+        for chunk in self.client.models.generate_content_stream(
+            model=model,
+            contents=prompt,
+            config=types.GenerateContentConfig(
+                system_instruction=system,
+                temperature=temperature,
+                max_output_tokens=max_tokens
+            )
+        ):
+            last_chunk = chunk
+            text = getattr(chunk, "text", None)
+            if text:
+                yield text
+        if last_chunk is not None:
+            record_gemini_usage(last_chunk, model, category, time.monotonic() - start)
+
+    def _record_usage(self, response, model, category, latency_s):
+        record_gemini_usage(response, model, category, latency_s)
+
+    def _text(self, response):
+        # Extract text from response
+        if hasattr(response, 'text'):
+            return response.text
+        elif hasattr(response, 'candidates') and response.candidates:
+            return response.candidates[0].content.parts[0].text
+        return str(response)
+
+
+# Word material for the mock provider
+_MOCK_ROOTS = ["Lumin", "Astr", "Caten", "Sider", "Vesper", "Noct", "Cord", "Ether", "Aur", "Cael",
+               "Selen", "Nebul", "Cryst", "Vel", "Orbit", "Ion", "Mir", "Sol", "Thal", "Obsid"]
+_MOCK_SUFFIXES = ["ara", "ion", "elle", "ora", "ium", "is", "ette", "ine", "aeon", "ael"]
+_MOCK_IMAGES = ["a comet's quiet tail", "moonlight on obsidian", "a catalyst in warm solution",
+                "pink petals on a veiled altar", "the first star after rain", "a covalent promise"]
+_MOCK_NAME_FIRST = ["COVALENT", "NEBULA", "LUNAR", "CATALYST", "IONIC", "ASTRAL", "VELVET", "PRISM"]
+_MOCK_NAME_SECOND = ["STARDUST", "ORBIT", "ECLIPSE", "ALCHEMY", "REVERIE", "HALO", "TIDE", "AURORA"]
+
+
+class MockProvider(LLMProvider):
+    """
+    Offline, deterministic provider for load and latency testing (LLM_PROVIDER=mock).
+
+    Answers every task the app sends (Lab lists in JSON or lines, reflections,
+    quizzes, single and batched bond names) with schema-valid content, after a
+    sampled time-to-first-token plus LLM_MOCK_TOKENS_PER_S generation time.
+    Errors are injected at LLM_MOCK_ERROR_RATE. Output for a given prompt is
+    reproducible from LLM_MOCK_SEED and how often that prompt was sent.
+    """
+
+    name = "mock"
+
+    def __init__(self, api_key=None):
+        super().__init__(api_key)
+        self.client = None
+        self._calls = Counter()
+
+    def default_model(self):
+        return "mock-alint"
+
+    def _rng(self, prompt):
+        with self._lock:
+            self._calls[prompt] += 1
+            occurrence = self._calls[prompt]
+        return random.Random(f"{LLM_MOCK_SEED}:{occurrence}:{prompt}")
+
+    def _latency(self, rng):
+        """Time to first token in seconds, drawn from the configured distribution."""
+        base = LLM_MOCK_LATENCY_MS / 1000
+        if LLM_MOCK_LATENCY == "fixed":
+            return base
+        if LLM_MOCK_LATENCY == "uniform":
+            return max(0.0, rng.uniform(base * (1 - LLM_MOCK_LATENCY_SPREAD), base * (1 + LLM_MOCK_LATENCY_SPREAD)))
+        # lognormal: base is the median, spread is sigma (long right tail)
+        return base * math.exp(rng.gauss(0, LLM_MOCK_LATENCY_SPREAD))
+
+    def _alint(self, rng):
+        word = rng.choice(_MOCK_ROOTS) + rng.choice(_MOCK_SUFFIXES)
+        return f"{word} - The bond that glows between us like {rng.choice(_MOCK_IMAGES)}"
+
+    def _answer(self, rng, prompt, system, json_mode):
+        """Schema-valid content for whichever task the prompt asks for."""
+        count = re.search(r"(?:Create exactly|Generate) (\d+)", prompt)
+        count = int(count.group(1)) if count else 1
+
+        if system == BOND_NAME_SYSTEM_PROMPT:
+            return f"{rng.choice(_MOCK_NAME_FIRST)} {rng.choice(_MOCK_NAME_SECOND)}"
+        if "bond names" in prompt:
+            return "\n".join(
+                f"{rng.choice(_MOCK_NAME_FIRST)} {rng.choice(_MOCK_NAME_SECOND)} {rng.choice(_MOCK_ROOTS).upper()}"
+                for _ in range(count)
+            )
+        if "quiz questions" in prompt:
+            return json.dumps({"questions": [
+                {
+                    "question": f"Which element catalyses reaction {i + 1} of the Divine Mirror?",
+                    "answers": [rng.choice(_MOCK_ROOTS) + suffix for suffix in ("ium", "ine", "on", "ite")],
+                    "correctAnswer": rng.randrange(4)
+                }
+                for i in range(count)
+            ]})
+        if "Create exactly" in prompt:
+            alints = [self._alint(rng) for _ in range(count)]
+            return json.dumps({"alints": alints}) if json_mode else "\n".join(alints)
+        word = rng.choice(_MOCK_ROOTS) + rng.choice(_MOCK_SUFFIXES)
+        return json.dumps({
+            "title": word,
+            "origin": f"From the Latin root of {word}, a mock etymology.",
+            "reflection": f"Like {rng.choice(_MOCK_IMAGES)}, you steady every reaction.",
+            "interaction": "Which noble gas never bonds, and why are we the exception?"
+        })
+
+    def _generate(self, prompt, system, json_mode, max_tokens):
+        rng = self._rng(prompt)
+        ttft = self._latency(rng)
+        if rng.random() < LLM_MOCK_ERROR_RATE:
+            time.sleep(ttft)
+            raise ConnectionError("mock provider error (injected)")
+        # Output longer than max_tokens is truncated, like a real completion
+        text = self._answer(rng, prompt, system, json_mode)[:max_tokens * 4]
+        return text, ttft
+
+    def _complete(self, model, prompt, system, json_mode, temperature, max_tokens):
+        text, ttft = self._generate(prompt, system, json_mode, max_tokens)
+        completion_tokens = math.ceil(len(text) / 4)
+        time.sleep(ttft + completion_tokens / LLM_MOCK_TOKENS_PER_S)
+        return SimpleNamespace(
+            text=text,
+            prompt_tokens=math.ceil(len((system or "") + prompt) / 4),
+            completion_tokens=completion_tokens
+        )
+
+    def _stream(self, model, prompt, system, temperature, max_tokens, category):
+        start = time.monotonic()
+        text, ttft = self._generate(prompt, system, False, max_tokens)
+        time.sleep(ttft)
+        # One ~4 character token per step
+        for i in range(0, len(text), 4):
+            time.sleep(1 / LLM_MOCK_TOKENS_PER_S)
+            yield text[i:i + 4]
+        self._record_usage(SimpleNamespace(
+            prompt_tokens=math.ceil(len((system or "") + prompt) / 4),
+            completion_tokens=math.ceil(len(text) / 4)
+        ), model, category, time.monotonic() - start)
+
+    def _record_usage(self, response, model, category, latency_s):
+        meter.record(
+            "mock", model, category,
+            response.prompt_tokens,
+            response.completion_tokens,
+            response.prompt_tokens + response.completion_tokens,
+            latency_s,
+        )
+
+    def _text(self, response):
+        return response.text
+
+
+# Long-lived provider instances, one per (provider, api_key)
+_PROVIDER_CLASSES = {"groq": GroqProvider, "gemini": GeminiProvider, "mock": MockProvider}
+_providers = {}
+_providers_lock = threading.Lock()
+
+
+def resolve_api_key(name):
+    """API key for a provider from config.py (or the environment)."""
+    api_keys = get_api_keys()
+    env_name = f"{name.upper()}_API_KEY"
+    return api_keys.get(f"{name}_api_key") or os.getenv(env_name)
+
+
+def get_provider(name, api_key=None):
+    """
+    Get the shared provider adapter, creating its pooled client on first use.
+
+    Args:
+        name: "groq", "gemini" or "mock"
+        api_key: Explicit key (if None, loads from config; the mock needs none)
+
+    Raises:
+        ValueError: If no API key is available for the provider
+    """
+    if name == "mock":
+        api_key = api_key or "mock"
+    if api_key is None:
+        api_key = resolve_api_key(name)
+    if not api_key:
+        raise ValueError(f"{name.upper()}_API_KEY not found in config or environment variables")
+
+    key = (name, api_key)
+    with _providers_lock:
+        provider = _providers.get(key)
+        if provider is None:
+            provider = _PROVIDER_CLASSES[name](api_key)
+            _providers[key] = provider
+        return provider
+
+
+def is_configured(name):
+    """Return True if an API key is available for the provider."""
+    return name == "mock" or bool(resolve_api_key(name))
@@ -0,0 +1,195 @@
+"""
+quiz_cache.py
+
+Daily Quiz Cache for The Riddle.
+A bond's quiz is generated once per day, validated, persisted to
+quiz_cache.json and served from memory on every later load, so reopening the
+screen is instant and the questions do not change mid-session. Quizzes for
+known bonds can optionally be precomputed overnight.
+"""
+
+import asyncio
+import datetime
+import json
+import os
+import threading
+
+from config import QUIZ_MIN_QUESTIONS, QUIZ_CACHE_DAYS, QUIZ_PRECOMPUTE_HOUR, data_path
+from logger import log_error
+
+QUIZ_CACHE_PATH = data_path("quiz_cache.json")  # mock quizzes never reach real bonds
+
+
+def today():
+    """Cache day key (server local date)."""
+    return datetime.date.today().isoformat()
+
+
+def validate_quiz(parsed):
+    """
+    Keep only well-formed questions from a parsed quiz completion.
+
+    A question needs non-empty question text, exactly 4 non-empty answers and
+    an integer correctAnswer in range.
+
+    Args:
+        parsed: Parsed JSON ({"questions": [...]} or a bare list)
+
+    Returns:
+        {"questions": [...]} with the valid questions
+
+    Raises:
+        ValueError: If fewer than QUIZ_MIN_QUESTIONS questions are valid
+    """
+    questions = parsed.get("questions") if isinstance(parsed, dict) else parsed
+    if not isinstance(questions, list):
+        raise ValueError("quiz has no questions array")
+
+    valid = []
+    for item in questions:
+        if not isinstance(item, dict):
+            continue
+        question = item.get("question")
+        answers = item.get("answers")
+        correct = item.get("correctAnswer")
+        if not isinstance(question, str) or not question.strip():
+            continue
+        if not isinstance(answers, list) or len(answers) != 4:
+            continue
+        if not all(isinstance(a, (str, int, float)) and str(a).strip() for a in answers):
+            continue
+        if isinstance(correct, bool) or not isinstance(correct, int) or not 0 <= correct < 4:
+            continue
+        valid.append({
+            "question": question.strip(),
+            "answers": [str(a).strip() for a in answers],
+            "correctAnswer": correct
+        })
+
+    if len(valid) < QUIZ_MIN_QUESTIONS:
+        raise ValueError(f"only {len(valid)} valid quiz questions")
+    return {"questions": valid}
+
+
+class QuizCache:
+    """
+    Per-bond, per-day quiz store backed by quiz_cache.json.
+
+    Args:
+        path: JSON file the cache is persisted to
+    """
+
+    def __init__(self, path=QUIZ_CACHE_PATH):
+        self.path = path
+        self.entries = {}  # bond_id -> {"date": "YYYY-MM-DD", "quiz": {...}}
+        self.hits = 0
+        self.misses = 0
+        self.precomputed = 0
+        self._lock = threading.Lock()
+        self._persist_lock = threading.Lock()  # one writer of quiz_cache.json at a time
+        self._task = None
+        self._load()
+
+    def _load(self):
+        """Resume the cache from quiz_cache.json if present."""
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+        except Exception as e:
+            log_error(f"Failed to load quiz cache: {e}", level="WARNING")
+
+    def persist(self):
+        """
+        Write the cache to quiz_cache.json (atomic replace), dropping days older
+        than QUIZ_CACHE_DAYS. Blocking: callers on the event loop use asyncio.to_thread.
+        """
+        cutoff = (datetime.date.today() - datetime.timedelta(days=QUIZ_CACHE_DAYS)).isoformat()
+        try:
+            with self._persist_lock:
+                with self._lock:
+                    self.entries = {k: v for k, v in self.entries.items() if v.get("date", "") > cutoff}
+                    entries = dict(self.entries)
+                payload = json.dumps(entries, indent=2, ensure_ascii=False)
+                with open(f"{self.path}.tmp", "w", encoding="utf-8") as f:
+                    f.write(payload)
+                os.replace(f"{self.path}.tmp", self.path)
+        except Exception as e:
+            log_error(f"Failed to persist quiz cache: {e}", level="WARNING")
+
+    def get(self, bond_id, day=None):
+        """Return the bond's quiz for the day, or None on a miss."""
+        with self._lock:
+            entry = self.entries.get(bond_id)
+            if entry and entry.get("date") == (day or today()):
+                self.hits += 1
+                return entry["quiz"]
+            self.misses += 1
+            return None
+
+    async def put(self, bond_id, quiz, day=None):
+        """Store a validated quiz as the bond's quiz for the day (file written in a thread)."""
+        with self._lock:
+            self.entries[bond_id] = {"date": day or today(), "quiz": quiz}
+        await asyncio.to_thread(self.persist)
+
+    async def precompute(self, build, bond_ids):
+        """
+        Build today's quiz for every bond that does not have one yet.
+
+        Args:
+            build: Async callable (bond_id) -> validated quiz (raises on failure)
+            bond_ids: Bond ids to precompute
+        """
+        day = today()
+        for bond_id in bond_ids:
+            with self._lock:
+                entry = self.entries.get(bond_id)
+                if entry and entry.get("date") == day:
+                    continue
+            try:
+                await self.put(bond_id, await build(bond_id), day)
+                self.precomputed += 1
+            except Exception as e:
+                log_error(f"Quiz precompute failed for {bond_id}: {e}", level="WARNING")
+
+    async def run(self, build, list_bonds):
+        """Background loop: precompute every day at QUIZ_PRECOMPUTE_HOUR (local time)."""
+        while True:
+            now = datetime.datetime.now()
+            next_run = now.replace(hour=QUIZ_PRECOMPUTE_HOUR, minute=0, second=0, microsecond=0)
+            if next_run <= now:
+                next_run += datetime.timedelta(days=1)
+            await asyncio.sleep((next_run - now).total_seconds())
+            try:
+                await self.precompute(build, list_bonds())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log_error(f"Quiz precompute loop error: {e}", level="WARNING")
+
+    def start(self, build, list_bonds):
+        """Start overnight precomputation on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run(build, list_bonds))
+
+    async def stop(self):
+        """Cancel overnight precomputation."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def snapshot(self):
+        """Serializable view of cache size and counters."""
+        with self._lock:
+            return {
+                "entries": len(self.entries),
+                "today": sum(1 for entry in self.entries.values() if entry.get("date") == today()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "precomputed": self.precomputed,
+            }
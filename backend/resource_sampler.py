@@ -0,0 +1,130 @@
+"""
+resource_sampler.py
+
+Resource Sampler for The Resource Footprint plaque.
+A background task samples process RSS, CPU, open file descriptors, thread
+count, event-loop lag and in-flight requests every RESOURCE_SAMPLE_INTERVAL_S
+into a fixed-size ring buffer, so the footprint endpoint just returns the
+latest sample and a short history instead of measuring (and sleeping) on the
+request path.
+"""
+
+import asyncio
+import datetime
+import os
+import platform
+from collections import deque
+
+import psutil
+
+from config import RESOURCE_SAMPLE_INTERVAL_S, RESOURCE_HISTORY_SIZE
+from logger import log_error
+
+
+class ResourceSampler:
+    """
+    Periodic process metrics kept in a ring buffer.
+
+    Args:
+        interval_s: Seconds between samples
+        history: Number of samples kept
+    """
+
+    def __init__(self, interval_s=RESOURCE_SAMPLE_INTERVAL_S, history=RESOURCE_HISTORY_SIZE):
+        self.interval_s = interval_s
+        self.samples = deque(maxlen=history)
+        self.process = psutil.Process(os.getpid())
+        self.process.cpu_percent(None)  # prime: later calls measure since the previous one
+        self.system = platform.system()
+        self.python_version = platform.python_version()
+        self.in_flight = 0
+        self._task = None
+
+    def _open_fds(self):
+        try:
+            if hasattr(self.process, "num_fds"):
+                return self.process.num_fds()
+            return self.process.num_handles()  # Windows
+        except (psutil.Error, AttributeError):
+            return None
+
+    def sample(self, loop_lag_ms=0.0):
+        """Take one sample (non-blocking) and append it to the ring buffer."""
+        with self.process.oneshot():
+            rss = self.process.memory_info().rss
+            cpu = self.process.cpu_percent(None)
+            threads = self.process.num_threads()
+        entry = {
+            "timestamp": datetime.datetime.now().isoformat(timespec='seconds'),
+            "rss_mb": round(rss / (1024 * 1024), 2),
+            "cpu_percent": cpu,
+            "open_fds": self._open_fds(),
+            "threads": threads,
+            "loop_lag_ms": round(loop_lag_ms, 2),
+            "in_flight": self.in_flight,
+        }
+        self.samples.append(entry)
+        return entry
+
+    def latest(self):
+        """The most recent sample (taking one now if none exists yet)."""
+        return self.samples[-1] if self.samples else self.sample()
+
+    def history(self, count):
+        """The last `count` samples, oldest first."""
+        if count <= 0:
+            return []
+        return list(self.samples)[-count:]
+
+    async def run(self):
+        """
+        Sampling loop. Event-loop lag is how late the loop woke up from its
+        sleep: time spent by callbacks that blocked the loop in between.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval_s)
+            lag_ms = max(0.0, (loop.time() - started - self.interval_s) * 1000)
+            try:
+                self.sample(lag_ms)
+            except Exception as e:
+                log_error(f"Resource sampling failed: {e}", level="WARNING")
+
+    def start(self):
+        """Start the sampling task on the running event loop."""
+        if self._task is None:
+            self.sample()
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Cancel the sampling task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+class InFlightMiddleware:
+    """ASGI middleware counting HTTP requests in progress (including open streams)."""
+
+    def __init__(self, app, sampler):
+        self.app = app
+        self.sampler = sampler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        self.sampler.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.sampler.in_flight -= 1
+
+
+# Shared sampler used by main
+resources = ResourceSampler()
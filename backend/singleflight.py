@@ -0,0 +1,84 @@
+"""
+singleflight.py
+
+Singleflight coalescing for ARACY's generation endpoints.
+Concurrent identical requests share one in-flight task, and its result
+(or exception) fans out to every waiter, so duplicate load never reaches
+the LLM provider.
+"""
+
+import asyncio
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent async calls by key.
+
+    The first caller for a key starts the work as an independent task;
+    callers arriving while it runs await the same task. A waiter that is
+    cancelled (e.g. the client disconnected) does not cancel the shared work.
+    """
+
+    def __init__(self):
+        self._inflight = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key, fn):
+        """
+        Run fn() once per key among concurrent callers.
+
+        Args:
+            key: Normalized request key
+            fn: Zero-argument callable returning an awaitable
+
+        Returns:
+            The shared result of fn()
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def snapshot(self):
+        """Serializable view of the coalescing counters."""
+        return {
+            "in_flight": len(self._inflight),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+        }
+
+
+def normalize_lab_request(style, language, catalysts, vibe):
+    """
+    Canonical Lab generation parameters.
+
+    Case, surrounding whitespace, catalyst order and duplicate catalysts
+    do not change the generated content, so they are normalized away. The
+    leader generates from these same values, so every coalesced follower
+    gets output built from exactly what its key describes.
+
+    Returns:
+        (style, language, sorted catalysts, vibe)
+    """
+    return (
+        (style or "deep").strip().lower(),
+        (language or "en").strip().lower(),
+        sorted({str(c).strip().lower() for c in catalysts or [] if str(c).strip()}),
+        (vibe or "").strip().lower(),
+    )
+
+
+def lab_request_key(style, language, catalysts, vibe):
+    """Normalized singleflight key for a Lab generation request."""
+    style, language, catalysts, vibe = normalize_lab_request(style, language, catalysts, vibe)
+    return "lab:{}|{}|{}|{}".format(style, language, ",".join(catalysts), vibe)
+
+
+# Shared instance used by main
+flights = SingleFlight()
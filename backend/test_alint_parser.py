@@ -0,0 +1,82 @@
+"""
+test_alint_parser.py
+
+Shapes of LLM output the alint parser must handle (run with pytest from backend/).
+"""
+
+import json
+
+from alint_parser import AlintParser, parse_alints
+
+LUMINA = "Lumina - the light that guides my soul"
+ASTER = "Aster - my little star in every sky"
+
+
+def test_json_array_of_strings():
+    alints, rejections = parse_alints(json.dumps([LUMINA, ASTER]))
+    assert alints == [LUMINA, ASTER]
+    assert rejections == []
+
+
+def test_whole_items_under_alint_key():
+    text = json.dumps({"alints": [{"alint": LUMINA}, {"alint": ASTER}]})
+    alints, rejections = parse_alints(text)
+    assert alints == [LUMINA, ASTER]
+    assert rejections == []
+
+
+def test_whole_items_under_endearment_key():
+    text = json.dumps({"endearments": [{"endearment": LUMINA}, {"endearment": ASTER}]})
+    assert parse_alints(text) == ([LUMINA, ASTER], [])
+
+
+def test_word_meaning_pairs():
+    text = json.dumps({"alints": [
+        {"word": "Lumina", "meaning": "the light that guides my soul"},
+        {"term": "Aster", "definition": "my little star in every sky"},
+    ]})
+    assert parse_alints(text) == ([LUMINA, ASTER], [])
+
+
+def test_meaning_before_word():
+    text = json.dumps([{"description": "the light that guides my soul", "title": "Lumina"}])
+    assert parse_alints(text) == ([LUMINA], [])
+
+
+def test_metadata_keys_are_ignored():
+    text = json.dumps({"alints": [
+        {"word": "Lumina", "meaning": "the light that guides my soul", "language": "en", "vibe": "soft"},
+    ], "language": "en"})
+    assert parse_alints(text) == ([LUMINA], [])
+
+
+def test_separator_value_is_whole_item_under_any_key():
+    text = json.dumps({"alints": [{"text": LUMINA}]})
+    assert parse_alints(text) == ([LUMINA], [])
+
+
+def test_unpaired_halves_are_rejected():
+    text = json.dumps([
+        {"word": "Lumina"},
+        {"word": "Aster", "meaning": "my little star in every sky"},
+        {"meaning": "a meaning without its word"},
+    ])
+    alints, rejections = parse_alints(text)
+    assert alints == [ASTER]
+    assert sorted(reason for _, reason in rejections) == ["unpaired meaning", "unpaired word"]
+
+
+def test_plain_numbered_lines():
+    alints, rejections = parse_alints(f"1. {LUMINA}\n2) **{ASTER}**\nnot an alint")
+    assert alints == [LUMINA, ASTER]
+    assert rejections == [("not an alint", "missing separator")]
+
+
+def test_streamed_deltas_match_whole_parse():
+    text = json.dumps({"alints": [{"alint": LUMINA}, {"word": "Aster", "meaning": "my little star in every sky"}]})
+    parser = AlintParser()
+    streamed = []
+    for i in range(0, len(text), 7):
+        streamed += parser.feed(text[i:i + 7])
+    streamed += parser.finish()
+    assert streamed == [LUMINA, ASTER]
@@ -0,0 +1,111 @@
+"""
+test_job_queue.py
+
+Journal replay and retries of the background job queue (run with pytest from backend/).
+"""
+
+import asyncio
+import json
+
+import job_queue
+from job_queue import JobQueue
+
+
+def write_journal(path, records):
+    path.write_text("".join(json.dumps(record) + "\n" for record in records))
+
+
+def run_queue(queue):
+    """Start the queue, let it drain, stop it (flushes the journal)."""
+    async def main():
+        queue.start()
+        await queue.stop()
+    asyncio.run(main())
+
+
+def test_pending_jobs_are_replayed_once(tmp_path):
+    journal = tmp_path / "job_journal.jsonl"
+    write_journal(journal, [
+        {"id": "a", "kind": "save", "payload": {"word": "Lumina"}},
+        {"id": "b", "kind": "save", "payload": {"word": "Aster"}},
+        {"id": "a", "done": True},
+        {"id": "c", "kind": "save", "payload": {"word": "Vesper"}},
+    ])
+    saved = []
+    queue = JobQueue(path=str(journal))
+    queue.register("save", lambda word: saved.append(word))
+    run_queue(queue)
+
+    assert saved == ["Aster", "Vesper"]
+    assert queue.snapshot()["completed"] == 2
+    assert journal.read_text() == ""  # nothing pending: truncated
+
+    # Nothing left to replay on the next start
+    again = JobQueue(path=str(journal))
+    again.register("save", lambda word: saved.append(word))
+    run_queue(again)
+    assert saved == ["Aster", "Vesper"]
+
+
+def test_torn_final_line_is_ignored(tmp_path):
+    journal = tmp_path / "job_journal.jsonl"
+    journal.write_text(json.dumps({"id": "a", "kind": "save", "payload": {"word": "Lumina"}}) + "\n{\"id\": \"b\", \"ki")
+    saved = []
+    queue = JobQueue(path=str(journal))
+    queue.register("save", lambda word: saved.append(word))
+    run_queue(queue)
+    assert saved == ["Lumina"]
+
+
+def test_failing_job_is_retried(tmp_path, monkeypatch):
+    monkeypatch.setattr(job_queue, "backoff_delay", lambda attempt: 0)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise OSError("disk busy")
+
+    queue = JobQueue(path=str(tmp_path / "job_journal.jsonl"), max_retries=3)
+    queue.register("flaky", flaky)
+
+    async def main():
+        queue.start()
+        assert queue.submit("flaky")
+        await queue.stop()
+    asyncio.run(main())
+
+    assert len(attempts) == 3
+    assert queue.snapshot()["retried"] == 2
+    assert queue.snapshot()["completed"] == 1
+
+
+def test_job_failing_every_retry_is_not_replayed(tmp_path, monkeypatch):
+    monkeypatch.setattr(job_queue, "backoff_delay", lambda attempt: 0)
+    journal = tmp_path / "job_journal.jsonl"
+
+    def broken():
+        raise OSError("read-only file system")
+
+    queue = JobQueue(path=str(journal), max_retries=1)
+    queue.register("broken", broken)
+
+    async def main():
+        queue.start()
+        queue.submit("broken")
+        await queue.stop()
+    asyncio.run(main())
+
+    assert queue.snapshot()["failed"] == 1
+    assert JobQueue(path=str(journal))._pending_from_journal() == []
+
+
+def test_job_ids_are_unique_across_queues(tmp_path):
+    journal = tmp_path / "job_journal.jsonl"
+    first, second = JobQueue(path=str(journal)), JobQueue(path=str(journal))
+    for queue in (first, second):
+        for _ in range(50):
+            queue.submit("noop")
+        queue.flush_journal()
+    ids = [record["id"] for record in first._pending_from_journal()]
+    assert len(ids) == len(set(ids)) == 100
@@ -0,0 +1,98 @@
+"""
+test_log_store.py
+
+Ids, cursors and compaction of the segmented log store (run with pytest from backend/).
+"""
+
+import json
+
+import pytest
+
+from logger import LogStore
+from log_retention import compact_entries
+
+
+@pytest.fixture
+def store(tmp_path):
+    # An index marked as migrated keeps the legacy error_log.json out of the test
+    (tmp_path / "index.json").write_text(json.dumps({"segments": [], "legacy_migrated": True}))
+    store = LogStore(str(tmp_path), max_bytes=600, max_age_s=10 ** 6)
+    yield store
+    store.close()
+
+
+def fill(store, count):
+    for i in range(count):
+        store.append({"timestamp": f"2020-01-01T00:{i // 60:02d}:{i % 60:02d}", "level": "ERROR",
+                      "message": f"Alint 'x{i}' added to vault"})
+
+
+def compact(store, segment):
+    kept, _, _ = compact_entries(store.read_segment(segment), set(store.ignored_ids), "2000", min_count=2)
+    store.replace_segment(segment["file"], kept, compacted="2020-01-02T00:00:00")
+
+
+def page_all(store, cursor, limit=3):
+    ids, more = [], True
+    while more:
+        entries, cursor, more = store.query(after=cursor, limit=limit)
+        ids += [entry["id"] for entry in entries]
+    return ids, cursor
+
+
+def test_ids_are_monotonic_and_segments_start_at_their_first_id(store):
+    fill(store, 20)
+    segments = store.segments()
+    assert len(segments) > 1
+    for segment in segments:
+        assert store.read_segment(segment)[0]["id"] == segment["first_id"]
+    assert [e["id"] for e in store.entries()] == list(range(1, 21))
+
+
+def test_cursor_returns_only_new_entries(store):
+    fill(store, 5)
+    _, cursor, _ = store.query(limit=10)
+    assert store.query(after=cursor)[0] == []
+    fill(store, 3)
+    assert [e["id"] for e in store.query(after=cursor)[0]] == [6, 7, 8]
+    # Legacy two-part cursors still work
+    assert [e["id"] for e in store.query(after="1:0", limit=2)[0]] == [1, 2]
+
+
+def test_written_entries_carry_their_cursor(store):
+    written = store.append_many([{"message": "a"}, {"message": "b"}])
+    store.append({"message": "c"})
+    assert [e["message"] for e in store.query(after=written[0]["cursor"])[0]] == ["b", "c"]
+    assert all("cursor" not in e for e in store.entries())
+
+
+def test_paging_survives_compaction_between_pages(store):
+    fill(store, 20)
+    first = store.closed_segments()[0]
+    entries, cursor, more = store.query(after="1:0", limit=2)
+    assert more and [e["id"] for e in entries] == [1, 2]
+
+    compact(store, first)
+    ids, _ = page_all(store, cursor)
+    aggregate = store.read_segment(store.closed_segments()[0])[0]
+    assert aggregate["aggregate"] and aggregate["last_id"] > 2
+    # The aggregate absorbed entries after the cursor, so it is returned again;
+    # every entry of the later segments follows, none skipped
+    assert ids[0] == aggregate["id"]
+    later = [e["id"] for e in store.entries() if e["id"] > aggregate["last_id"]]
+    assert ids[-len(later):] == later
+
+
+def test_retired_ids_cannot_be_ignored(store):
+    fill(store, 20)
+    first, second = store.closed_segments()[:2]
+    compact(store, first)
+    merged = [i for i in range(first["first_id"], second["first_id"])
+              if i not in {e["id"] for e in store.read_segment(store.closed_segments()[0])}]
+    assert merged and not any(store.ignore(i) for i in merged)
+    assert store.ignore(first["first_id"])  # the aggregate keeps its first id
+
+    store.drop_segment(second["file"])
+    assert not store.ignore(second["first_id"])
+    assert store.ignore(store.next_id - 1)
+    assert not store.ignore(store.next_id)
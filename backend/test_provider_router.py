@@ -0,0 +1,99 @@
+"""
+test_provider_router.py
+
+Circuit breaker transitions and error classification of the provider router
+(run with pytest from backend/).
+"""
+
+import pytest
+
+import provider_router
+from provider_router import CLOSED, OPEN, HALF_OPEN, ProviderRouter, backoff_delay, is_provider_failure, percentile
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class APITimeoutError(Exception):
+    pass
+
+
+def fail(router, error, provider="groq", model="m"):
+    with pytest.raises(type(error)):
+        with router.track(provider, model):
+            raise error
+
+
+def succeed(router, provider="groq", model="m"):
+    with router.track(provider, model):
+        pass
+
+
+def test_consecutive_failures_open_the_breaker():
+    router = ProviderRouter()
+    for _ in range(provider_router.ROUTER_CONSECUTIVE_FAILURES):
+        fail(router, StatusError(503))
+    health = router.health("groq", "m")
+    assert health.state == OPEN
+    assert not router.is_available("groq", "m")
+    assert router.is_provider_down("groq")
+
+
+def test_half_open_lets_one_probe_through(monkeypatch):
+    router = ProviderRouter()
+    for _ in range(provider_router.ROUTER_CONSECUTIVE_FAILURES):
+        fail(router, StatusError(503))
+    monkeypatch.setattr(provider_router, "ROUTER_COOLDOWN_S", 0)
+    assert router.is_available("groq", "m")  # claims the probe
+    assert router.health("groq", "m").state == HALF_OPEN
+    monkeypatch.setattr(provider_router, "ROUTER_COOLDOWN_S", 60)
+    assert not router.is_available("groq", "m")  # probe still in flight
+
+
+def test_probe_success_closes_and_failure_reopens(monkeypatch):
+    router = ProviderRouter()
+    for _ in range(provider_router.ROUTER_CONSECUTIVE_FAILURES):
+        fail(router, StatusError(503))
+    monkeypatch.setattr(provider_router, "ROUTER_COOLDOWN_S", 0)
+    assert router.is_available("groq", "m")
+    succeed(router)
+    assert router.health("groq", "m").state == CLOSED
+
+    other = ProviderRouter()
+    for _ in range(provider_router.ROUTER_CONSECUTIVE_FAILURES):
+        fail(other, StatusError(503))
+    assert other.is_available("groq", "m")
+    fail(other, TimeoutError("read timeout"))
+    assert other.health("groq", "m").state == OPEN
+
+
+def test_client_errors_never_trip_the_breaker():
+    router = ProviderRouter()
+    for _ in range(20):
+        fail(router, StatusError(400))
+        fail(router, ValueError("unparseable completion"))
+    snapshot = router.health("groq", "m").snapshot()
+    assert snapshot["state"] == CLOSED
+    assert snapshot["calls"] == 0
+    assert snapshot["client_errors"] == 40
+
+
+def test_error_classification():
+    assert is_provider_failure(StatusError(500))
+    assert is_provider_failure(StatusError(429))
+    assert is_provider_failure(APITimeoutError())
+    assert is_provider_failure(ConnectionError())
+    assert not is_provider_failure(StatusError(400))
+    assert not is_provider_failure(StatusError(404))
+    assert not is_provider_failure(ValueError("bad json"))
+
+
+def test_percentile_and_backoff_bounds():
+    assert percentile([], 95) is None
+    assert percentile([1, 2, 3, 4], 50) == 2
+    assert percentile([1, 2, 3, 4], 100) == 4
+    for attempt in range(6):
+        assert 0 <= backoff_delay(attempt, base=0.5, cap=4) <= min(4, 0.5 * 2 ** attempt)
@@ -0,0 +1,51 @@
+"""
+test_quiz_cache.py
+
+Validation of parsed quiz completions (run with pytest from backend/).
+"""
+
+import pytest
+
+from config import QUIZ_MIN_QUESTIONS
+from quiz_cache import validate_quiz
+
+
+def question(i, **overrides):
+    item = {"question": f"Question {i}?", "answers": ["a", "b", "c", "d"], "correctAnswer": i % 4}
+    item.update(overrides)
+    return item
+
+
+def test_valid_quiz_is_kept_and_cleaned():
+    questions = [question(i, question=f"  Question {i}?  ") for i in range(QUIZ_MIN_QUESTIONS)]
+    quiz = validate_quiz({"questions": questions})
+    assert len(quiz["questions"]) == QUIZ_MIN_QUESTIONS
+    assert quiz["questions"][0]["question"] == "Question 0?"
+
+
+def test_bare_list_and_numeric_answers():
+    questions = [question(i, answers=[1, 2, 3.5, "four"]) for i in range(QUIZ_MIN_QUESTIONS)]
+    quiz = validate_quiz(questions)
+    assert quiz["questions"][0]["answers"] == ["1", "2", "3.5", "four"]
+
+
+def test_malformed_questions_are_dropped():
+    bad = [
+        question(0, question=" "),
+        question(1, answers=["a", "b", "c"]),
+        question(2, answers=["a", "b", "", "d"]),
+        question(3, correctAnswer=4),
+        question(4, correctAnswer=True),
+        question(5, correctAnswer="1"),
+        "not a question",
+    ]
+    good = [question(i) for i in range(QUIZ_MIN_QUESTIONS)]
+    quiz = validate_quiz({"questions": bad + good})
+    assert [q["question"] for q in quiz["questions"]] == [q["question"] for q in good]
+
+
+def test_too_few_valid_questions_raise():
+    with pytest.raises(ValueError):
+        validate_quiz({"questions": [question(i) for i in range(QUIZ_MIN_QUESTIONS - 1)]})
+    with pytest.raises(ValueError):
+        validate_quiz({"quiz": []})
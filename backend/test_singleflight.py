@@ -0,0 +1,84 @@
+"""
+test_singleflight.py
+
+Lab request keys and follower sharing of SingleFlight (run with pytest from backend/).
+"""
+
+import asyncio
+
+import pytest
+
+from singleflight import SingleFlight, lab_request_key, normalize_lab_request
+
+
+def test_key_ignores_case_whitespace_order_and_duplicates():
+    a = lab_request_key(" Deep ", "EN", ["Gold", "silver", "gold "], " Soft ")
+    b = lab_request_key("deep", "en", ["silver", "GOLD"], "soft")
+    assert a == b
+
+
+def test_key_defaults_and_distinct_parameters():
+    assert lab_request_key(None, None, None, None) == lab_request_key("deep", "en", [], "")
+    assert lab_request_key("deep", "en", [], "") != lab_request_key("silly", "en", [], "")
+    assert lab_request_key("deep", "en", ["gold"], "") != lab_request_key("deep", "en", [], "gold")
+
+
+def test_normalized_request_matches_key():
+    style, language, catalysts, vibe = normalize_lab_request("Astro", " FR", ["b", "A", ""], "Dreamy ")
+    assert (style, language, catalysts, vibe) == ("astro", "fr", ["a", "b"], "dreamy")
+
+
+def test_followers_share_one_call():
+    flights = SingleFlight()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return ["Lumina"]
+
+    async def main():
+        return await asyncio.gather(*(flights.do("k", work) for _ in range(5)))
+
+    results = asyncio.run(main())
+    assert calls == 1
+    assert results == [["Lumina"]] * 5
+    assert flights.snapshot() == {"in_flight": 0, "leaders": 1, "coalesced": 4}
+
+
+def test_errors_fan_out_and_the_key_is_released():
+    flights = SingleFlight()
+
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("provider down")
+
+    async def ok():
+        return "fresh"
+
+    async def main():
+        results = await asyncio.gather(flights.do("k", boom), flights.do("k", boom), return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+        return await flights.do("k", ok)
+
+    assert asyncio.run(main()) == "fresh"
+
+
+def test_cancelled_follower_does_not_cancel_the_leader():
+    flights = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def main():
+        leader = asyncio.ensure_future(flights.do("k", work))
+        follower = asyncio.ensure_future(flights.do("k", work))
+        await asyncio.sleep(0)
+        follower.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+        return await leader
+
+    assert asyncio.run(main()) == "done"
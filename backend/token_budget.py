@@ -0,0 +1,60 @@
+"""
+token_budget.py
+
+Token Budget Planner for ARACY's LLM layer.
+Sizes max_tokens from the task, the number of requested items and the output
+format, and names the prompt variant each task uses, so completion latency
+and cost track the actual request instead of a fixed 2048-token ceiling and
+the full identity prompt on every call.
+"""
+
+import math
+
+from config import LLM_MAX_TOKENS, LLM_MIN_TOKENS, LLM_BUDGET_MARGIN
+
+# Tasks
+TASK_REFLECTION = "reflection"   # one full Mirror Lab JSON reflection
+TASK_LAB_LIST = "lab_list"       # a list of one-line "Word - Meaning" alints
+TASK_QUIZ = "quiz"               # quiz questions with four answers each
+TASK_BOND_NAME = "bond_name"     # a 2-3 word bond name
+
+# Per-task output estimates and prompt variant:
+#   item_tokens: typical completion tokens for one item
+#   overhead: fixed tokens around the items (JSON wrapper, preamble)
+#   identity: "full" (CORE_IDENTITY_TEMPLATE), "compact" or None (no identity prompt)
+TASK_PROFILES = {
+    TASK_REFLECTION: {"item_tokens": 320, "overhead": 16, "identity": "full"},
+    TASK_LAB_LIST: {"item_tokens": 30, "overhead": 24, "identity": "compact"},
+    TASK_QUIZ: {"item_tokens": 110, "overhead": 24, "identity": None},
+    TASK_BOND_NAME: {"item_tokens": 8, "overhead": 4, "identity": None},
+}
+
+# Extra tokens per item for JSON quoting and separators
+JSON_ITEM_TOKENS = 4
+
+
+def plan_max_tokens(task, count=1, fmt="json"):
+    """
+    Choose max_tokens for a completion.
+
+    Args:
+        task: One of the TASK_* constants (unknown tasks get LLM_MAX_TOKENS)
+        count: Number of items requested
+        fmt: "json" or "lines" (plain "Word - Meaning" lines)
+
+    Returns:
+        Estimated output tokens times LLM_BUDGET_MARGIN, clamped to
+        [LLM_MIN_TOKENS, LLM_MAX_TOKENS]
+    """
+    profile = TASK_PROFILES.get(task)
+    if profile is None:
+        return LLM_MAX_TOKENS
+
+    item_tokens = profile["item_tokens"] + (JSON_ITEM_TOKENS if fmt == "json" else 0)
+    estimate = profile["overhead"] + max(1, count) * item_tokens
+    return max(LLM_MIN_TOKENS, min(LLM_MAX_TOKENS, math.ceil(estimate * LLM_BUDGET_MARGIN)))
+
+
+def identity_variant(task):
+    """Prompt variant for a task: "full", "compact" or None."""
+    return TASK_PROFILES.get(task, TASK_PROFILES[TASK_REFLECTION])["identity"]
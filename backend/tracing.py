@@ -0,0 +1,332 @@
+"""
+tracing.py
+
+Lightweight Stage Tracing for ARACY.
+Spans time the stages of a request (vault reload, filtering, LLM calls,
+parsing, retries, persistence) and nest through a context variable, so the
+trace follows the request into tasks and worker threads started with
+asyncio.to_thread. Sampling is decided once per trace at its root span.
+
+Finished traces are exported off the request path as OTLP/JSON
+(ExportTraceServiceRequest) lines to traces.jsonl and, if configured, POSTed
+to an OTLP/HTTP collector; the most recent ones are kept in memory for
+/api/traces.
+"""
+
+import contextvars
+import functools
+import inspect
+import json
+import os
+import queue
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from config import (
+    TRACE_SAMPLE_RATE,
+    TRACE_EXPORT_FILE,
+    TRACE_EXPORT_MAX_BYTES,
+    TRACE_OTLP_ENDPOINT,
+    TRACE_RECENT,
+)
+
+SERVICE_NAME = "aracy-backend"
+TRACE_EXPORT_PATH = os.path.join(os.path.dirname(__file__), TRACE_EXPORT_FILE) if TRACE_EXPORT_FILE else None
+
+# OTLP status codes
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+_current_span = contextvars.ContextVar("trace_span", default=None)
+
+
+class _Trace:
+    """Spans of one trace collected in this process until its local root ends."""
+
+    def __init__(self, trace_id):
+        self.trace_id = trace_id
+        self.spans = []
+        self.exported = False
+        self._lock = threading.Lock()
+
+    def finish(self, span, is_root):
+        with self._lock:
+            if self.exported:
+                late = [span]  # ended after its root (e.g. background generation)
+            else:
+                self.spans.append(span)
+                late = None
+                if is_root:
+                    self.exported = True
+                    late = self.spans
+        if late:
+            exporter.export(late)
+
+
+class Span:
+    """One timed stage; add attributes with set() or add()."""
+
+    sampled = True
+
+    def __init__(self, name, trace, parent_id=None, attributes=None):
+        self.name = name
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.status = STATUS_OK
+        self.status_message = ""
+
+    @property
+    def trace_id(self):
+        return self.trace.trace_id
+
+    def set(self, **attributes):
+        """Set attributes (None values are skipped)."""
+        self.attributes.update({k: v for k, v in attributes.items() if v is not None})
+
+    def add(self, **counters):
+        """Add to numeric attributes (e.g. token counts across several calls)."""
+        for key, value in counters.items():
+            self.attributes[key] = self.attributes.get(key, 0) + (value or 0)
+
+    def fail(self, error):
+        self.status = STATUS_ERROR
+        self.status_message = str(error)[:200]
+
+    def end(self, is_root=False):
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            self.trace.finish(self, is_root)
+
+    def context(self):
+        """Serializable parent reference, to resume the trace in a later job."""
+        return {"trace_id": self.trace_id, "span_id": self.span_id}
+
+
+class _NoopSpan:
+    """Stand-in for spans of unsampled traces (children stay unsampled)."""
+
+    sampled = False
+    trace_id = None
+    span_id = None
+
+    def set(self, **attributes):
+        pass
+
+    def add(self, **counters):
+        pass
+
+    def fail(self, error):
+        pass
+
+    def end(self, is_root=False):
+        pass
+
+    def context(self):
+        return None
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def current_span():
+    """The active span (a no-op span outside any sampled trace)."""
+    return _current_span.get() or NOOP_SPAN
+
+
+def start_span(name, parent=None, **attributes):
+    """
+    Start a span without making it current (for generators and callbacks
+    whose code runs in different contexts). The caller must call end().
+
+    A new trace is started (and sampled) when there is no parent.
+    """
+    parent = parent if parent is not None else _current_span.get()
+    if parent is None:
+        if random.random() >= TRACE_SAMPLE_RATE:
+            return NOOP_SPAN
+        return Span(name, _Trace(os.urandom(16).hex()), None, attributes)
+    if not parent.sampled:
+        return NOOP_SPAN
+    return Span(name, parent.trace, parent.span_id, attributes)
+
+
+@contextmanager
+def span(name, **attributes):
+    """
+    Time the with-block as a span, current for everything called inside it.
+
+    Usage:
+        with span("lab.fanout", chunks=3) as s:
+            ...
+            s.set(rounds=2)
+    """
+    is_root = _current_span.get() is None
+    active = start_span(name, **attributes)
+    token = _current_span.set(active)
+    try:
+        yield active
+    except BaseException as e:
+        active.fail(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        active.end(is_root=is_root)
+
+
+def traced(name, **attributes):
+    """
+    Decorator: run a (sync or async) function inside a span, e.g. a FastAPI
+    endpoint as the root span of its request's trace. The signature is kept
+    (functools.wraps), so FastAPI still sees the original parameters.
+    """
+    def decorate(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(name, **attributes):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name, **attributes):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+@contextmanager
+def resume(context, name, **attributes):
+    """
+    Continue a trace from a serialized span context (see Span.context()),
+    e.g. in a background job submitted by a traced request. No-op when the
+    submitting request was not sampled.
+    """
+    if not context:
+        yield NOOP_SPAN
+        return
+    trace = _Trace(context["trace_id"])
+    active = Span(name, trace, context["span_id"], attributes)
+    token = _current_span.set(active)
+    try:
+        yield active
+    except BaseException as e:
+        active.fail(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        active.end(is_root=True)
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(spans):
+    """OTLP/JSON ExportTraceServiceRequest for a list of finished spans."""
+    otlp_spans = []
+    for s in spans:
+        otlp_span = {
+            "traceId": s.trace_id,
+            "spanId": s.span_id,
+            "name": s.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(s.start_ns),
+            "endTimeUnixNano": str(s.end_ns),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+            "status": {"code": s.status, **({"message": s.status_message} if s.status_message else {})},
+        }
+        if s.parent_id:
+            otlp_span["parentSpanId"] = s.parent_id
+        otlp_spans.append(otlp_span)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{"scope": {"name": "aracy.tracing"}, "spans": otlp_spans}],
+        }]
+    }
+
+
+class TraceExporter:
+    """
+    Background exporter: finished traces are queued by the request and
+    written/POSTed by a daemon thread.
+
+    Args:
+        path: JSON-lines file (None disables file export)
+        endpoint: OTLP/HTTP traces URL (empty disables)
+        recent: Number of exported payloads kept in memory
+    """
+
+    def __init__(self, path=TRACE_EXPORT_PATH, endpoint=TRACE_OTLP_ENDPOINT, recent=TRACE_RECENT):
+        self.path = path
+        self.endpoint = endpoint
+        self.recent = deque(maxlen=recent)
+        self.exported = 0
+        self.failed = 0
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def export(self, spans):
+        """Queue finished spans for export (never blocks)."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                self._thread.start()
+        self._queue.put(list(spans))
+
+    def _write(self, payload):
+        if self.path is None:
+            return
+        line = json.dumps(payload, ensure_ascii=False) + "\n"
+        if os.path.exists(self.path) and os.path.getsize(self.path) + len(line) > TRACE_EXPORT_MAX_BYTES:
+            os.replace(self.path, f"{self.path}.1")  # keep one rotated file
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+    def _post(self, payload):
+        if not self.endpoint:
+            return
+        import httpx
+        httpx.post(self.endpoint, json=payload, timeout=5).raise_for_status()
+
+    def _run(self):
+        while True:
+            spans = self._queue.get()
+            payload = to_otlp(spans)
+            self.recent.append(payload)
+            try:
+                self._write(payload)
+                self._post(payload)
+                self.exported += 1
+            except Exception as e:
+                self.failed += 1
+                print(f"⚠ Trace export failed: {e}")
+
+    def snapshot(self):
+        """Serializable view of the exporter settings and counters."""
+        return {
+            "sample_rate": TRACE_SAMPLE_RATE,
+            "file": self.path,
+            "endpoint": self.endpoint or None,
+            "exported": self.exported,
+            "failed": self.failed,
+        }
+
+
+# Shared exporter used by every span
+exporter = TraceExporter()
@@ -0,0 +1,230 @@
+"""
+usage_meter.py
+
+Token and Cost Accounting for ARACY's LLM calls.
+Captures real `usage` (prompt, completion and total tokens) and latency from
+every Groq and Gemini response and aggregates them per endpoint, model,
+category and bond.
+
+Producers never take a lock: each call appends one record to a deque
+(an atomic operation). Records are folded into the aggregates when the
+counters are read or persisted, and persisted periodically to usage_store.json.
+"""
+
+import asyncio
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+from config import LLM_PRICING, USAGE_PERSIST_INTERVAL_S, USAGE_RATE_WINDOW_S, data_path
+from logger import log_error
+from tracing import current_span
+
+USAGE_STORE_PATH = data_path("usage_store.json")  # mock runs never count toward real spend
+
+DIMENSIONS = ("endpoint", "model", "category", "bond")
+
+# Request-scoped tags (endpoint, bond) attached to every usage record
+_usage_tags = contextvars.ContextVar("usage_tags", default={})
+
+
+@contextmanager
+def usage_tags(**tags):
+    """
+    Tag every LLM call made inside the block (including worker threads
+    started with asyncio.to_thread) with e.g. endpoint and bond.
+    """
+    token = _usage_tags.set({**_usage_tags.get(), **{k: v for k, v in tags.items() if v}})
+    try:
+        yield
+    finally:
+        _usage_tags.reset(token)
+
+
+def _empty_counter():
+    return {
+        "calls": 0,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "total_tokens": 0,
+        "latency_s": 0.0,
+        "cost_usd": 0.0,
+    }
+
+
+def estimate_cost(model, prompt_tokens, completion_tokens):
+    """Cost in USD from the per-million-token price table in config.LLM_PRICING."""
+    prices = LLM_PRICING.get(model) or LLM_PRICING.get("default", {})
+    return (
+        prompt_tokens * prices.get("input", 0.0)
+        + completion_tokens * prices.get("output", 0.0)
+    ) / 1_000_000
+
+
+class UsageMeter:
+    """
+    In-memory usage counters with periodic persistence.
+    """
+
+    def __init__(self, path=USAGE_STORE_PATH):
+        self.path = path
+        self._pending = deque()
+        self._recent = deque()  # (timestamp, total_tokens, cost_usd) within the rate window
+        self._fold_lock = threading.Lock()
+        self._persist_lock = threading.Lock()  # one writer of usage_store.json at a time
+        self.totals = _empty_counter()
+        self.by = {dimension: {} for dimension in DIMENSIONS}
+        self.since = datetime.now().isoformat(timespec='seconds')
+        self._task = None
+        self._load()
+
+    def record(self, provider, model, category, prompt_tokens, completion_tokens, total_tokens, latency_s):
+        """Record one LLM response (lock-free append)."""
+        tags = _usage_tags.get()
+        current_span().add(**{
+            "llm.prompt_tokens": int(prompt_tokens or 0),
+            "llm.completion_tokens": int(completion_tokens or 0),
+        })
+        self._pending.append((
+            time.time(),
+            tags.get("endpoint", "direct"),
+            f"{provider}/{model}",
+            category or "general",
+            tags.get("bond", "none"),
+            int(prompt_tokens or 0),
+            int(completion_tokens or 0),
+            int(total_tokens or (prompt_tokens or 0) + (completion_tokens or 0)),
+            float(latency_s),
+            estimate_cost(model, prompt_tokens or 0, completion_tokens or 0),
+        ))
+
+    def _fold(self):
+        """Move pending records into the aggregates (consumer side only)."""
+        with self._fold_lock:
+            while self._pending:
+                ts, endpoint, model, category, bond, prompt, completion, total, latency, cost = self._pending.popleft()
+                keys = {"endpoint": endpoint, "model": model, "category": category, "bond": bond}
+                for counter in [self.totals] + [
+                    self.by[dimension].setdefault(keys[dimension], _empty_counter()) for dimension in DIMENSIONS
+                ]:
+                    counter["calls"] += 1
+                    counter["prompt_tokens"] += prompt
+                    counter["completion_tokens"] += completion
+                    counter["total_tokens"] += total
+                    counter["latency_s"] += latency
+                    counter["cost_usd"] += cost
+                self._recent.append((ts, total, cost))
+
+            cutoff = time.time() - USAGE_RATE_WINDOW_S
+            while self._recent and self._recent[0][0] < cutoff:
+                self._recent.popleft()
+
+    def rates(self):
+        """Token and cost rates over the recent window."""
+        self._fold()
+        tokens = sum(total for _, total, _ in self._recent)
+        cost = sum(c for _, _, c in self._recent)
+        return {
+            "window_s": USAGE_RATE_WINDOW_S,
+            "tokens_per_sec": round(tokens / USAGE_RATE_WINDOW_S, 2),
+            "cost_per_hour_usd": round(cost / USAGE_RATE_WINDOW_S * 3600, 4),
+        }
+
+    def snapshot(self):
+        """Serializable view of totals, per-dimension counters and rates."""
+        self._fold()
+        with self._fold_lock:
+            totals = dict(self.totals)
+            by = {dimension: {key: dict(counter) for key, counter in counters.items()}
+                  for dimension, counters in self.by.items()}
+        totals["avg_latency_ms"] = round(totals["latency_s"] / totals["calls"] * 1000, 1) if totals["calls"] else None
+        return {"since": self.since, "totals": totals, "by": by, "rates": self.rates()}
+
+    def _load(self):
+        """Resume counters from usage_store.json if present."""
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, "r", encoding="utf-8") as f:
+                    stored = json.load(f)
+                self.totals.update(stored.get("totals", {}))
+                for dimension in DIMENSIONS:
+                    self.by[dimension].update(stored.get("by", {}).get(dimension, {}))
+                self.since = stored.get("since", self.since)
+        except Exception as e:
+            log_error(f"Failed to load usage store: {e}", level="WARNING")
+
+    def persist(self):
+        """
+        Write the aggregates to usage_store.json (atomic replace). Blocking:
+        callers on the event loop use asyncio.to_thread.
+        """
+        self._fold()
+        try:
+            with self._persist_lock:
+                with self._fold_lock:
+                    data = {"since": self.since, "totals": self.totals, "by": self.by}
+                    payload = json.dumps(data, indent=2, ensure_ascii=False)
+                with open(f"{self.path}.tmp", "w", encoding="utf-8") as f:
+                    f.write(payload)
+                os.replace(f"{self.path}.tmp", self.path)
+        except Exception as e:
+            log_error(f"Failed to persist usage store: {e}", level="WARNING")
+
+    async def run(self):
+        """Background persistence loop."""
+        while True:
+            await asyncio.sleep(USAGE_PERSIST_INTERVAL_S)
+            await asyncio.to_thread(self.persist)
+
+    def start(self):
+        """Start periodic persistence on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Stop periodic persistence and write a final snapshot."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self.persist)
+
+
+# Shared meter used by the LLM wrappers and main
+meter = UsageMeter()
+
+
+def record_groq_usage(response, model, category, latency_s):
+    """Record usage from a Groq chat completion (or a final stream chunk's usage)."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    meter.record(
+        "groq", model, category,
+        getattr(usage, "prompt_tokens", 0),
+        getattr(usage, "completion_tokens", 0),
+        getattr(usage, "total_tokens", 0),
+        latency_s,
+    )
+
+
+def record_gemini_usage(response, model, category, latency_s):
+    """Record usage from a Gemini generate_content response."""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return
+    meter.record(
+        "gemini", model, category,
+        getattr(usage, "prompt_token_count", 0),
+        getattr(usage, "candidates_token_count", 0),
+        getattr(usage, "total_token_count", 0),
+        latency_s,
+    )
@@ -32,6 +32,28 @@ function App() {
       : 'http://localhost:8000';
   };
 
+  // Degraded mode: the Lab answered from the vault before the deadline;
+  // swap in the fresh set once the background generation has stored it
+  const pollDailySet = async (API_URL, path, attempts = 10) => {
+    for (let i = 0; i < attempts; i++) {
+      await new Promise((resolve) => setTimeout(resolve, 2000));
+      try {
+        const res = await fetch(`${API_URL}${path}`);
+        if (!res.ok) return;
+        const data = await res.json();
+        if (data.status === 'ready' && data.daily_set?.alints?.length) {
+          setAlints(data.daily_set.alints);
+          console.log('✨ Fresh alints delivered from the daily set');
+          return;
+        }
+        if (data.status !== 'pending') return;
+      } catch (err) {
+        console.error('Failed to fetch daily set:', err);
+        return;
+      }
+    }
+  };
+
   const handleGenerate = async (labParams) => {
     if (!bondId) return;
 
@@ -73,6 +95,9 @@ function App() {
           setAlints(data.alints);
           setActiveTab('ritual'); // Auto-switch to RITUAL tab
           console.log('🎯 Switched to RITUAL tab with', data.alints.length, 'alints');
+          if (data.provisional && data.daily_set) {
+            pollDailySet(API_URL, data.daily_set);
+          }
         } else if (data.endearments && data.endearments.length > 0) {
           setAlints(data.endearments);
           setActiveTab('ritual'); // Auto-switch to RITUAL tab
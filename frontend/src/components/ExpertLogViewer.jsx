@@ -1,7 +1,10 @@
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef } from "react";
 import { motion, AnimatePresence } from "framer-motion";
 import { AlertTriangle, CheckCircle, XCircle, Eye, EyeOff } from "lucide-react";
 
+// Entries kept in the console (oldest are dropped as new ones arrive)
+const MAX_LOGS = 200;
+
 /**
  * ExpertLogViewer Component
  * 
@@ -14,20 +17,87 @@ export default function ExpertLogViewer() {
   const [isLoading, setIsLoading] = useState(true);
   const [isOpen, setIsOpen] = useState(false);
   const [filter, setFilter] = useState("all"); // all, active, ignored
+  const cursorRef = useRef(null); // position after the newest entry received
 
   useEffect(() => {
-    fetchLogs();
-    // Refresh logs every 15 seconds
-    const interval = setInterval(fetchLogs, 15000);
-    return () => clearInterval(interval);
+    if (typeof EventSource === "undefined") {
+      // No SSE support: fall back to polling for deltas every 15 seconds
+      fetchLogs();
+      const interval = setInterval(fetchLogs, 15000);
+      return () => clearInterval(interval);
+    }
+
+    // Live tail: new entries are pushed as they are written
+    let source = null;
+    let cancelled = false;
+    fetchLogs().then(() => {
+      if (cancelled) return; // unmounted before the first load finished
+      source = new EventSource("/api/logs/stream");
+      source.onopen = () => {
+        // Catch up on anything written before this (re)connect; duplicates are skipped by id
+        fetchLogs();
+      };
+      source.onmessage = (event) => {
+        try {
+          const entry = JSON.parse(event.data);
+          appendLogs([entry]);
+          // Streamed entries carry the cursor just past them
+          if (entry.cursor) cursorRef.current = entry.cursor;
+        } catch (err) {
+          console.error("Log stream parse error:", err);
+        }
+      };
+    });
+    return () => {
+      cancelled = true;
+      source?.close();
+    };
   }, []);
 
+  function appendLogs(entries) {
+    if (entries.length === 0) return;
+    setLogs(prev => {
+      const seen = new Set(prev.map(log => log.id));
+      const fresh = entries.filter(log => !seen.has(log.id));
+      return fresh.length > 0 ? [...prev, ...fresh].slice(-MAX_LOGS) : prev;
+    });
+  }
+
+  async function fetchPage() {
+    // First load: newest entries; afterwards only entries logged since the cursor
+    const params = cursorRef.current
+      ? `after=${encodeURIComponent(cursorRef.current)}&limit=${MAX_LOGS}`
+      : `limit=${MAX_LOGS}`;
+    const res = await fetch(`/api/logs/errors?${params}`);
+    if (!res.ok) throw new Error("Failed to fetch logs");
+    return res.json();
+  }
+
   async function fetchLogs() {
     try {
-      const res = await fetch("/api/logs/errors");
-      if (!res.ok) throw new Error("Failed to fetch logs");
-      const data = await res.json();
-      setLogs(data.errors || []);
+      if (!cursorRef.current) {
+        const data = await fetchPage();
+        setLogs(data.errors || []);
+        cursorRef.current = data.cursor || null;
+      } else {
+        // Catch up page by page; past MAX_LOGS entries only the newest matter
+        let fetched = 0;
+        let hasMore = true;
+        while (hasMore && fetched < MAX_LOGS) {
+          const data = await fetchPage();
+          const entries = data.errors || [];
+          appendLogs(entries);
+          fetched += entries.length;
+          cursorRef.current = data.cursor || cursorRef.current;
+          hasMore = data.has_more && entries.length > 0;
+        }
+        if (hasMore) {
+          cursorRef.current = null;
+          const data = await fetchPage();
+          setLogs(data.errors || []);
+          cursorRef.current = data.cursor || null;
+        }
+      }
       setIsLoading(false);
     } catch (err) {
       console.error("Log fetch error:", err);
@@ -35,16 +105,16 @@ export default function ExpertLogViewer() {
     }
   }
 
-  async function handleIgnore(timestamp) {
+  async function handleIgnore(id) {
     try {
-      const res = await fetch(`/api/logs/ignore?timestamp=${encodeURIComponent(timestamp)}`, {
+      const res = await fetch(`/api/logs/ignore?id=${encodeURIComponent(id)}`, {
         method: "POST",
       });
       if (!res.ok) throw new Error("Failed to ignore log");
       
       // Update local state
-      setLogs(logs.map(log => 
-        log.timestamp === timestamp ? { ...log, ignored: true } : log
+      setLogs(prev => prev.map(log => 
+        log.id === id ? { ...log, ignored: true } : log
       ));
     } catch (err) {
       console.error("Ignore error:", err);
@@ -153,7 +223,7 @@ export default function ExpertLogViewer() {
               ) : (
                 filteredLogs.map((log, idx) => (
                   <motion.div
-                    key={log.timestamp || idx}
+                    key={log.id ?? idx}
                     initial={{ opacity: 0, y: 10 }}
                     animate={{ opacity: 1, y: 0 }}
                     transition={{ delay: idx * 0.05 }}
@@ -183,6 +253,14 @@ export default function ExpertLogViewer() {
                             IGNORED
                           </span>
                         )}
+                        {log.aggregate && (
+                          <span
+                            title={`First seen ${new Date(log.first_seen).toLocaleString()} · last seen ${new Date(log.last_seen).toLocaleString()}`}
+                            className="px-2 py-1 rounded bg-goth-gold/10 text-goth-gold/60 text-[10px] font-mono"
+                          >
+                            ×{log.count}
+                          </span>
+                        )}
                       </div>
                       <span className="text-goth-gold/40 text-[10px] font-mono">
                         {new Date(log.timestamp).toLocaleString()}
@@ -197,7 +275,7 @@ export default function ExpertLogViewer() {
                     {/* Ignore button */}
                     {!log.ignored && (
                       <button
-                        onClick={() => handleIgnore(log.timestamp)}
+                        onClick={() => handleIgnore(log.id)}
                         className="flex items-center gap-2 px-3 py-1.5 rounded-full bg-goth-gold/10 hover:bg-goth-gold/20 border border-goth-gold/30 hover:border-goth-gold/50 text-goth-gold text-xs font-mono uppercase tracking-wider transition-all"
                       >
                         <Eye className="w-3 h-3" />
@@ -2,16 +2,21 @@ import { useState, useEffect } from "react";
 import { motion } from "framer-motion";
 import { Activity, Cpu, Zap } from "lucide-react";
 
+// Refresh period; each poll also reads the sampler history since the last one
+const REFRESH_MS = 30000;
+
 /**
  * ResourceFootprint Component
  * 
  * Displays system resource usage in an Art Nouveau gold-etched plaque style.
- * Shows memory usage and estimated token count for AI operations.
+ * Shows memory usage (latest and peak over the sampler history between
+ * polls) and real token usage reported by the LLM providers.
  * Styled to match the goth-celestial-alchemy aesthetic of ARACY.
  */
 export default function ResourceFootprint() {
   const [footprint, setFootprint] = useState({
     memory: 0,
+    peakMemory: 0,
     tokens: 0,
     timestamp: null
   });
@@ -21,12 +26,19 @@ export default function ResourceFootprint() {
     // Fetch resource footprint from backend
     async function fetchFootprint() {
       try {
-        const res = await fetch("/api/resource-footprint");
+        // The background sampler keeps a ring buffer: ask for enough samples
+        // to cover the time since the previous poll (at up to one per second)
+        const res = await fetch(`/api/resource-footprint?history=${REFRESH_MS / 1000}`);
         if (!res.ok) throw new Error("Failed to fetch resource footprint");
         const data = await res.json();
+        const history = data.history || [];
+        const samples = data.sample_interval_s
+          ? history.slice(-Math.ceil(REFRESH_MS / 1000 / data.sample_interval_s))
+          : history;
         setFootprint({
           memory: data.memory_mb || 0,
-          tokens: data.estimated_tokens || 0,
+          peakMemory: Math.max(data.memory_mb || 0, ...samples.map(s => s.rss_mb || 0)),
+          tokens: data.total_tokens || 0,
           timestamp: new Date()
         });
         setIsLoading(false);
@@ -37,8 +49,7 @@ export default function ResourceFootprint() {
     }
 
     fetchFootprint();
-    // Refresh every 30 seconds
-    const interval = setInterval(fetchFootprint, 30000);
+    const interval = setInterval(fetchFootprint, REFRESH_MS);
     return () => clearInterval(interval);
   }, []);
 
@@ -129,6 +140,11 @@ export default function ResourceFootprint() {
                       {footprint.memory.toFixed(2)}
                     </span>
                     <span className="text-goth-gold/70 text-xs font-mono">MB</span>
+                    {footprint.peakMemory > footprint.memory && (
+                      <span className="text-goth-gold/40 text-[10px] font-mono">
+                        peak {footprint.peakMemory.toFixed(0)}
+                      </span>
+                    )}
                   </div>
                 </div>
               </div>